@@ -0,0 +1,45 @@
+"""merchant shipment stats
+
+Revision ID: 0c81d5e2a7f4
+Revises: b333c089a80f
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0c81d5e2a7f4"
+down_revision: Union[str, Sequence[str], None] = "b333c089a80f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "merchant_shipment_stats",
+        sa.Column("merchant_id", sa.UUID(), nullable=False),
+        sa.Column(
+            "status",
+            postgresql.ENUM(name="shipment_status", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("count", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(["merchant_id"], ["merchants.id"]),
+        sa.PrimaryKeyConstraint("merchant_id", "status"),
+    )
+    op.execute(
+        "INSERT INTO merchant_shipment_stats (merchant_id, status, count) "
+        "SELECT merchant_id, status, count(*) FROM shipments GROUP BY merchant_id, status"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("merchant_shipment_stats")
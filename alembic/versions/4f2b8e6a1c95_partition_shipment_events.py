@@ -0,0 +1,141 @@
+"""partition shipment_events by month
+
+Revision ID: 4f2b8e6a1c95
+Revises: 7e5a9c3d2b18
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4f2b8e6a1c95"
+down_revision: Union[str, Sequence[str], None] = "7e5a9c3d2b18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_COLUMNS = "id, shipment_id, type, source, reason, occurred_at, created_at, updated_at"
+
+
+def _columns() -> list[sa.Column]:
+    return [
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("shipment_id", sa.UUID(), nullable=False),
+        sa.Column(
+            "type", postgresql.ENUM(name="shipment_event_type", create_type=False), nullable=False
+        ),
+        sa.Column(
+            "source",
+            postgresql.ENUM(name="shipment_event_source", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("reason", sa.String(), nullable=True),
+        sa.Column(
+            "occurred_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True
+        ),
+        sa.ForeignKeyConstraint(["shipment_id"], ["shipments.id"]),
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Partition bounds are UTC months, matching app/persistence/partitions.py.
+    op.execute("SET LOCAL TIME ZONE 'UTC'")
+    op.rename_table("shipment_events", "shipment_events_unpartitioned")
+    op.execute(
+        "ALTER TABLE shipment_events_unpartitioned "
+        "RENAME CONSTRAINT shipment_events_pkey TO shipment_events_unpartitioned_pkey"
+    )
+    op.execute(
+        "ALTER TABLE shipment_events_unpartitioned "
+        "RENAME CONSTRAINT shipment_events_shipment_id_fkey "
+        "TO shipment_events_unpartitioned_shipment_id_fkey"
+    )
+    op.drop_index("ix_shipment_events_shipment_id", table_name="shipment_events_unpartitioned")
+
+    # Unique constraints on a partitioned table must include the partition key.
+    op.create_table(
+        "shipment_events",
+        *_columns(),
+        sa.PrimaryKeyConstraint("id", "occurred_at"),
+        postgresql_partition_by="RANGE (occurred_at)",
+    )
+    op.create_index(
+        "ix_shipment_events_shipment_id_occurred_at",
+        "shipment_events",
+        ["shipment_id", "occurred_at"],
+        unique=False,
+    )
+    op.execute("CREATE TABLE shipment_events_default PARTITION OF shipment_events DEFAULT")
+    # Monthly partitions for the existing rows and the next three months; later months are
+    # created by python -m app.cli.partitions.
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            month date;
+            last_month date := date_trunc('month', now()) + interval '3 months';
+        BEGIN
+            SELECT date_trunc('month', least(min(occurred_at), now()))
+            INTO month
+            FROM shipment_events_unpartitioned;
+            WHILE month <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF shipment_events FOR VALUES FROM (%L) TO (%L)',
+                    'shipment_events_p' || to_char(month, 'YYYY_MM'),
+                    month,
+                    month + interval '1 month'
+                );
+                month := month + interval '1 month';
+            END LOOP;
+        END
+        $$
+        """
+    )
+    op.execute(
+        f"INSERT INTO shipment_events ({_COLUMNS}) "
+        f"SELECT {_COLUMNS} FROM shipment_events_unpartitioned"
+    )
+    op.drop_table("shipment_events_unpartitioned")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.rename_table("shipment_events", "shipment_events_partitioned")
+    op.create_table(
+        "shipment_events_unpartitioned",
+        *_columns(),
+        sa.PrimaryKeyConstraint("id", name="shipment_events_unpartitioned_pkey"),
+    )
+    op.execute(
+        f"INSERT INTO shipment_events_unpartitioned ({_COLUMNS}) "
+        f"SELECT {_COLUMNS} FROM shipment_events_partitioned"
+    )
+    op.drop_table("shipment_events_partitioned")
+    op.rename_table("shipment_events_unpartitioned", "shipment_events")
+    op.execute(
+        "ALTER TABLE shipment_events "
+        "RENAME CONSTRAINT shipment_events_unpartitioned_pkey TO shipment_events_pkey"
+    )
+    op.execute(
+        "ALTER TABLE shipment_events "
+        "RENAME CONSTRAINT shipment_events_unpartitioned_shipment_id_fkey "
+        "TO shipment_events_shipment_id_fkey"
+    )
+    op.create_index(
+        "ix_shipment_events_shipment_id", "shipment_events", ["shipment_id"], unique=False
+    )
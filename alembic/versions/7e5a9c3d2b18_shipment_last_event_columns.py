@@ -0,0 +1,75 @@
+"""shipment last event columns
+
+Revision ID: 7e5a9c3d2b18
+Revises: 0c81d5e2a7f4
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7e5a9c3d2b18"
+down_revision: Union[str, Sequence[str], None] = "0c81d5e2a7f4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "shipments",
+        sa.Column(
+            "last_event_type",
+            postgresql.ENUM(name="shipment_event_type", create_type=False),
+            nullable=True,
+        ),
+    )
+    op.add_column(
+        "shipments", sa.Column("last_event_at", sa.DateTime(timezone=True), nullable=True)
+    )
+    op.add_column(
+        "shipments",
+        sa.Column("event_count", sa.Integer(), server_default=sa.text("0"), nullable=False),
+    )
+    op.execute(
+        """
+        UPDATE shipments
+        SET last_event_type = latest.type,
+            last_event_at = latest.occurred_at,
+            event_count = latest.event_count
+        FROM (
+            SELECT DISTINCT ON (shipment_id)
+                shipment_id,
+                type,
+                occurred_at,
+                count(*) OVER (PARTITION BY shipment_id) AS event_count
+            FROM shipment_events
+            ORDER BY shipment_id, occurred_at DESC
+        ) AS latest
+        WHERE shipments.id = latest.shipment_id
+        """
+    )
+    op.create_index(
+        "ix_shipments_merchant_id_last_event_at_id",
+        "shipments",
+        [
+            "merchant_id",
+            sa.text("coalesce(last_event_at, '-infinity'::timestamptz) DESC"),
+            sa.text("id DESC"),
+        ],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_shipments_merchant_id_last_event_at_id", table_name="shipments")
+    op.drop_column("shipments", "event_count")
+    op.drop_column("shipments", "last_event_at")
+    op.drop_column("shipments", "last_event_type")
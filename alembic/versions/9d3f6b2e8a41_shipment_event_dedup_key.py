@@ -0,0 +1,38 @@
+"""shipment event dedup key
+
+Revision ID: 9d3f6b2e8a41
+Revises: 4f2b8e6a1c95
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9d3f6b2e8a41"
+down_revision: Union[str, Sequence[str], None] = "4f2b8e6a1c95"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("shipment_events", sa.Column("dedup_key", sa.String(length=64), nullable=True))
+    # Unique indexes on a partitioned table must contain the partition key; occurred_at is part
+    # of the key anyway, so this is as strict as a unique dedup_key.
+    op.create_index(
+        "uq_shipment_events_dedup_key_occurred_at",
+        "shipment_events",
+        ["dedup_key", "occurred_at"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("uq_shipment_events_dedup_key_occurred_at", table_name="shipment_events")
+    op.drop_column("shipment_events", "dedup_key")
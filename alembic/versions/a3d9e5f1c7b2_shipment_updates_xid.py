@@ -0,0 +1,53 @@
+"""shipment updates xid
+
+Revision ID: a3d9e5f1c7b2
+Revises: e7a4c1d9b5f2
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a3d9e5f1c7b2"
+down_revision: Union[str, Sequence[str], None] = "e7a4c1d9b5f2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing updates all committed already: a constant 0 orders them by id, before every new
+    # update, without rewriting the table. New rows default to their transaction's id.
+    op.add_column(
+        "shipment_updates",
+        sa.Column("xid", sa.BigInteger(), server_default=sa.text("0"), nullable=False),
+    )
+    op.alter_column(
+        "shipment_updates",
+        "xid",
+        server_default=sa.text("pg_current_xact_id()::text::bigint"),
+    )
+    op.create_index(
+        "ix_shipment_updates_merchant_id_xid_id",
+        "shipment_updates",
+        ["merchant_id", "xid", "id"],
+        unique=False,
+    )
+    op.drop_index("ix_shipment_updates_merchant_id_id", table_name="shipment_updates")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        "ix_shipment_updates_merchant_id_id",
+        "shipment_updates",
+        ["merchant_id", "id"],
+        unique=False,
+    )
+    op.drop_index("ix_shipment_updates_merchant_id_xid_id", table_name="shipment_updates")
+    op.drop_column("shipment_updates", "xid")
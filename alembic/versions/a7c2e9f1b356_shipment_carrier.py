@@ -0,0 +1,41 @@
+"""shipment carrier
+
+Revision ID: a7c2e9f1b356
+Revises: 9d3f6b2e8a41
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a7c2e9f1b356"
+down_revision: Union[str, Sequence[str], None] = "9d3f6b2e8a41"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("shipments", sa.Column("carrier", sa.String(length=64), nullable=True))
+    op.create_index(
+        "ix_shipments_carrier_id_active",
+        "shipments",
+        ["carrier", "id"],
+        unique=False,
+        postgresql_where=sa.text("status IN ('created', 'in_transit')"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_shipments_carrier_id_active",
+        table_name="shipments",
+        postgresql_where=sa.text("status IN ('created', 'in_transit')"),
+    )
+    op.drop_column("shipments", "carrier")
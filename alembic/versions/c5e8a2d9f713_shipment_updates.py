@@ -0,0 +1,64 @@
+"""shipment updates outbox
+
+Revision ID: c5e8a2d9f713
+Revises: a7c2e9f1b356
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c5e8a2d9f713"
+down_revision: Union[str, Sequence[str], None] = "a7c2e9f1b356"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "shipment_updates",
+        sa.Column("id", sa.BigInteger(), sa.Identity(), nullable=False),
+        sa.Column("merchant_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("shipment_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("type", sa.String(length=32), nullable=False),
+        sa.Column("data", sa.Text(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["merchant_id"], ["merchants.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_shipment_updates_merchant_id_id",
+        "shipment_updates",
+        ["merchant_id", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_shipment_updates_created_at",
+        "shipment_updates",
+        ["created_at"],
+        unique=False,
+        postgresql_using="brin",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_shipment_updates_created_at",
+        table_name="shipment_updates",
+        postgresql_using="brin",
+    )
+    op.drop_index("ix_shipment_updates_merchant_id_id", table_name="shipment_updates")
+    op.drop_table("shipment_updates")
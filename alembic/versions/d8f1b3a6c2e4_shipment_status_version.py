@@ -0,0 +1,33 @@
+"""shipment status version
+
+Revision ID: d8f1b3a6c2e4
+Revises: c5e8a2d9f713
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d8f1b3a6c2e4"
+down_revision: Union[str, Sequence[str], None] = "c5e8a2d9f713"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A constant default is stored in the catalog; existing rows are not rewritten.
+    op.add_column(
+        "shipments",
+        sa.Column("status_version", sa.Integer(), server_default=sa.text("1"), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("shipments", "status_version")
@@ -0,0 +1,54 @@
+"""inbox shipment ordering
+
+Revision ID: e7a4c1d9b5f2
+Revises: d8f1b3a6c2e4
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e7a4c1d9b5f2"
+down_revision: Union[str, Sequence[str], None] = "d8f1b3a6c2e4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("carrier_event_inbox", sa.Column("merchant_id", sa.UUID(), nullable=True))
+    op.add_column(
+        "carrier_event_inbox",
+        sa.Column("external_reference", sa.String(length=255), nullable=True),
+    )
+    # Every queued payload passed ExternalCarrierEvent validation, so both fields are present.
+    op.execute(
+        "UPDATE carrier_event_inbox "
+        "SET merchant_id = (payload->>'merchant_id')::uuid, "
+        "external_reference = payload->>'external_reference'"
+    )
+    op.alter_column("carrier_event_inbox", "merchant_id", nullable=False)
+    op.alter_column("carrier_event_inbox", "external_reference", nullable=False)
+    op.create_index(
+        "ix_carrier_event_inbox_shipment_unfinished",
+        "carrier_event_inbox",
+        ["merchant_id", "external_reference", "received_at"],
+        unique=False,
+        postgresql_where=sa.text("status IN ('pending', 'processing')"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_carrier_event_inbox_shipment_unfinished",
+        table_name="carrier_event_inbox",
+        postgresql_where=sa.text("status IN ('pending', 'processing')"),
+    )
+    op.drop_column("carrier_event_inbox", "external_reference")
+    op.drop_column("carrier_event_inbox", "merchant_id")
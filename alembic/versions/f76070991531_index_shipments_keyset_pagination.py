@@ -0,0 +1,41 @@
+"""index shipments for keyset pagination
+
+Revision ID: f76070991531
+Revises: f2c9a7b6d3e1
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f76070991531"
+down_revision: Union[str, Sequence[str], None] = "f2c9a7b6d3e1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_shipments_created_at_id", "shipments", ["created_at", "id"], unique=False)
+    op.create_index(
+        "ix_shipments_merchant_id_created_at_id",
+        "shipments",
+        ["merchant_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_shipments_merchant_id_status_created_at_id",
+        "shipments",
+        ["merchant_id", "status", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_shipments_merchant_id_status_created_at_id", table_name="shipments")
+    op.drop_index("ix_shipments_merchant_id_created_at_id", table_name="shipments")
+    op.drop_index("ix_shipments_created_at_id", table_name="shipments")
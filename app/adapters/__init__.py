@@ -1,6 +1,5 @@
-from app.adapters.base import AdapterResult, CarrierAdapter
-from app.adapters.carrier_stub import MockCarrierAdapter
-from app.adapters.registry import get_adapter
+from app.adapters.base import AdapterResult, CarrierAdapter, external_event_key, ingest_many
+from app.adapters.registry import available_carriers, get_adapter
 from app.adapters.schemas import ExternalCarrierEvent
 
 __all__ = [
@@ -8,5 +7,17 @@ __all__ = [
     "CarrierAdapter",
     "ExternalCarrierEvent",
     "MockCarrierAdapter",
+    "available_carriers",
+    "external_event_key",
     "get_adapter",
+    "ingest_many",
 ]
+
+
+def __getattr__(name: str):
+    # Concrete adapters are imported on first use; see app.adapters.registry.
+    if name == "MockCarrierAdapter":
+        from app.adapters.carrier_stub import MockCarrierAdapter
+
+        return MockCarrierAdapter
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import hashlib
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Protocol
+from datetime import datetime, timezone
+from typing import Protocol, Sequence
 from uuid import UUID
 
 from app.domain.shipment import ShipmentStatus
@@ -17,8 +18,50 @@ class AdapterResult:
     occurred_at: datetime
     shipment_status: ShipmentStatus | None = None
     reason: str | None = None
+    # Identifies the carrier event across webhook retries; see external_event_key.
+    dedup_key: str | None = None
+
+
+def external_event_key(
+    carrier: str,
+    merchant_id: UUID,
+    external_reference: str,
+    event_code: str,
+    occurred_at: datetime,
+) -> str:
+    """Hex SHA-256 of the fields a carrier repeats verbatim when it resends an event."""
+    if occurred_at.tzinfo is not None:
+        occurred_at = occurred_at.astimezone(timezone.utc)
+    parts = (carrier, str(merchant_id), external_reference, event_code, occurred_at.isoformat())
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
 
 
 class CarrierAdapter(Protocol):
+    """Translates a carrier's payloads.
+
+    Adapters that can translate a batch more cheaply than one payload at a time also define
+    ingest_events(payloads), with the same result as ingest_many.
+    """
+
     async def ingest_event(self, payload: object) -> AdapterResult:
         """Translate external payload into internal adapter result."""
+
+
+async def ingest_many(
+    adapter: CarrierAdapter, payloads: Sequence[object]
+) -> list[AdapterResult | ValueError]:
+    """Translate many payloads, returning the ValueError of a rejected payload in its place.
+
+    Uses the adapter's ingest_events when it has one, and ingest_event for each payload
+    otherwise.
+    """
+    ingest_events = getattr(adapter, "ingest_events", None)
+    if ingest_events is not None:
+        return await ingest_events(payloads)
+    results: list[AdapterResult | ValueError] = []
+    for payload in payloads:
+        try:
+            results.append(await adapter.ingest_event(payload))
+        except ValueError as e:
+            results.append(e)
+    return results
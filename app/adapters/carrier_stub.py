@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from app.adapters.base import AdapterResult, CarrierAdapter
+from app.adapters.base import AdapterResult, CarrierAdapter, external_event_key
 from app.adapters.schemas import ExternalCarrierEvent
 from app.domain.shipment import ShipmentStatus
 from app.domain.shipment_event import ShipmentEventType
@@ -31,4 +31,11 @@ class MockCarrierAdapter(CarrierAdapter):
             event_type=event_type,
             occurred_at=payload.event_time,
             shipment_status=status,
+            dedup_key=external_event_key(
+                payload.carrier,
+                payload.merchant_id,
+                payload.external_reference,
+                payload.event_code,
+                payload.event_time,
+            ),
         )
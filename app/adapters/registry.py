@@ -1,13 +1,57 @@
+"""Carrier adapters by name.
+
+Adapters are registered as entry points in the ``carrier_gateway.adapters`` group, e.g.
+
+    entry_points={"carrier_gateway.adapters": ["acme = acme_adapter:AcmeAdapter"]}
+
+and each is imported and instantiated on first use, so carriers with heavy parsing
+dependencies cost nothing until their first event arrives. Adapters shipped with the service
+are also registered below, so they resolve when the package is not installed.
+"""
+
+from functools import cache
+from importlib.metadata import EntryPoint, entry_points
+from threading import Lock
+
 from app.adapters.base import CarrierAdapter
-from app.adapters.carrier_stub import MockCarrierAdapter
 
-_REGISTRY: dict[str, CarrierAdapter] = {
-    "mock": MockCarrierAdapter(),
+ENTRY_POINT_GROUP = "carrier_gateway.adapters"
+
+_BUILTIN_ADAPTERS = {
+    "mock": "app.adapters.carrier_stub:MockCarrierAdapter",
 }
 
+_adapters: dict[str, CarrierAdapter] = {}
+_lock = Lock()
+
+
+@cache
+def _entry_points() -> dict[str, EntryPoint]:
+    registered = {
+        name: EntryPoint(name=name, value=value, group=ENTRY_POINT_GROUP)
+        for name, value in _BUILTIN_ADAPTERS.items()
+    }
+    registered.update(
+        {entry_point.name: entry_point for entry_point in entry_points(group=ENTRY_POINT_GROUP)}
+    )
+    return registered
+
+
+def available_carriers() -> list[str]:
+    return sorted(_entry_points())
+
 
 def get_adapter(carrier: str) -> CarrierAdapter:
-    adapter = _REGISTRY.get(carrier)
-    if not adapter:
+    adapter = _adapters.get(carrier)
+    if adapter is not None:
+        return adapter
+
+    entry_point = _entry_points().get(carrier)
+    if entry_point is None:
         raise ValueError(f"Unsupported carrier: {carrier}")
+    with _lock:
+        adapter = _adapters.get(carrier)
+        if adapter is None:
+            adapter = entry_point.load()()
+            _adapters[carrier] = adapter
     return adapter
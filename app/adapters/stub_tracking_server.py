@@ -0,0 +1,65 @@
+"""Local stand-in for a polled carrier's tracking API, for development and tests.
+
+    uvicorn app.adapters.stub_tracking_server:app --port 9100
+
+Events are added with ``POST /tracking/{external_reference}`` and served in the format
+app.adapters.tracking_client expects.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+class StubTrackingEvent(BaseModel):
+    merchant_id: UUID
+    event_code: str
+    event_time: datetime
+
+
+@dataclass
+class StubCarrier:
+    events: dict[tuple[UUID, str], list[dict]] = field(default_factory=dict)
+    # The next this many tracking requests are answered with 503.
+    failures: int = 0
+    requests: int = 0
+
+    def add_event(
+        self, merchant_id: UUID, external_reference: str, event_code: str, event_time: datetime
+    ) -> None:
+        self.events.setdefault((merchant_id, external_reference), []).append(
+            {"event_code": event_code, "event_time": event_time.isoformat()}
+        )
+
+
+def create_app(stub: StubCarrier | None = None) -> FastAPI:
+    stub = stub or StubCarrier()
+    app = FastAPI(title="Stub carrier tracking API")
+    app.state.stub = stub
+
+    @app.get("/tracking/{external_reference}")
+    def get_tracking(external_reference: str, merchant_id: UUID):
+        stub.requests += 1
+        if stub.failures > 0:
+            stub.failures -= 1
+            return JSONResponse(status_code=503, content={"error": "unavailable"})
+        events = stub.events.get((merchant_id, external_reference))
+        if events is None:
+            return JSONResponse(status_code=404, content={"error": "unknown shipment"})
+        return {"events": events}
+
+    @app.post("/tracking/{external_reference}", status_code=201)
+    def add_tracking_event(external_reference: str, payload: StubTrackingEvent):
+        stub.add_event(
+            payload.merchant_id, external_reference, payload.event_code, payload.event_time
+        )
+        return {"events": stub.events[(payload.merchant_id, external_reference)]}
+
+    return app
+
+
+app = create_app()
@@ -0,0 +1,137 @@
+"""Outbound client for carrier tracking APIs that have to be polled.
+
+A polled carrier serves ``GET {base_url}/tracking/{external_reference}?merchant_id=...``
+answering ``{"events": [{"event_code": ..., "event_time": ...}, ...]}`` with the shipment's
+history; 404 means the carrier does not know the shipment yet. Events are returned as
+ExternalCarrierEvent payloads for the carrier's adapter, and events seen on an earlier poll are
+dropped later by their dedup key.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from urllib.parse import quote
+
+import httpx
+
+from app.adapters.schemas import ExternalCarrierEvent
+from app.core.config import CarrierPollingConfig
+from app.core.metrics import record_poll
+from app.domain.shipment import Shipment
+
+# Upper bound for a single backoff delay, including a carrier's Retry-After.
+_MAX_BACKOFF_SECONDS = 60.0
+
+
+class CarrierPollingError(Exception):
+    pass
+
+
+class RateLimiter:
+    """Token bucket: rate_per_second requests on average, bursts of up to burst requests."""
+
+    def __init__(self, rate_per_second: float, burst: int = 1):
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate_per_second
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate_per_second)
+
+
+class CarrierTrackingClient:
+    """Fetches tracking events of one carrier within its concurrency and rate limits.
+
+    The httpx client is shared between carriers so connections are pooled per host. Transport
+    errors, 429 and 5xx responses are retried up to max_retries times with exponential backoff
+    and jitter.
+    """
+
+    def __init__(
+        self,
+        carrier: str,
+        config: CarrierPollingConfig,
+        http: httpx.AsyncClient,
+        max_retries: int = 3,
+        backoff_seconds: float = 0.5,
+    ):
+        self.carrier = carrier
+        self.base_url = config.base_url.rstrip("/")
+        self.http = http
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self._semaphore = asyncio.Semaphore(config.concurrency)
+        self._rate_limiter = RateLimiter(config.rate_per_second, burst=config.concurrency)
+
+    async def fetch_events(self, shipment: Shipment) -> list[ExternalCarrierEvent]:
+        """The shipment's tracking history in event time order."""
+        url = f"{self.base_url}/tracking/{quote(shipment.external_reference, safe='')}"
+        params = {"merchant_id": str(shipment.merchant_id)}
+        async with self._semaphore:
+            attempt = 0
+            while True:
+                await self._rate_limiter.acquire()
+                retry_after = None
+                try:
+                    response = await self.http.get(url, params=params)
+                except httpx.TransportError as e:
+                    error = f"{type(e).__name__}: {e}"
+                else:
+                    if response.status_code == 404:
+                        record_poll(self.carrier, "not_found")
+                        return []
+                    if response.status_code < 400:
+                        record_poll(self.carrier, "ok")
+                        return self._parse(shipment, response.json())
+                    if response.status_code != 429 and response.status_code < 500:
+                        record_poll(self.carrier, "error")
+                        raise CarrierPollingError(
+                            f"{self.carrier} answered {response.status_code} for {url}"
+                        )
+                    error = f"HTTP {response.status_code}"
+                    retry_after = _retry_after_seconds(response)
+
+                if attempt == self.max_retries:
+                    record_poll(self.carrier, "error")
+                    raise CarrierPollingError(
+                        f"{self.carrier} tracking request failed after {attempt + 1} attempts: "
+                        f"{error}"
+                    )
+                record_poll(self.carrier, "retry")
+                delay = retry_after or random.uniform(0, self.backoff_seconds * 2**attempt)
+                await asyncio.sleep(min(delay, _MAX_BACKOFF_SECONDS))
+                attempt += 1
+
+    def _parse(self, shipment: Shipment, body: dict) -> list[ExternalCarrierEvent]:
+        events = [
+            ExternalCarrierEvent(
+                carrier=self.carrier,
+                merchant_id=shipment.merchant_id,
+                external_reference=shipment.external_reference,
+                event_code=event["event_code"],
+                event_time=event["event_time"],
+            )
+            for event in body.get("events", [])
+        ]
+        return sorted(events, key=lambda event: event.event_time)
+
+
+def _retry_after_seconds(response: httpx.Response) -> float | None:
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
@@ -0,0 +1,33 @@
+from fastapi import Request, Response
+
+from app.domain.shipment import ShipmentVersion
+
+# Clients may keep responses but must revalidate them on every use; with an ETag that costs a
+# single index lookup and an empty 304.
+CACHE_CONTROL = "private, no-cache"
+
+
+def shipment_etag(version: ShipmentVersion, representation: str) -> str:
+    """Strong ETag of one representation (shipment, shipment with events, event list)."""
+    updated_at = int(version.updated_at.timestamp() * 1_000_000) if version.updated_at else 0
+    return f'"{representation}-{updated_at:x}-{version.event_count}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored.
+    candidates = {candidate.strip().removeprefix("W/") for candidate in header.split(",")}
+    return etag in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def set_validators(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
@@ -2,7 +2,8 @@ from fastapi import APIRouter, Depends
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from app.persistence.session import get_db
+from app.core.metrics import pool_stats
+from app.persistence.session import async_engine, engine, get_db
 
 router = APIRouter(prefix="/health", tags=["health"])
 
@@ -15,4 +16,7 @@ def health():
 @router.get("/db")
 def health_db(db: Session = Depends(get_db)):
     db.execute(text("SELECT 1"))
-    return {"database": "ok"}
+    return {
+        "database": "ok",
+        "pools": {"sync": pool_stats(engine.pool), "async": pool_stats(async_engine.pool)},
+    }
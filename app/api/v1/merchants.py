@@ -1,14 +1,20 @@
+from typing import AsyncIterator
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.api.v1.errors import error_response
+from app.api.v1.streaming import SSE_HEARTBEAT, sse_message, sse_response
+from app.core.config import settings
 from app.domain.errors import DuplicatedError, NotFoundError
-from app.persistence.repositories import MerchantRepository
-from app.persistence.session import get_db
-from app.schemas.merchant import MerchantCreate, MerchantResponse
+from app.persistence.repositories import MerchantRepository, MerchantShipmentStatsRepository
+from app.persistence.session import get_async_db, get_db
+from app.schemas.merchant import MerchantCreate, MerchantResponse, MerchantStatsResponse
 from app.services.merchant_service import MerchantService
+from app.services.shipment_updates import shipment_update_broker
 
 router = APIRouter(prefix="/merchant", tags=["merchant"])
 
@@ -45,3 +51,67 @@ def get_merchant(
         return service.get_merchant(merchant_id)
     except NotFoundError as e:
         return error_response(404, "not_found", str(e))
+
+
+@router.get("/{merchant_id}/stats", response_model=MerchantStatsResponse)
+def get_merchant_stats(
+    merchant_id: UUID,
+    db: Session = Depends(get_db),
+):
+    service = MerchantService(MerchantRepository(db), MerchantShipmentStatsRepository(db))
+    try:
+        stats = service.get_stats(merchant_id)
+    except NotFoundError as e:
+        return error_response(404, "not_found", str(e))
+
+    return MerchantStatsResponse(
+        merchant_id=stats.merchant_id, total=stats.total, counts=stats.counts
+    )
+
+
+@router.get(
+    "/{merchant_id}/events/stream",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def stream_shipment_updates(
+    merchant_id: UUID,
+    last_event_id: int | None = Query(default=None, ge=0),
+    last_event_id_header: str | None = Header(default=None, alias="Last-Event-ID"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Server-sent events for the merchant's shipment status changes and tracking events.
+
+    Each event's id identifies its update in the merchant's update log. Browsers reconnecting
+    send the last id they received in Last-Event-ID and get every later update first; the
+    last_event_id parameter does the same for a first connection.
+    """
+    if last_event_id_header is not None:
+        try:
+            last_event_id = int(last_event_id_header)
+        except ValueError:
+            last_event_id = -1
+        if last_event_id < 0:
+            return error_response(
+                400, "invalid_last_event_id", "Last-Event-ID must be an update id"
+            )
+
+    try:
+        await db.run_sync(
+            lambda session: MerchantService(MerchantRepository(session)).get_merchant(merchant_id)
+        )
+    except NotFoundError as e:
+        return error_response(404, "not_found", str(e))
+    # The stream reads through the broker; don't hold a connection for its lifetime.
+    await db.close()
+
+    async def _messages() -> AsyncIterator[str]:
+        async for update in shipment_update_broker.stream(
+            merchant_id, last_event_id, settings.shipment_update_stream_heartbeat_seconds
+        ):
+            if update is None:
+                yield SSE_HEARTBEAT
+            else:
+                yield sse_message(update.data, update.type.value, update.id)
+
+    return sse_response(_messages())
@@ -1,26 +1,51 @@
+from datetime import datetime
+from typing import Annotated, Literal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query, Response
+from fastapi import APIRouter, Body, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.adapters.base import AdapterResult, ingest_many
 from app.adapters.registry import get_adapter
 from app.adapters.schemas import ExternalCarrierEvent
+from app.api.v1.conditional import is_not_modified, not_modified, set_validators, shipment_etag
+from app.api.v1.encoding import json_list_response
 from app.api.v1.errors import error_response
-from app.domain.errors import NotFoundError
-from app.domain.shipment import ShipmentStatus
+from app.api.v1.streaming import ndjson_response
+from app.core.config import settings
+from app.core.metrics import UNKNOWN_CARRIER, record_ingest
+from app.domain.errors import ConflictError, NotFoundError
+from app.domain.shipment import ShipmentSort, ShipmentStatus
+from app.domain.shipment_event import ShipmentEventType
 from app.persistence.repositories import (
     MerchantRepository,
     ShipmentEventRepository,
     ShipmentRepository,
+    ShipmentUpdateRepository,
 )
-from app.persistence.session import get_db
+from app.persistence.session import get_async_db, get_db
+from app.schemas.errors import ErrorDetail
 from app.schemas.shipment_events import (
+    ExternalEventAcceptedResponse,
+    ExternalEventBatchItemResponse,
+    ExternalEventBatchResponse,
     ExternalEventIngestResponse,
     ShipmentEventCreate,
     ShipmentEventResponse,
+    ShipmentWithEventsResponse,
 )
-from app.schemas.shipments import ShipmentCreate, ShipmentResponse, ShipmentStatusUpdate
-from app.services.results import ShipmentCreateResponse
+from app.schemas.shipments import (
+    ShipmentBulkCreateResponse,
+    ShipmentBulkItemResponse,
+    ShipmentCreate,
+    ShipmentResponse,
+    ShipmentStatusUpdate,
+)
+from app.services.async_shipment_service import AsyncShipmentService
+from app.services.inbox_service import AsyncInboxService
+from app.services.results import ExternalEventResult, ShipmentCreateResponse
+from app.services.shipment_cache import shipment_cache
 from app.services.shipment_service import ShipmentService
 
 router = APIRouter(prefix="/shipments", tags=["shipments"])
@@ -35,6 +60,7 @@ def create_shipment(
     service = ShipmentService(
         ShipmentRepository(db),
         MerchantRepository(db),
+        cache=shipment_cache,
     )
     try:
         result: ShipmentCreateResponse = service.create_shipment(payload)
@@ -44,61 +70,282 @@ def create_shipment(
         return error_response(404, "not_found", str(e))
 
 
-@router.post("/events/external", response_model=ExternalEventIngestResponse)
-async def ingest_external_event(
-    payload: ExternalCarrierEvent,
+@router.post("/bulk", response_model=ShipmentBulkCreateResponse)
+def create_shipments_bulk(
+    payloads: Annotated[
+        list[ShipmentCreate],
+        Body(min_length=1, max_length=settings.shipment_bulk_max_items),
+    ],
     db: Session = Depends(get_db),
 ):
     service = ShipmentService(
         ShipmentRepository(db),
         MerchantRepository(db),
-        ShipmentEventRepository(db),
     )
+    items = []
+    for index, result in enumerate(service.create_shipments(payloads)):
+        if result.error_code:
+            items.append(
+                ShipmentBulkItemResponse(
+                    index=index,
+                    error=ErrorDetail(code=result.error_code, message=result.error_message),
+                )
+            )
+        else:
+            items.append(
+                ShipmentBulkItemResponse(
+                    index=index,
+                    created=result.created,
+                    shipment=ShipmentResponse.model_validate(result.shipment),
+                )
+            )
+
+    created = sum(1 for item in items if item.created)
+    failed = sum(1 for item in items if item.error)
+    return ShipmentBulkCreateResponse(
+        created=created,
+        existing=len(items) - created - failed,
+        failed=failed,
+        items=items,
+    )
+
+
+@router.post(
+    "/events/external",
+    response_model=ExternalEventIngestResponse | ExternalEventAcceptedResponse,
+    responses={202: {"model": ExternalEventAcceptedResponse}},
+)
+async def ingest_external_event(
+    payload: ExternalCarrierEvent,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+):
+    if settings.external_event_ingest_mode == "inbox":
+        try:
+            get_adapter(payload.carrier)
+        except ValueError as e:
+            record_ingest(UNKNOWN_CARRIER, "invalid_external_event")
+            return error_response(400, "invalid_external_event", str(e))
+        entry = await AsyncInboxService(db).enqueue(payload)
+        record_ingest(payload.carrier, "queued")
+        response.status_code = 202
+        return ExternalEventAcceptedResponse.model_validate(entry)
+
+    service = AsyncShipmentService(db)
     try:
         adapter = get_adapter(payload.carrier)
+    except ValueError as e:
+        record_ingest(UNKNOWN_CARRIER, "invalid_external_event")
+        return error_response(400, "invalid_external_event", str(e))
+
+    try:
         adapter_result = await adapter.ingest_event(payload)
-        shipment, event = service.process_external_event(adapter_result)
-        return ExternalEventIngestResponse(
-            shipment=ShipmentResponse.model_validate(shipment),
-            event=ShipmentEventResponse.model_validate(event),
-        )
     except ValueError as e:
+        record_ingest(payload.carrier, "invalid_external_event")
+        return error_response(400, "invalid_external_event", str(e))
+
+    try:
+        shipment, event = await service.process_external_event(adapter_result)
+    except ValueError as e:
+        record_ingest(payload.carrier, "invalid_transition")
         return error_response(400, "invalid_external_event", str(e))
     except NotFoundError as e:
+        record_ingest(payload.carrier, "not_found")
         return error_response(404, "not_found", str(e))
+    except ConflictError as e:
+        record_ingest(payload.carrier, "conflict")
+        return error_response(409, "conflict", str(e))
+
+    record_ingest(payload.carrier, "processed")
+    return ExternalEventIngestResponse(
+        shipment=ShipmentResponse.model_validate(shipment),
+        event=ShipmentEventResponse.model_validate(event),
+    )
+
+
+@router.post("/events/external/batch", response_model=ExternalEventBatchResponse)
+async def ingest_external_events(
+    payloads: Annotated[
+        list[ExternalCarrierEvent],
+        Body(min_length=1, max_length=settings.external_event_batch_max_items),
+    ],
+    db: AsyncSession = Depends(get_async_db),
+):
+    service = AsyncShipmentService(db)
+
+    results: list[ExternalEventResult | None] = [None] * len(payloads)
+    carriers = [UNKNOWN_CARRIER] * len(payloads)
+    indexes_by_carrier: dict[str, list[int]] = {}
+    for index, payload in enumerate(payloads):
+        try:
+            get_adapter(payload.carrier)
+        except ValueError as e:
+            results[index] = ExternalEventResult(
+                error_code="invalid_external_event", error_message=str(e)
+            )
+            continue
+        carriers[index] = payload.carrier
+        indexes_by_carrier.setdefault(payload.carrier, []).append(index)
+
+    # Each adapter translates all of its payloads in one call.
+    translated: dict[int, AdapterResult] = {}
+    for carrier, indexes in indexes_by_carrier.items():
+        outcomes = await ingest_many(get_adapter(carrier), [payloads[i] for i in indexes])
+        for index, outcome in zip(indexes, outcomes):
+            if isinstance(outcome, ValueError):
+                results[index] = ExternalEventResult(
+                    error_code="invalid_external_event", error_message=str(outcome)
+                )
+            else:
+                translated[index] = outcome
+
+    adapter_results = [translated[index] for index in sorted(translated)]
+    try:
+        processed = iter(await service.process_external_events(adapter_results))
+    except ConflictError as e:
+        for index, result in enumerate(results):
+            record_ingest(carriers[index], result.error_code if result else "conflict")
+        return error_response(409, "conflict", str(e))
+    items = []
+    for index, result in enumerate(results):
+        result = result or next(processed)
+        record_ingest(carriers[index], result.error_code or "processed")
+        if result.error_code:
+            items.append(
+                ExternalEventBatchItemResponse(
+                    index=index,
+                    error=ErrorDetail(code=result.error_code, message=result.error_message),
+                )
+            )
+        else:
+            items.append(
+                ExternalEventBatchItemResponse(
+                    index=index,
+                    shipment=ShipmentResponse.model_validate(result.shipment),
+                    event=ShipmentEventResponse.model_validate(result.event),
+                )
+            )
+
+    failed = sum(1 for item in items if item.error)
+    return ExternalEventBatchResponse(
+        processed=len(items) - failed,
+        failed=failed,
+        items=items,
+    )
+
+
+@router.get("/export")
+def export_shipments(
+    merchant_id: UUID | None = None,
+    status: ShipmentStatus | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    db: Session = Depends(get_db),
+):
+    service = ShipmentService(
+        ShipmentRepository(db),
+        MerchantRepository(db),
+    )
+    shipments = service.export_shipments(
+        merchant_id=merchant_id,
+        status=status,
+        created_from=created_from,
+        created_to=created_to,
+    )
+    return ndjson_response(shipments, ShipmentResponse)
+
+
+@router.get("/events/export")
+def export_shipment_events(
+    merchant_id: UUID | None = None,
+    shipment_id: UUID | None = None,
+    occurred_from: datetime | None = None,
+    occurred_to: datetime | None = None,
+    db: Session = Depends(get_db),
+):
+    service = ShipmentService(
+        ShipmentRepository(db),
+        MerchantRepository(db),
+        ShipmentEventRepository(db),
+    )
+    events = service.export_events(
+        merchant_id=merchant_id,
+        shipment_id=shipment_id,
+        occurred_from=occurred_from,
+        occurred_to=occurred_to,
+    )
+    return ndjson_response(events, ShipmentEventResponse)
 
 
 @router.get("", response_model=list[ShipmentResponse])
 def list_shipments(
+    response: Response,
     merchant_id: UUID | None = None,
     status: ShipmentStatus | None = None,
     limit: int = Query(default=50, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
+    cursor: str | None = None,
+    last_event_type: ShipmentEventType | None = None,
+    sort: ShipmentSort = "created_at",
     db: Session = Depends(get_db),
 ):
+    if cursor and offset:
+        return error_response(400, "invalid_cursor", "cursor and offset cannot be combined")
+
     service = ShipmentService(
         ShipmentRepository(db),
         MerchantRepository(db),
     )
-    return service.list_shipments(
-        merchant_id=merchant_id,
-        status=status,
-        limit=limit,
-        offset=offset,
-    )
+    try:
+        page = service.list_shipments(
+            merchant_id=merchant_id,
+            status=status,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            last_event_type=last_event_type,
+            sort=sort,
+        )
+    except ValueError as e:
+        return error_response(400, "invalid_cursor", str(e))
 
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    return json_list_response(page.items, ShipmentResponse, response)
 
-@router.get("/{shipment_id}", response_model=ShipmentResponse)
+
+@router.get("/{shipment_id}", response_model=ShipmentWithEventsResponse | ShipmentResponse)
 def get_shipment(
     shipment_id: UUID,
+    request: Request,
+    response: Response,
+    include: list[Literal["events"]] = Query(default=[]),
     db: Session = Depends(get_db),
 ):
     service = ShipmentService(
         ShipmentRepository(db),
         MerchantRepository(db),
+        ShipmentEventRepository(db),
+        cache=shipment_cache,
     )
+    representation = "shipment-events" if "events" in include else "shipment"
     try:
-        return service.get_shipment(shipment_id)
+        # A revalidation costs one lookup of the version columns when nothing changed.
+        if request.headers.get("if-none-match"):
+            etag = shipment_etag(service.get_shipment_version(shipment_id), representation)
+            if is_not_modified(request, etag):
+                return not_modified(etag)
+
+        if "events" in include:
+            detail = service.get_shipment_with_events(shipment_id)
+            set_validators(response, shipment_etag(detail.shipment.version, representation))
+            return ShipmentWithEventsResponse(
+                **ShipmentResponse.model_validate(detail.shipment).model_dump(),
+                events=[ShipmentEventResponse.model_validate(e) for e in detail.events],
+            )
+        shipment = service.get_shipment(shipment_id)
+        set_validators(response, shipment_etag(shipment.version, representation))
+        return shipment
     except NotFoundError as e:
         return error_response(404, "not_found", str(e))
 
@@ -112,6 +359,8 @@ def update_shipment_status(
     service = ShipmentService(
         ShipmentRepository(db),
         MerchantRepository(db),
+        cache=shipment_cache,
+        update_repo=ShipmentUpdateRepository(db),
     )
     try:
         return service.update_status(shipment_id, payload.status)
@@ -119,6 +368,8 @@ def update_shipment_status(
         return error_response(404, "not_found", str(e))
     except ValueError as e:
         return error_response(400, "invalid_transition", str(e))
+    except ConflictError as e:
+        return error_response(409, "conflict", str(e))
 
 
 @router.post("/{shipment_id}/events", response_model=ShipmentEventResponse)
@@ -131,6 +382,8 @@ def add_shipment_event(
         ShipmentRepository(db),
         MerchantRepository(db),
         ShipmentEventRepository(db),
+        cache=shipment_cache,
+        update_repo=ShipmentUpdateRepository(db),
     )
     try:
         return service.add_event(shipment_id, payload)
@@ -141,14 +394,25 @@ def add_shipment_event(
 @router.get("/{shipment_id}/events", response_model=list[ShipmentEventResponse])
 def list_shipment_events(
     shipment_id: UUID,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
 ):
     service = ShipmentService(
         ShipmentRepository(db),
         MerchantRepository(db),
         ShipmentEventRepository(db),
+        cache=shipment_cache,
     )
     try:
-        return service.list_events(shipment_id)
+        if request.headers.get("if-none-match"):
+            etag = shipment_etag(service.get_shipment_version(shipment_id), "events")
+            if is_not_modified(request, etag):
+                return not_modified(etag)
+
+        # Loading the shipment with its events yields the version the list was read at.
+        detail = service.get_shipment_with_events(shipment_id)
+        set_validators(response, shipment_etag(detail.shipment.version, "events"))
+        return json_list_response(detail.events, ShipmentEventResponse, response)
     except NotFoundError as e:
         return error_response(404, "not_found", str(e))
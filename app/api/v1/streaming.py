@@ -0,0 +1,45 @@
+from itertools import islice
+from typing import AsyncIterable, Iterable, Iterator
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from app.api.v1.encoding import encode_json_lines
+
+# Lines per chunk handed to the server; sync iterators are advanced in the threadpool, so
+# yielding single rows would pay one thread hop per row.
+_CHUNK_LINES = 500
+
+
+def _ndjson_chunks(items: Iterable[object], schema: type[BaseModel]) -> Iterator[bytes]:
+    items = iter(items)
+    while chunk := list(islice(items, _CHUNK_LINES)):
+        yield encode_json_lines(chunk, schema)
+
+
+def ndjson_response(items: Iterable[object], schema: type[BaseModel]) -> StreamingResponse:
+    return StreamingResponse(_ndjson_chunks(items, schema), media_type="application/x-ndjson")
+
+
+# Sent when a server-sent event stream is idle, so proxies keep the connection open and
+# disconnected clients are noticed.
+SSE_HEARTBEAT = ": keep-alive\n\n"
+
+
+def sse_message(data: str, event: str | None = None, event_id: int | str | None = None) -> str:
+    """One server-sent event; data must not contain newlines."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {data}")
+    return "\n".join(lines) + "\n\n"
+
+
+def sse_response(messages: AsyncIterable[str]) -> StreamingResponse:
+    return StreamingResponse(
+        messages,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
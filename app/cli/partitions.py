@@ -0,0 +1,52 @@
+import argparse
+import logging
+
+from app.core.config import settings
+from app.persistence.partitions import (
+    add_months,
+    create_partitions,
+    current_month,
+    drop_partitions_before,
+)
+from app.persistence.session import engine
+
+logger = logging.getLogger(__name__)
+
+
+def maintain(months_ahead: int, retention_months: int | None, keep_detached: bool = False) -> None:
+    month = current_month()
+    with engine.begin() as connection:
+        for name in create_partitions(connection, month, add_months(month, months_ahead)):
+            logger.info("Created partition %s", name)
+        if retention_months is not None:
+            cutoff = add_months(month, -retention_months)
+            for name in drop_partitions_before(connection, cutoff, keep_detached):
+                logger.info("%s partition %s", "Detached" if keep_detached else "Dropped", name)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Create upcoming shipment_events partitions and apply the retention policy."
+    )
+    parser.add_argument(
+        "--months-ahead", type=int, default=settings.shipment_event_partition_months_ahead
+    )
+    parser.add_argument(
+        "--retention-months",
+        type=int,
+        default=settings.shipment_event_retention_months,
+        help="Remove events from before this many whole months ago (default: keep everything).",
+    )
+    parser.add_argument(
+        "--keep-detached",
+        action="store_true",
+        help="Detach expired partitions but keep their tables, e.g. for archiving.",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    maintain(args.months_ahead, args.retention_months, args.keep_detached)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import argparse
+import logging
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.persistence.repositories import ShipmentUpdateRepository
+from app.persistence.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def prune(retention_hours: int) -> int:
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=retention_hours)
+    with SessionLocal() as db:
+        return ShipmentUpdateRepository(db).delete_before(cutoff)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Delete shipment updates older than the retention from the stream outbox."
+    )
+    parser.add_argument(
+        "--retention-hours", type=int, default=settings.shipment_update_retention_hours
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    deleted = prune(args.retention_hours)
+    logger.info("Deleted %d shipment updates older than %d hours", deleted, args.retention_hours)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import argparse
+import logging
+from uuid import UUID
+
+from app.persistence.repositories import MerchantShipmentStatsRepository
+from app.persistence.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def reconcile(merchant_id: UUID | None = None) -> None:
+    with SessionLocal() as db:
+        MerchantShipmentStatsRepository(db).rebuild(merchant_id)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Rebuild the per-merchant shipment status counters from the shipments table."
+    )
+    parser.add_argument(
+        "--merchant-id", type=UUID, default=None, help="Only rebuild this merchant's counters."
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    reconcile(args.merchant_id)
+    logger.info("Rebuilt shipment counters for %s", args.merchant_id or "all merchants")
+
+
+if __name__ == "__main__":
+    main()
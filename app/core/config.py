@@ -1,10 +1,74 @@
+from typing import Literal
+
+from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings
 
 
+class CarrierPollingConfig(BaseModel):
+    base_url: str
+    # Requests in flight, and requests started per second, against this carrier.
+    concurrency: int = Field(8, gt=0)
+    rate_per_second: float = Field(10.0, gt=0)
+
+
 class Settings(BaseSettings):
     app_name: str = "Carrier Gateway Service"
     env: str = "test"
     database_url: str
+    external_event_batch_max_items: int = 1000
+    shipment_bulk_max_items: int = 10000
+    # "inbox" makes the external-event webhook only queue the payload and answer 202; the
+    # inbox workers (python -m app.workers.inbox_worker) apply it.
+    external_event_ingest_mode: Literal["sync", "inbox"] = "sync"
+    inbox_worker_concurrency: int = 4
+    inbox_batch_size: int = 50
+    inbox_poll_interval_seconds: float = 1.0
+    inbox_claim_timeout_seconds: float = 300
+    inbox_max_attempts: int = 5
+    # Recently processed carrier event keys kept per process to answer webhook retries without
+    # a database round trip; 0 disables the cache.
+    external_event_dedup_cache_size: int = 10000
+    # In-process cache of shipments read by id or reference; 0 disables it. Other processes'
+    # writes invalidate entries through LISTEN/NOTIFY, and the TTL bounds staleness if a
+    # notification is missed.
+    shipment_cache_size: int = 10000
+    shipment_cache_ttl_seconds: float = 30
+    # Merchant update streams (GET /merchant/{id}/events/stream). A client that falls this many
+    # updates behind is disconnected and resumes from Last-Event-ID; updates older than the
+    # retention are pruned by python -m app.cli.prune_shipment_updates.
+    shipment_update_stream_queue_size: int = 1000
+    shipment_update_stream_heartbeat_seconds: float = 15
+    shipment_update_retention_hours: int = 72
+    # Carriers without webhooks, polled by python -m app.workers.carrier_poller. Set as JSON, e.g.
+    # CARRIER_POLLING='{"acme": {"base_url": "https://tracking.acme.test", "rate_per_second": 5}}'.
+    carrier_polling: dict[str, CarrierPollingConfig] = {}
+    carrier_poll_interval_seconds: float = 300
+    carrier_poll_batch_size: int = 200
+    carrier_poll_timeout_seconds: float = 10
+    carrier_poll_max_retries: int = 3
+    # Events per carrier whose outcome is final, kept per poller process so the history
+    # returned by every poll is neither applied nor counted again.
+    carrier_poll_settled_events: int = 100000
+    # shipment_events partition maintenance (python -m app.cli.partitions); no retention limit
+    # by default.
+    shipment_event_partition_months_ahead: int = 3
+    shipment_event_retention_months: int | None = None
+    # Connection pool of each engine; the API process has a sync and an async engine.
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: float = 30
+    db_pool_recycle_seconds: int = 1800
+    # Pre-ping costs a round trip per checkout; with recycling it can be turned off where the
+    # database is not restarted under a running service.
+    db_pool_pre_ping: bool = True
+    # Server-side statement timeout; 0 disables it.
+    db_statement_timeout_ms: int = 0
+    # psycopg prepares a statement after this many executions on a connection. Server-side
+    # prepared statements must be disabled behind PgBouncer in transaction mode.
+    db_prepared_statements: bool = True
+    db_prepare_threshold: int = 5
+    # Worker threads for sync endpoints; defaults to the sync pool's size plus overflow.
+    threadpool_max_threads: int | None = None
 
     model_config = {
         "env_file": ".env",
@@ -0,0 +1,211 @@
+import time
+from contextvars import ContextVar
+
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import REGISTRY, GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+UNMATCHED_ROUTE = "unmatched"
+BACKGROUND_ROUTE = "background"
+# Carrier label for payloads naming a carrier without an adapter, keeping label values bounded.
+UNKNOWN_CARRIER = "unknown"
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template and status code.",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served.",
+)
+DB_QUERIES = Counter(
+    "db_queries_total",
+    "SQL statements executed, by the route that issued them.",
+    ["route"],
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "SQL statement execution time, by the route that issued it.",
+    ["route"],
+)
+DB_POOL_CHECKOUTS = Counter(
+    "db_pool_checkouts_total",
+    "Connections checked out of the pool.",
+    ["pool"],
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a pooled connection, including opening new ones.",
+    ["pool"],
+)
+CARRIER_EVENTS_INGESTED = Counter(
+    "carrier_events_ingested_total",
+    "External carrier events by carrier and outcome.",
+    ["carrier", "outcome"],
+)
+CARRIER_POLL_REQUESTS = Counter(
+    "carrier_poll_requests_total",
+    "Tracking API requests to polled carriers by carrier and outcome.",
+    ["carrier", "outcome"],
+)
+SHIPMENT_CACHE_LOOKUPS = Counter(
+    "shipment_cache_lookups_total",
+    "In-process shipment cache lookups by result (hit or miss).",
+    ["result"],
+)
+SHIPMENT_CACHE_EVICTIONS = Counter(
+    "shipment_cache_evictions_total",
+    "Entries removed from the shipment cache by reason (size, expired or invalidated).",
+    ["reason"],
+)
+SHIPMENT_CACHE_ENTRIES = Gauge(
+    "shipment_cache_entries",
+    "Shipments currently held in the in-process cache.",
+)
+SHIPMENT_STATUS_CONFLICTS = Counter(
+    "shipment_status_conflicts_total",
+    "Status changes that lost the race with a concurrent change of the same shipment, by "
+    "operation and outcome (retried, or rejected once the attempts ran out).",
+    ["operation", "outcome"],
+)
+SHIPMENT_UPDATE_STREAMS = Gauge(
+    "shipment_update_streams",
+    "Merchant update streams currently connected to this process.",
+)
+SHIPMENT_UPDATES_DELIVERED = Counter(
+    "shipment_updates_delivered_total",
+    "Shipment updates sent to stream clients, by how they were read (live or replay).",
+    ["source"],
+)
+
+# The ASGI scope of the request being served. FastAPI records the matched route in the scope
+# during routing, so database hooks can attribute statements to the route template.
+_request_scope: ContextVar[Scope | None] = ContextVar("request_scope", default=None)
+
+
+def _route_label(scope: Scope | None) -> str:
+    if scope is None:
+        return BACKGROUND_ROUTE
+    return getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+
+
+def record_ingest(carrier: str, outcome: str) -> None:
+    CARRIER_EVENTS_INGESTED.labels(carrier=carrier, outcome=outcome).inc()
+
+
+def record_poll(carrier: str, outcome: str) -> None:
+    CARRIER_POLL_REQUESTS.labels(carrier=carrier, outcome=outcome).inc()
+
+
+class PrometheusMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        token = _request_scope.set(scope)
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_DURATION.labels(
+                method=scope["method"], route=_route_label(scope), status=str(status_code)
+            ).observe(time.perf_counter() - start)
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            _request_scope.reset(token)
+
+
+class _TimedPoolMixin:
+    metrics_name = "default"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.labels(pool=self.metrics_name).observe(time.perf_counter() - start)
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    metrics_name = "sync"
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    metrics_name = "async"
+
+
+def pool_stats(pool: QueuePool) -> dict[str, int]:
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+    }
+
+
+class _PoolCollector:
+    """Reports size, checked-out and overflow connections of instrumented pools at scrape time."""
+
+    def __init__(self):
+        self.pools: dict[str, Pool] = {}
+
+    def collect(self):
+        checked_out = GaugeMetricFamily(
+            "db_pool_checked_out_connections", "Connections currently in use.", labels=["pool"]
+        )
+        overflow = GaugeMetricFamily(
+            "db_pool_overflow_connections",
+            "Connections opened beyond the pool size.",
+            labels=["pool"],
+        )
+        size = GaugeMetricFamily("db_pool_size", "Configured pool size.", labels=["pool"])
+        for name, pool in self.pools.items():
+            if isinstance(pool, QueuePool):
+                stats = pool_stats(pool)
+                checked_out.add_metric([name], stats["checked_out"])
+                overflow.add_metric([name], stats["overflow"])
+                size.add_metric([name], stats["size"])
+        yield checked_out
+        yield overflow
+        yield size
+
+
+_pool_collector = _PoolCollector()
+REGISTRY.register(_pool_collector)
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Attach query and pool metrics to an engine (pass ``sync_engine`` for async engines)."""
+    _pool_collector.pools[name] = engine.pool
+
+    @event.listens_for(engine.pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKOUTS.labels(pool=name).inc()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        route = _route_label(_request_scope.get())
+        DB_QUERIES.labels(route=route).inc()
+        DB_QUERY_DURATION.labels(route=route).observe(
+            time.perf_counter() - context._metrics_query_start
+        )
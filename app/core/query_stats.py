@@ -0,0 +1,103 @@
+import logging
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = "X-Query-Count"
+# An identical SELECT executed this many times in one request is reported as a likely N+1.
+REPEATED_SHAPE_THRESHOLD = 3
+
+_PARAMETER = re.compile(r"%\([^)]+\)s|\$\d+")
+_PARAMETER_LIST = re.compile(r"\?(?:, \?)+")
+
+
+def statement_shape(statement: str) -> str:
+    """Statement text with parameters and expanded IN lists collapsed to a single ``?``."""
+    return _PARAMETER_LIST.sub("?", _PARAMETER.sub("?", statement))
+
+
+@dataclass
+class QueryStats:
+    statements: list[str] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def repeated(self, threshold: int = REPEATED_SHAPE_THRESHOLD) -> dict[str, int]:
+        """SELECT shapes executed at least threshold times, with their counts."""
+        shapes = Counter(
+            statement_shape(statement)
+            for statement in self.statements
+            if statement.lstrip().upper().startswith("SELECT")
+        )
+        return {shape: count for shape, count in shapes.items() if count >= threshold}
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Collect the statements executed in the current context (request, task or thread)."""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def instrument_query_stats(engine: Engine) -> None:
+    """Record statements into the active QueryStats (pass ``sync_engine`` for async engines)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.statements.append(statement)
+
+
+class QueryStatsMiddleware:
+    """Counts statements per request and logs likely N+1 patterns.
+
+    With expose_header, the count so far is sent in the X-Query-Count response header; for
+    streamed responses that excludes statements run while the body is being sent.
+    """
+
+    def __init__(self, app: ASGIApp, expose_header: bool = False):
+        self.app = app
+        self.expose_header = expose_header
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start" and self.expose_header:
+                    MutableHeaders(scope=message).append(QUERY_COUNT_HEADER, str(stats.count))
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+        for shape, count in stats.repeated().items():
+            logger.warning(
+                "Possible N+1 in %s %s: statement executed %d times: %s",
+                scope["method"],
+                scope["path"],
+                count,
+                shape,
+            )
@@ -4,3 +4,7 @@ class NotFoundError(Exception):
 
 class DuplicatedError(Exception):
     pass
+
+
+class ConflictError(Exception):
+    pass
@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+from enum import Enum
+from uuid import UUID
+
+
+class InboxEventStatus(str, Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    PROCESSED = "processed"
+    FAILED = "failed"
+
+
+@dataclass
+class InboxEntry:
+    id: UUID
+    carrier: str
+    payload: dict
+    status: InboxEventStatus
+    attempts: int
@@ -1,8 +1,20 @@
 from dataclasses import dataclass
 from uuid import UUID
 
+from app.domain.shipment import ShipmentStatus
+
 
 @dataclass
 class Merchant:
     id: UUID
     name: str
+
+
+@dataclass
+class MerchantStats:
+    merchant_id: UUID
+    counts: dict[ShipmentStatus, int]
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
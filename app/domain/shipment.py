@@ -1,7 +1,11 @@
 from dataclasses import dataclass
+from datetime import datetime
 from enum import Enum
+from typing import Literal
 from uuid import UUID
 
+from app.domain.shipment_event import ShipmentEventType
+
 
 class ShipmentStatus(str, Enum):
     CREATED = "created"
@@ -11,6 +15,14 @@ class ShipmentStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
+@dataclass(frozen=True)
+class ShipmentVersion:
+    """Changes whenever anything in a shipment's representation, its events included, does."""
+
+    updated_at: datetime | None
+    event_count: int
+
+
 @dataclass
 class Shipment:
     id: UUID
@@ -18,6 +30,18 @@ class Shipment:
     name: str
     external_reference: str | None
     status: ShipmentStatus
+    carrier: str | None = None
+    last_event_type: ShipmentEventType | None = None
+    last_event_at: datetime | None = None
+    event_count: int = 0
+    updated_at: datetime | None = None
+
+    @property
+    def version(self) -> ShipmentVersion:
+        return ShipmentVersion(updated_at=self.updated_at, event_count=self.event_count)
+
+
+ShipmentSort = Literal["created_at", "last_event_at"]
 
 
 ALLOWED_TRANSITIONS = {
@@ -33,6 +57,10 @@ ALLOWED_TRANSITIONS = {
 }
 
 
+# Statuses a shipment can still leave; carriers without webhooks are polled for these.
+ACTIVE_STATUSES = frozenset(status for status, targets in ALLOWED_TRANSITIONS.items() if targets)
+
+
 def can_transition(current: ShipmentStatus, target: ShipmentStatus) -> bool:
     if current == target:
         return True
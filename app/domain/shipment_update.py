@@ -0,0 +1,36 @@
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from uuid import UUID
+
+from app.domain.shipment import ShipmentStatus
+
+
+class ShipmentUpdateType(str, Enum):
+    STATUS = "shipment.status"
+    EVENT = "shipment.event"
+
+
+@dataclass(frozen=True)
+class ShipmentStatusChange:
+    shipment_id: UUID
+    status: ShipmentStatus
+    previous_status: ShipmentStatus
+
+
+@dataclass
+class ShipmentUpdate:
+    """A change to one of a merchant's shipments, as delivered to update streams.
+
+    data is the JSON of the ShipmentStatusChange or ShipmentTrackingEvent. Updates are ordered
+    by (xid, id): xid is the id of the transaction that recorded the update, and ids increase
+    within it.
+    """
+
+    id: int
+    xid: int
+    merchant_id: UUID
+    shipment_id: UUID
+    type: ShipmentUpdateType
+    data: str
+    created_at: datetime
@@ -1,11 +1,47 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1.health import router as health_router
 from app.api.v1.merchants import router as merchants_router
+from app.api.v1.metrics import router as metrics_router
 from app.api.v1.shipments import router as shipments_router
+from app.core.config import settings
+from app.core.metrics import PrometheusMiddleware
+from app.core.query_stats import QUERY_COUNT_HEADER, QueryStatsMiddleware
+from app.services.shipment_cache import run_invalidation_listener, shipment_cache
+from app.services.shipment_updates import shipment_update_broker
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Sync endpoints run on anyio worker threads; threads beyond the pool's capacity would only
+    # queue for a connection.
+    to_thread.current_default_thread_limiter().total_tokens = (
+        settings.threadpool_max_threads or settings.db_pool_size + settings.db_max_overflow
+    )
+    stop_listeners = asyncio.Event()
+    listeners = [
+        asyncio.create_task(shipment_update_broker.run(settings.database_url, stop_listeners))
+    ]
+    if shipment_cache.enabled:
+        listeners.append(
+            asyncio.create_task(
+                run_invalidation_listener(shipment_cache, settings.database_url, stop_listeners)
+            )
+        )
+    yield
+    stop_listeners.set()
+    for listener in listeners:
+        listener.cancel()
+        with suppress(asyncio.CancelledError):
+            await listener
 
-app = FastAPI(title="Carrier Gateway Service")
+
+app = FastAPI(title="Carrier Gateway Service", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -13,8 +49,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", QUERY_COUNT_HEADER],
 )
 
 app.include_router(merchants_router, prefix="/api/v1")
 app.include_router(shipments_router, prefix="/api/v1")
 app.include_router(health_router)
+app.include_router(metrics_router)
+
+app.add_middleware(QueryStatsMiddleware, expose_header=settings.env != "prod")
+
+# Added last so it wraps every other middleware and sees the final status code.
+app.add_middleware(PrometheusMiddleware)
@@ -1,12 +1,24 @@
 import datetime
 import uuid
 
-from sqlalchemy import DateTime, ForeignKey, Index, String, UniqueConstraint
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    ForeignKey,
+    Identity,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    text,
+)
 from sqlalchemy import Enum as SAEnum
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
+from app.domain.inbox import InboxEventStatus
 from app.domain.shipment import ShipmentStatus
 from app.domain.shipment_event import ShipmentEventSource, ShipmentEventType
 
@@ -17,6 +29,7 @@ class Base(DeclarativeBase):
 
 class MerchantModel(Base):
     __tablename__ = "merchants"
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name: Mapped[str] = mapped_column(String, nullable=False, unique=True)
@@ -39,6 +52,7 @@ class MerchantModel(Base):
 
 class UserModel(Base):
     __tablename__ = "users"
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     email: Mapped[str] = mapped_column(String(255), unique=True, index=True, nullable=False)
@@ -61,6 +75,28 @@ class ShipmentModel(Base):
             "merchant_id", "external_reference", name="_uq_shipments_merchant_external_reference"
         ),
         Index("ix_shipments_external_reference", "external_reference"),
+        Index("ix_shipments_created_at_id", "created_at", "id"),
+        Index("ix_shipments_merchant_id_created_at_id", "merchant_id", "created_at", "id"),
+        Index(
+            "ix_shipments_merchant_id_status_created_at_id",
+            "merchant_id",
+            "status",
+            "created_at",
+            "id",
+        ),
+        # Active shipments per carrier, walked by the carrier poller.
+        Index(
+            "ix_shipments_carrier_id_active",
+            "carrier",
+            "id",
+            postgresql_where=text("status IN ('created', 'in_transit')"),
+        ),
+        Index(
+            "ix_shipments_merchant_id_last_event_at_id",
+            "merchant_id",
+            text("coalesce(last_event_at, '-infinity'::timestamptz) DESC"),
+            text("id DESC"),
+        ),
     )
 
     id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -72,6 +108,8 @@ class ShipmentModel(Base):
     )
     external_reference: Mapped[str] = mapped_column(String(255), nullable=False)
     name: Mapped[str] = mapped_column(String, nullable=False)
+    # Adapter name of the carrier tracking the shipment; needed to poll carriers without webhooks.
+    carrier: Mapped[str | None] = mapped_column(String(64), nullable=True)
     created_at: Mapped[datetime.datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -84,7 +122,7 @@ class ShipmentModel(Base):
         order_by="ShipmentEventModel.occurred_at",
         back_populates="shipment",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        lazy="raise",
     )
     status: Mapped[ShipmentStatus] = mapped_column(
         SAEnum(
@@ -94,11 +132,39 @@ class ShipmentModel(Base):
         ),
         nullable=False,
     )
+    # Summary of the events, kept current by the services so list views need no event rows.
+    last_event_type: Mapped[ShipmentEventType | None] = mapped_column(
+        SAEnum(
+            ShipmentEventType,
+            name="shipment_event_type",
+            values_callable=lambda enum: [e.value for e in enum],
+        ),
+        nullable=True,
+    )
+    last_event_at: Mapped[datetime.datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    event_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default=text("0")
+    )
+    # Incremented by every ORM flush of the row, i.e. every status change; the UPDATE only
+    # applies while the row still has the version that was read, and otherwise raises
+    # StaleDataError. The event summary columns are updated in place and leave it alone.
+    status_version: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("1"))
+
+    __mapper_args__ = {"eager_defaults": True, "version_id_col": status_version}
 
 
 class ShipmentEventModel(Base):
     __tablename__ = "shipment_events"
-    __table_args__ = (Index("ix_shipment_events_shipment_id", "shipment_id"),)
+    __mapper_args__ = {"eager_defaults": True}
+    # Range-partitioned by month on occurred_at (see app/persistence/partitions.py), so the
+    # primary key includes the partition key.
+    __table_args__ = (
+        Index("ix_shipment_events_shipment_id_occurred_at", "shipment_id", "occurred_at"),
+        Index("uq_shipment_events_dedup_key_occurred_at", "dedup_key", "occurred_at", unique=True),
+        {"postgresql_partition_by": "RANGE (occurred_at)"},
+    )
 
     id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     shipment_id: Mapped[UUID] = mapped_column(
@@ -118,9 +184,11 @@ class ShipmentEventModel(Base):
         SAEnum(ShipmentEventSource, name="shipment_event_source"), nullable=False
     )
     reason: Mapped[str | None] = mapped_column(String, nullable=True)
+    # Set for carrier events (AdapterResult.dedup_key) so webhook retries are stored once.
+    dedup_key: Mapped[str | None] = mapped_column(String(64), nullable=True)
 
     occurred_at: Mapped[datetime.datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now(), nullable=False
+        DateTime(timezone=True), primary_key=True, server_default=func.now()
     )
     created_at: Mapped[datetime.datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
@@ -128,3 +196,101 @@ class ShipmentEventModel(Base):
     updated_at: Mapped[datetime.datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
+
+
+class CarrierEventInboxModel(Base):
+    __tablename__ = "carrier_event_inbox"
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        Index(
+            "ix_carrier_event_inbox_claimable",
+            "received_at",
+            postgresql_where=text("status IN ('pending', 'processing')"),
+        ),
+        # Unfinished entries per shipment, checked when claiming so that a shipment's events are
+        # applied one at a time in the order they were received.
+        Index(
+            "ix_carrier_event_inbox_shipment_unfinished",
+            "merchant_id",
+            "external_reference",
+            "received_at",
+            postgresql_where=text("status IN ('pending', 'processing')"),
+        ),
+    )
+
+    id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    carrier: Mapped[str] = mapped_column(String, nullable=False)
+    merchant_id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    external_reference: Mapped[str] = mapped_column(String(255), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    status: Mapped[InboxEventStatus] = mapped_column(
+        SAEnum(
+            InboxEventStatus,
+            name="inbox_event_status",
+            values_callable=lambda enum: [e.value for e in enum],
+        ),
+        nullable=False,
+        default=InboxEventStatus.PENDING,
+    )
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    error_code: Mapped[str | None] = mapped_column(String, nullable=True)
+    error_message: Mapped[str | None] = mapped_column(String, nullable=True)
+    received_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    claimed_at: Mapped[datetime.datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    processed_at: Mapped[datetime.datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+
+class MerchantShipmentStatsModel(Base):
+    """Shipment count per merchant and status, maintained by every write that creates a
+    shipment or changes its status."""
+
+    __tablename__ = "merchant_shipment_stats"
+
+    merchant_id: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("merchants.id"), primary_key=True
+    )
+    status: Mapped[ShipmentStatus] = mapped_column(
+        SAEnum(
+            ShipmentStatus,
+            name="shipment_status",
+            values_callable=lambda enum: [e.value for e in enum],
+        ),
+        primary_key=True,
+    )
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+class ShipmentUpdateModel(Base):
+    """Outbox of shipment changes for merchant update streams, written in the transaction of
+    the change and pruned after a retention period."""
+
+    __tablename__ = "shipment_updates"
+    __table_args__ = (
+        Index("ix_shipment_updates_merchant_id_xid_id", "merchant_id", "xid", "id"),
+        # Rows are appended in time order, so a BRIN index serves pruning by age at almost no
+        # write cost.
+        Index("ix_shipment_updates_created_at", "created_at", postgresql_using="brin"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    merchant_id: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("merchants.id"), nullable=False
+    )
+    shipment_id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    type: Mapped[str] = mapped_column(String(32), nullable=False)
+    data: Mapped[str] = mapped_column(Text, nullable=False)
+    # Id of the transaction that recorded the update. Streams deliver updates in (xid, id)
+    # order once every transaction with a lower xid has ended, as ids are drawn before commit
+    # and concurrent writers can commit them out of order.
+    xid: Mapped[int] = mapped_column(
+        BigInteger, server_default=text("pg_current_xact_id()::text::bigint"), nullable=False
+    )
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
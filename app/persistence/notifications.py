@@ -0,0 +1,84 @@
+"""Postgres LISTEN/NOTIFY for shipment changes.
+
+Writers queue a notification inside their transaction, so it is delivered exactly when the
+change commits and never for a rolled-back one. shipment_changes carries changed shipment ids
+for cache invalidation; shipment_updates carries the id of a merchant with new rows in the
+shipment_updates outbox (see ShipmentUpdateRepository.append).
+"""
+
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Iterable
+from uuid import UUID
+
+import psycopg
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+SHIPMENT_CHANGES_CHANNEL = "shipment_changes"
+SHIPMENT_UPDATES_CHANNEL = "shipment_updates"
+# NOTIFY payloads must stay under 8000 bytes; ids are at most 36 characters plus a separator.
+IDS_PER_NOTIFICATION = 200
+# notifies() can swallow a task cancellation on Python 3.11 (asyncio.wait_for), so listeners
+# also stop on an event, checked at least this often.
+_STOP_CHECK_SECONDS = 1.0
+
+
+def publish_shipment_changes(db: Session, shipment_ids: Iterable[UUID]) -> None:
+    """Notify listeners that the shipments changed, once the current transaction commits."""
+    ids = sorted({str(shipment_id) for shipment_id in shipment_ids})
+    if not ids:
+        return
+    payloads = [
+        ",".join(ids[start : start + IDS_PER_NOTIFICATION])
+        for start in range(0, len(ids), IDS_PER_NOTIFICATION)
+    ]
+    db.execute(
+        text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) payload"),
+        {"channel": SHIPMENT_CHANGES_CHANNEL, "payloads": payloads},
+    )
+
+
+async def listen_for_shipment_changes(
+    database_url: str,
+    stop: asyncio.Event,
+    on_listening: Callable[[], Awaitable[None] | None] | None = None,
+) -> AsyncIterator[list[UUID]]:
+    """Yield the ids of each shipment change notification, on a dedicated connection, until
+    stop is set.
+
+    on_listening is called once LISTEN is in effect; changes made before that are not seen.
+    """
+    async for payload in _listen(database_url, SHIPMENT_CHANGES_CHANNEL, stop, on_listening):
+        yield [UUID(value) for value in payload.split(",")]
+
+
+async def listen_for_shipment_updates(
+    database_url: str,
+    stop: asyncio.Event,
+    on_listening: Callable[[], Awaitable[None] | None] | None = None,
+) -> AsyncIterator[UUID]:
+    """Yield the merchant of each shipment update notification; otherwise like
+    listen_for_shipment_changes."""
+    async for payload in _listen(database_url, SHIPMENT_UPDATES_CHANNEL, stop, on_listening):
+        yield UUID(payload)
+
+
+async def _listen(
+    database_url: str,
+    channel: str,
+    stop: asyncio.Event,
+    on_listening: Callable[[], Awaitable[None] | None] | None,
+) -> AsyncIterator[str]:
+    url = make_url(database_url).set(drivername="postgresql")
+    async with await psycopg.AsyncConnection.connect(
+        url.render_as_string(hide_password=False), autocommit=True
+    ) as connection:
+        await connection.execute(f"LISTEN {channel}")
+        if on_listening is not None:
+            result = on_listening()
+            if result is not None:
+                await result
+        while not stop.is_set():
+            async for notification in connection.notifies(timeout=_STOP_CHECK_SECONDS):
+                yield notification.payload
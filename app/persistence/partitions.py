@@ -0,0 +1,159 @@
+"""Monthly range partitions of shipment_events.
+
+Partitions are named shipment_events_pYYYY_MM and cover one UTC calendar month of occurred_at.
+Events outside every monthly partition land in shipment_events_default.
+"""
+
+import re
+from datetime import date, datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.persistence.notifications import IDS_PER_NOTIFICATION, SHIPMENT_CHANGES_CHANNEL
+
+DEFAULT_PARTITION = "shipment_events_default"
+_PARTITION_NAME = re.compile(r"^shipment_events_p(\d{4})_(\d{2})$")
+# Events removed per shipment while applying the retention policy.
+_EXPIRED_COUNTS = "expired_shipment_event_counts"
+_ADD_EXPIRED_COUNT = (
+    "ON CONFLICT (shipment_id) DO UPDATE SET " f"count = {_EXPIRED_COUNTS}.count + excluded.count"
+)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def current_month() -> date:
+    return datetime.now(timezone.utc).date().replace(day=1)
+
+
+def partition_name(month: date) -> str:
+    return f"shipment_events_p{month:%Y_%m}"
+
+
+def _bound(month: date) -> datetime:
+    return datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+
+
+def list_partitions(connection: Connection) -> dict[date, str]:
+    """Monthly partitions currently attached, by the first day of their month."""
+    names = connection.scalars(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = 'shipment_events'::regclass"
+        )
+    )
+    partitions = {}
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            partitions[date(int(match[1]), int(match[2]), 1)] = name
+    return partitions
+
+
+def create_partitions(connection: Connection, first_month: date, last_month: date) -> list[str]:
+    """Create the missing monthly partitions from first_month through last_month.
+
+    Rows the default partition already holds for a new month are moved into it before it is
+    attached, since Postgres refuses to attach a range the default partition overlaps.
+    """
+    existing = list_partitions(connection)
+    created = []
+    month = first_month.replace(day=1)
+    while month <= last_month:
+        if month not in existing:
+            name = partition_name(month)
+            bounds = {"lower": _bound(month), "upper": _bound(add_months(month, 1))}
+            connection.execute(
+                text(f'CREATE TABLE "{name}" (LIKE shipment_events INCLUDING DEFAULTS)')
+            )
+            connection.execute(
+                text(
+                    f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+                    "WHERE occurred_at >= :lower AND occurred_at < :upper RETURNING *) "
+                    f'INSERT INTO "{name}" SELECT * FROM moved'
+                ),
+                bounds,
+            )
+            connection.execute(
+                text(
+                    f'ALTER TABLE shipment_events ATTACH PARTITION "{name}" '
+                    f"FOR VALUES FROM ('{bounds['lower'].isoformat()}') "
+                    f"TO ('{bounds['upper'].isoformat()}')"
+                )
+            )
+            created.append(name)
+        month = add_months(month, 1)
+    return created
+
+
+def drop_partitions_before(
+    connection: Connection, cutoff_month: date, keep_detached: bool = False
+) -> list[str]:
+    """Remove events that occurred before cutoff_month.
+
+    Whole monthly partitions are detached (and dropped unless keep_detached), which costs the
+    same regardless of their size. Only stragglers in the default partition are deleted row by
+    row. The event summary columns of the shipments that lost events are corrected in the same
+    transaction, from a per-shipment count of the removed events.
+    """
+    cutoff = _bound(cutoff_month)
+    connection.execute(
+        text(
+            f"CREATE TEMPORARY TABLE {_EXPIRED_COUNTS} "
+            "(shipment_id uuid PRIMARY KEY, count bigint NOT NULL)"
+        )
+    )
+    removed = []
+    for month, name in sorted(list_partitions(connection).items()):
+        if add_months(month, 1) > cutoff_month:
+            continue
+        connection.execute(
+            text(
+                f"INSERT INTO {_EXPIRED_COUNTS} "
+                f'SELECT shipment_id, count(*) FROM "{name}" GROUP BY shipment_id '
+                f"{_ADD_EXPIRED_COUNT}"
+            )
+        )
+        connection.execute(text(f'ALTER TABLE shipment_events DETACH PARTITION "{name}"'))
+        if not keep_detached:
+            connection.execute(text(f'DROP TABLE "{name}"'))
+        removed.append(name)
+    connection.execute(
+        text(
+            f"WITH deleted AS (DELETE FROM {DEFAULT_PARTITION} WHERE occurred_at < :cutoff "
+            "RETURNING shipment_id) "
+            f"INSERT INTO {_EXPIRED_COUNTS} "
+            f"SELECT shipment_id, count(*) FROM deleted GROUP BY shipment_id {_ADD_EXPIRED_COUNT}"
+        ),
+        {"cutoff": cutoff},
+    )
+    # A shipment whose latest event expired has none left.
+    connection.execute(
+        text(
+            "UPDATE shipments AS s SET "
+            "event_count = greatest(s.event_count - expired.count, 0), "
+            "last_event_type = CASE WHEN s.last_event_at < :cutoff "
+            "THEN NULL ELSE s.last_event_type END, "
+            "last_event_at = CASE WHEN s.last_event_at < :cutoff "
+            "THEN NULL ELSE s.last_event_at END, "
+            "updated_at = now() "
+            f"FROM {_EXPIRED_COUNTS} AS expired WHERE s.id = expired.shipment_id"
+        ),
+        {"cutoff": cutoff},
+    )
+    # Shipment caches drop the corrected shipments when this commits.
+    connection.execute(
+        text(
+            "SELECT pg_notify(:channel, string_agg(shipment_id::text, ',')) FROM ("
+            "SELECT shipment_id, (row_number() OVER () - 1) / :per_notification AS chunk "
+            f"FROM {_EXPIRED_COUNTS}) AS numbered GROUP BY chunk"
+        ),
+        {"channel": SHIPMENT_CHANGES_CHANNEL, "per_notification": IDS_PER_NOTIFICATION},
+    )
+    connection.execute(text(f"DROP TABLE {_EXPIRED_COUNTS}"))
+    return removed
@@ -1,25 +1,101 @@
 from __future__ import annotations
 
-from uuid import UUID
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, Iterator, Mapping, Sequence
+from uuid import UUID, uuid4
 
-from sqlalchemy.orm import Session
+import orjson
+from sqlalchemy import (
+    DateTime,
+    Integer,
+    String,
+    and_,
+    bindparam,
+    case,
+    cast,
+    column,
+    delete,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    text,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, aliased, load_only
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
 
-from ..domain.shipment import ShipmentStatus
-from .models import MerchantModel, ShipmentEventModel, ShipmentModel
+from ..domain.inbox import InboxEventStatus
+from ..domain.shipment import ACTIVE_STATUSES, ShipmentSort, ShipmentStatus
+from ..domain.shipment_event import ShipmentEventType
+from ..domain.shipment_update import ShipmentUpdateType
+from .models import (
+    CarrierEventInboxModel,
+    MerchantModel,
+    MerchantShipmentStatsModel,
+    ShipmentEventModel,
+    ShipmentModel,
+    ShipmentUpdateModel,
+)
+from .notifications import SHIPMENT_UPDATES_CHANNEL, publish_shipment_changes
+
+# Columns read by the service layer; the rest of the row is loaded only when accessed.
+_SHIPMENT_COLUMNS = load_only(
+    ShipmentModel.id,
+    ShipmentModel.merchant_id,
+    ShipmentModel.name,
+    ShipmentModel.external_reference,
+    ShipmentModel.status,
+    ShipmentModel.carrier,
+    ShipmentModel.created_at,
+    ShipmentModel.last_event_type,
+    ShipmentModel.last_event_at,
+    ShipmentModel.event_count,
+    ShipmentModel.updated_at,
+    ShipmentModel.status_version,
+)
+
+# Shipments without events sort last. Mapping NULL to -infinity keeps the keyset a single row
+# comparison that ix_shipments_merchant_id_last_event_at_id can seek to.
+_NO_EVENTS = literal_column("'-infinity'::timestamptz")
+_LAST_EVENT_SORT_KEY = func.coalesce(ShipmentModel.last_event_at, _NO_EVENTS)
 
 
 class ShipmentRepository:
     def __init__(self, db: Session):
         self.db = db
+        self._stats = MerchantShipmentStatsRepository(db)
 
     def get_by_id(self, shipment_id: UUID) -> ShipmentModel | None:
-        return self.db.query(ShipmentModel).filter(ShipmentModel.id == shipment_id).first()
+        return (
+            self.db.query(ShipmentModel)
+            .options(_SHIPMENT_COLUMNS)
+            .filter(ShipmentModel.id == shipment_id)
+            .first()
+        )
+
+    def get_version(self, shipment_id: UUID) -> Row | None:
+        """updated_at and event_count of a shipment, without loading the shipment."""
+        return self.db.execute(
+            select(ShipmentModel.updated_at, ShipmentModel.event_count).where(
+                ShipmentModel.id == shipment_id
+            )
+        ).first()
 
     def get_by_merchant_id_and_external_reference(
         self, merchant_id: UUID, external_reference: str
     ) -> ShipmentModel | None:
         return (
             self.db.query(ShipmentModel)
+            .options(_SHIPMENT_COLUMNS)
             .filter(
                 ShipmentModel.merchant_id == merchant_id,
                 ShipmentModel.external_reference == external_reference,
@@ -27,8 +103,63 @@ class ShipmentRepository:
             .first()
         )
 
-    def list(self) -> list[ShipmentModel]:
-        return self.db.query(ShipmentModel).all()
+    def list_by_merchant_id_and_external_references(
+        self, keys: Iterable[tuple[UUID, str]]
+    ) -> list[ShipmentModel]:
+        unique_keys = set(keys)
+        if not unique_keys:
+            return []
+        # Joining a VALUES list plans as a hash join; a long tuple IN list does not.
+        lookup = values(
+            column("merchant_id", PG_UUID(as_uuid=True)),
+            column("external_reference", String),
+            name="lookup",
+        ).data(list(unique_keys))
+        return (
+            self.db.query(ShipmentModel)
+            .options(_SHIPMENT_COLUMNS)
+            .join(
+                lookup,
+                and_(
+                    ShipmentModel.merchant_id == lookup.c.merchant_id,
+                    ShipmentModel.external_reference == lookup.c.external_reference,
+                ),
+            )
+            .all()
+        )
+
+    def stream_filtered(
+        self,
+        merchant_id: UUID | None = None,
+        status: ShipmentStatus | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+        batch_size: int = 1000,
+    ) -> Iterator[Row]:
+        """Yield matching shipments through a server-side cursor, batch_size rows at a time."""
+        stmt = select(
+            ShipmentModel.id,
+            ShipmentModel.merchant_id,
+            ShipmentModel.name,
+            ShipmentModel.external_reference,
+            ShipmentModel.status,
+            ShipmentModel.carrier,
+            ShipmentModel.last_event_type,
+            ShipmentModel.last_event_at,
+            ShipmentModel.event_count,
+            ShipmentModel.updated_at,
+        )
+        if merchant_id is not None:
+            stmt = stmt.where(ShipmentModel.merchant_id == merchant_id)
+        if status is not None:
+            stmt = stmt.where(ShipmentModel.status == status)
+        if created_from is not None:
+            stmt = stmt.where(ShipmentModel.created_at >= created_from)
+        if created_to is not None:
+            stmt = stmt.where(ShipmentModel.created_at < created_to)
+
+        stmt = stmt.order_by(ShipmentModel.created_at, ShipmentModel.id)
+        yield from self.db.execute(stmt, execution_options={"yield_per": batch_size})
 
     def list_filtered(
         self,
@@ -36,8 +167,11 @@ class ShipmentRepository:
         status: ShipmentStatus | None = None,
         limit: int = 50,
         offset: int = 0,
+        after: tuple[datetime | None, UUID] | None = None,
+        last_event_type: ShipmentEventType | None = None,
+        sort: ShipmentSort = "created_at",
     ) -> list[ShipmentModel]:
-        query = self.db.query(ShipmentModel)
+        query = self.db.query(ShipmentModel).options(_SHIPMENT_COLUMNS)
 
         if merchant_id is not None:
             query = query.filter(ShipmentModel.merchant_id == merchant_id)
@@ -45,7 +179,41 @@ class ShipmentRepository:
         if status is not None:
             query = query.filter(ShipmentModel.status == status)
 
-        return query.order_by(ShipmentModel.created_at.desc()).limit(limit).offset(offset).all()
+        if last_event_type is not None:
+            query = query.filter(ShipmentModel.last_event_type == last_event_type)
+
+        if sort == "last_event_at":
+            if after is not None:
+                last_event_at, shipment_id = after
+                bound = _NO_EVENTS if last_event_at is None else literal(last_event_at)
+                query = query.filter(
+                    tuple_(_LAST_EVENT_SORT_KEY, ShipmentModel.id) < tuple_(bound, shipment_id)
+                )
+            ordering = (_LAST_EVENT_SORT_KEY.desc(), ShipmentModel.id.desc())
+        else:
+            if after is not None:
+                query = query.filter(tuple_(ShipmentModel.created_at, ShipmentModel.id) < after)
+            ordering = (ShipmentModel.created_at.desc(), ShipmentModel.id.desc())
+
+        return query.order_by(*ordering).limit(limit).offset(offset).all()
+
+    def list_active_by_carrier(
+        self, carrier: str, after: UUID | None = None, limit: int = 200
+    ) -> list[ShipmentModel]:
+        """Shipments of the carrier that are not in a final status, in id order after after."""
+        # Literal statuses let the planner match ix_shipments_carrier_id_active's predicate
+        # even under a generic prepared plan.
+        active = bindparam(
+            "active_statuses", sorted(ACTIVE_STATUSES), expanding=True, literal_execute=True
+        )
+        query = (
+            self.db.query(ShipmentModel)
+            .options(_SHIPMENT_COLUMNS)
+            .filter(ShipmentModel.carrier == carrier, ShipmentModel.status.in_(active))
+        )
+        if after is not None:
+            query = query.filter(ShipmentModel.id > after)
+        return query.order_by(ShipmentModel.id).limit(limit).all()
 
     def get_by_external_reference(self, external_reference: str) -> ShipmentModel | None:
         matches = (
@@ -59,17 +227,148 @@ class ShipmentRepository:
 
     def create(self, shipment: ShipmentModel) -> ShipmentModel:
         self.db.add(shipment)
+        self.db.flush()
+        self._stats.adjust({(shipment.merchant_id, ShipmentStatus(shipment.status)): 1})
+        self.db.commit()
+        return shipment
+
+    def create_if_absent(
+        self,
+        merchant_id: UUID,
+        external_reference: str,
+        name: str,
+        status: ShipmentStatus,
+        carrier: str | None = None,
+    ) -> ShipmentModel | None:
+        """Insert a shipment unless one already exists for the merchant and reference.
+
+        Returns the inserted row, or None when the reference was already taken.
+        """
+        stmt = (
+            insert(ShipmentModel)
+            .values(
+                merchant_id=merchant_id,
+                external_reference=external_reference,
+                name=name,
+                status=status,
+                carrier=carrier,
+            )
+            .on_conflict_do_nothing(
+                index_elements=[ShipmentModel.merchant_id, ShipmentModel.external_reference]
+            )
+            .returning(ShipmentModel)
+        )
+        shipment = self.db.scalars(stmt).first()
+        if shipment:
+            self._stats.adjust({(merchant_id, status): 1})
         self.db.commit()
-        self.db.refresh(shipment)
         return shipment
 
+    def create_many_if_absent(self, rows: list[dict]) -> list[ShipmentModel]:
+        """Insert shipments, skipping references that already exist.
+
+        The rows are sent as batched multi-row INSERTs (insertmanyvalues) from one cached
+        statement. Returns only the inserted rows.
+        """
+        if not rows:
+            return []
+        stmt = (
+            insert(ShipmentModel)
+            .on_conflict_do_nothing(
+                index_elements=[ShipmentModel.merchant_id, ShipmentModel.external_reference]
+            )
+            .returning(ShipmentModel)
+        )
+        created = self.db.scalars(stmt, rows).all()
+        self._stats.adjust(
+            Counter((model.merchant_id, ShipmentStatus(model.status)) for model in created)
+        )
+        self.db.commit()
+        return list(created)
+
+    def record_events(
+        self, summaries: Mapping[UUID, tuple[int, ShipmentEventType, datetime]]
+    ) -> list[UUID]:
+        """Fold new events into the shipments' event summary columns without committing.
+
+        summaries maps a shipment id to the number of new events and the type and time of the
+        latest one. An event older than the stored last event only increments event_count.
+        Already loaded shipments are updated in place. Returns the ids of the shipments found.
+        """
+        if not summaries:
+            return []
+        batch = values(
+            column("id", PG_UUID(as_uuid=True)),
+            column("added", Integer),
+            column("type", String),
+            column("at", DateTime(timezone=True)),
+            name="batch",
+        ).data(
+            [
+                (shipment_id, added, ShipmentEventType(event_type).value, occurred_at)
+                for shipment_id, (added, event_type, occurred_at) in summaries.items()
+            ]
+        )
+        is_latest = or_(
+            ShipmentModel.last_event_at.is_(None), ShipmentModel.last_event_at <= batch.c.at
+        )
+        stmt = (
+            update(ShipmentModel)
+            .where(ShipmentModel.id == batch.c.id)
+            .values(
+                event_count=ShipmentModel.event_count + batch.c.added,
+                last_event_type=case(
+                    (is_latest, cast(batch.c.type, ShipmentModel.last_event_type.type)),
+                    else_=ShipmentModel.last_event_type,
+                ),
+                last_event_at=func.greatest(ShipmentModel.last_event_at, batch.c.at),
+            )
+            .returning(
+                ShipmentModel.id,
+                ShipmentModel.last_event_type,
+                ShipmentModel.last_event_at,
+                ShipmentModel.event_count,
+                ShipmentModel.updated_at,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        rows = self.db.execute(stmt).all()
+        for row in rows:
+            model = self.db.identity_map.get(identity_key(ShipmentModel, row.id))
+            if model is not None:
+                for attribute in ("last_event_type", "last_event_at", "event_count", "updated_at"):
+                    set_committed_value(model, attribute, getattr(row, attribute))
+        return [row.id for row in rows]
+
+    def adjust_status_counts(self, deltas: Mapping[tuple[UUID, ShipmentStatus], int]) -> None:
+        """Record status changes in the merchant counters; committed by the next write."""
+        self._stats.adjust(deltas)
+
+    def publish_changes(self, shipment_ids: Iterable[UUID]) -> None:
+        """Notify other processes of the change once the current transaction commits."""
+        publish_shipment_changes(self.db, shipment_ids)
+
     def update_status(self, shipment: ShipmentModel) -> ShipmentModel:
         self.db.add(shipment)
         self.db.commit()
-        self.db.refresh(shipment)
         return shipment
 
 
+_DEDUP_KEY = [ShipmentEventModel.dedup_key, ShipmentEventModel.occurred_at]
+
+
+def _event_row(shipment_event: ShipmentEventModel) -> dict:
+    return {
+        "id": shipment_event.id or uuid4(),
+        "shipment_id": shipment_event.shipment_id,
+        "type": shipment_event.type,
+        "source": shipment_event.source,
+        "reason": shipment_event.reason,
+        "occurred_at": shipment_event.occurred_at,
+        "dedup_key": shipment_event.dedup_key,
+    }
+
+
 class ShipmentEventRepository:
     def __init__(self, db: Session):
         self.db = db
@@ -82,6 +381,36 @@ class ShipmentEventRepository:
             .all()
         )
 
+    def stream_filtered(
+        self,
+        merchant_id: UUID | None = None,
+        shipment_id: UUID | None = None,
+        occurred_from: datetime | None = None,
+        occurred_to: datetime | None = None,
+        batch_size: int = 1000,
+    ) -> Iterator[Row]:
+        """Yield matching events through a server-side cursor, batch_size rows at a time."""
+        stmt = select(
+            ShipmentEventModel.id,
+            ShipmentEventModel.shipment_id,
+            ShipmentEventModel.type,
+            ShipmentEventModel.source,
+            ShipmentEventModel.reason,
+            ShipmentEventModel.occurred_at,
+        )
+        if merchant_id is not None:
+            stmt = stmt.join(ShipmentModel, ShipmentModel.id == ShipmentEventModel.shipment_id)
+            stmt = stmt.where(ShipmentModel.merchant_id == merchant_id)
+        if shipment_id is not None:
+            stmt = stmt.where(ShipmentEventModel.shipment_id == shipment_id)
+        if occurred_from is not None:
+            stmt = stmt.where(ShipmentEventModel.occurred_at >= occurred_from)
+        if occurred_to is not None:
+            stmt = stmt.where(ShipmentEventModel.occurred_at < occurred_to)
+
+        stmt = stmt.order_by(ShipmentEventModel.occurred_at, ShipmentEventModel.id)
+        yield from self.db.execute(stmt, execution_options={"yield_per": batch_size})
+
     def get_by_id(self, shipment_event_id: UUID) -> ShipmentEventModel | None:
         return (
             self.db.query(ShipmentEventModel)
@@ -92,9 +421,77 @@ class ShipmentEventRepository:
     def create(self, shipment_event: ShipmentEventModel) -> ShipmentEventModel:
         self.db.add(shipment_event)
         self.db.commit()
-        self.db.refresh(shipment_event)
         return shipment_event
 
+    def get_by_dedup_key(self, dedup_key: str, occurred_at: datetime) -> ShipmentEventModel | None:
+        return self.db.scalars(
+            select(ShipmentEventModel).where(
+                ShipmentEventModel.dedup_key == dedup_key,
+                ShipmentEventModel.occurred_at == occurred_at,
+            )
+        ).first()
+
+    def list_by_dedup_keys(self, keys: Iterable[tuple[str, datetime]]) -> list[ShipmentEventModel]:
+        unique_keys = set(keys)
+        if not unique_keys:
+            return []
+        lookup = values(
+            column("dedup_key", String),
+            column("occurred_at", DateTime(timezone=True)),
+            name="lookup",
+        ).data(list(unique_keys))
+        return list(
+            self.db.scalars(
+                select(ShipmentEventModel).join(
+                    lookup,
+                    and_(
+                        ShipmentEventModel.dedup_key == lookup.c.dedup_key,
+                        ShipmentEventModel.occurred_at == lookup.c.occurred_at,
+                    ),
+                )
+            )
+        )
+
+    def create_if_absent(self, shipment_event: ShipmentEventModel) -> ShipmentEventModel | None:
+        """Insert an event unless one with the same dedup key is already stored.
+
+        Commits when the event was inserted. Otherwise the transaction is rolled back, since the
+        caller's pending changes were made for an event that already exists, and None is
+        returned.
+        """
+        stmt = (
+            insert(ShipmentEventModel)
+            .values(_event_row(shipment_event))
+            .on_conflict_do_nothing(index_elements=_DEDUP_KEY)
+            .returning(ShipmentEventModel)
+        )
+        saved = self.db.scalars(stmt).first()
+        if saved is None:
+            self.db.rollback()
+            return None
+        self.db.commit()
+        return saved
+
+    def create_many_if_absent(self, shipment_events: list[ShipmentEventModel]) -> bool:
+        """Insert events in batched multi-row INSERTs, skipping already stored dedup keys.
+
+        Commits and returns True when every event was inserted. If any was a duplicate, the
+        transaction is rolled back and False is returned.
+        """
+        if not shipment_events:
+            return True
+        stmt = (
+            insert(ShipmentEventModel)
+            .on_conflict_do_nothing(index_elements=_DEDUP_KEY)
+            .returning(ShipmentEventModel.id)
+        )
+        inserted = self.db.scalars(stmt, [_event_row(e) for e in shipment_events]).all()
+        if len(inserted) != len(shipment_events):
+            self.db.rollback()
+            return False
+        self.db.commit()
+        return True
+
 
 class MerchantRepository:
     def __init__(self, db: Session):
@@ -106,11 +503,270 @@ class MerchantRepository:
     def save(self, merchant: MerchantModel) -> MerchantModel:
         self.db.add(merchant)
         self.db.commit()
-        self.db.refresh(merchant)
         return merchant
 
     def get_by_id(self, merchant_id: UUID):
         return self.db.query(MerchantModel).filter(MerchantModel.id == merchant_id).first()
 
+    def list_existing_ids(self, merchant_ids: Iterable[UUID]) -> set[UUID]:
+        unique_ids = set(merchant_ids)
+        if not unique_ids:
+            return set()
+        return set(
+            self.db.scalars(select(MerchantModel.id).where(MerchantModel.id.in_(unique_ids))).all()
+        )
+
     def list(self):
         return self.db.query(MerchantModel).all()
+
+
+class MerchantShipmentStatsRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def adjust(self, deltas: Mapping[tuple[UUID, ShipmentStatus], int]) -> None:
+        """Add deltas to the (merchant, status) counters without committing.
+
+        Callers run this in the transaction of the write being counted. Rows are upserted in
+        key order so concurrent transactions lock them in the same order.
+        """
+        rows = [
+            {"merchant_id": merchant_id, "status": status, "count": delta}
+            for (merchant_id, status), delta in sorted(
+                deltas.items(), key=lambda item: (str(item[0][0]), item[0][1].value)
+            )
+            if delta
+        ]
+        if not rows:
+            return
+        stmt = insert(MerchantShipmentStatsModel).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                MerchantShipmentStatsModel.merchant_id,
+                MerchantShipmentStatsModel.status,
+            ],
+            set_={"count": MerchantShipmentStatsModel.count + stmt.excluded["count"]},
+        )
+        self.db.execute(stmt)
+
+    def get_by_merchant_id(self, merchant_id: UUID) -> dict[ShipmentStatus, int]:
+        rows = self.db.execute(
+            select(MerchantShipmentStatsModel.status, MerchantShipmentStatsModel.count).where(
+                MerchantShipmentStatsModel.merchant_id == merchant_id
+            )
+        )
+        return {ShipmentStatus(status): count for status, count in rows}
+
+    def rebuild(self, merchant_id: UUID | None = None) -> None:
+        """Recount the counters from the shipments table.
+
+        The table lock holds off concurrent counter updates until the recount commits; writes
+        that already changed a shipment apply their delta afterwards.
+        """
+        self.db.execute(text("LOCK TABLE merchant_shipment_stats IN EXCLUSIVE MODE"))
+        clear = delete(MerchantShipmentStatsModel)
+        counts = select(ShipmentModel.merchant_id, ShipmentModel.status, func.count()).group_by(
+            ShipmentModel.merchant_id, ShipmentModel.status
+        )
+        if merchant_id is not None:
+            clear = clear.where(MerchantShipmentStatsModel.merchant_id == merchant_id)
+            counts = counts.where(ShipmentModel.merchant_id == merchant_id)
+        self.db.execute(clear)
+        self.db.execute(
+            insert(MerchantShipmentStatsModel).from_select(
+                ["merchant_id", "status", "count"], counts
+            )
+        )
+        self.db.commit()
+
+
+class CarrierEventInboxRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def append(
+        self, carrier: str, merchant_id: UUID, external_reference: str, payload: dict
+    ) -> CarrierEventInboxModel:
+        entry = CarrierEventInboxModel(
+            carrier=carrier,
+            merchant_id=merchant_id,
+            external_reference=external_reference,
+            payload=payload,
+        )
+        self.db.add(entry)
+        self.db.commit()
+        return entry
+
+    def claim_batch(self, limit: int, stale_before: datetime) -> list[CarrierEventInboxModel]:
+        """Mark up to limit entries as processing and return them.
+
+        Pending entries are claimed oldest first, together with entries whose claim is older
+        than stale_before (a worker died mid-batch). SKIP LOCKED lets concurrent workers claim
+        disjoint batches without waiting on each other.
+
+        An entry is only claimable once every earlier entry for the same shipment is processed
+        or failed, so each shipment's events are applied one at a time in the order they were
+        received, whichever worker claims them.
+        """
+        earlier = aliased(CarrierEventInboxModel)
+        waits_for_earlier = (
+            select(earlier.id)
+            .where(
+                earlier.merchant_id == CarrierEventInboxModel.merchant_id,
+                earlier.external_reference == CarrierEventInboxModel.external_reference,
+                earlier.status.in_([InboxEventStatus.PENDING, InboxEventStatus.PROCESSING]),
+                tuple_(earlier.received_at, earlier.id)
+                < tuple_(CarrierEventInboxModel.received_at, CarrierEventInboxModel.id),
+            )
+            .exists()
+        )
+        claimable = (
+            select(CarrierEventInboxModel.id)
+            .where(
+                or_(
+                    CarrierEventInboxModel.status == InboxEventStatus.PENDING,
+                    and_(
+                        CarrierEventInboxModel.status == InboxEventStatus.PROCESSING,
+                        CarrierEventInboxModel.claimed_at < stale_before,
+                    ),
+                ),
+                ~waits_for_earlier,
+            )
+            .order_by(CarrierEventInboxModel.received_at, CarrierEventInboxModel.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(CarrierEventInboxModel)
+            .where(CarrierEventInboxModel.id.in_(claimable))
+            .values(
+                status=InboxEventStatus.PROCESSING,
+                claimed_at=func.now(),
+                attempts=CarrierEventInboxModel.attempts + 1,
+            )
+            .returning(CarrierEventInboxModel)
+        )
+        entries = self.db.scalars(stmt).all()
+        self.db.commit()
+        return list(entries)
+
+    def set_outcome(
+        self,
+        entry_id: UUID,
+        status: InboxEventStatus,
+        error_code: str | None = None,
+        error_message: str | None = None,
+    ) -> None:
+        finished = status in (InboxEventStatus.PROCESSED, InboxEventStatus.FAILED)
+        self.db.execute(
+            update(CarrierEventInboxModel)
+            .where(CarrierEventInboxModel.id == entry_id)
+            .values(
+                status=status,
+                error_code=error_code,
+                error_message=error_message,
+                processed_at=func.now() if finished else None,
+            )
+        )
+        self.db.commit()
+
+
+# Inserts the updates in order, resolving each shipment's merchant, and notifies each merchant
+# once.
+_APPEND_SHIPMENT_UPDATES = text(
+    """
+    WITH inserted AS (
+        INSERT INTO shipment_updates (merchant_id, shipment_id, type, data)
+        SELECT s.merchant_id, u.shipment_id, u.type, u.data
+        FROM unnest(
+            CAST(:shipment_ids AS uuid[]), CAST(:types AS text[]), CAST(:data AS text[])
+        ) WITH ORDINALITY AS u(shipment_id, type, data, position)
+        JOIN shipments s ON s.id = u.shipment_id
+        ORDER BY u.position
+        RETURNING merchant_id
+    )
+    SELECT pg_notify(:channel, merchant_id::text)
+    FROM (SELECT DISTINCT merchant_id FROM inserted) AS merchants
+    """
+)
+# Every transaction with a lower id than this has ended.
+_OLDEST_RUNNING_XID = literal_column("pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+
+
+class ShipmentUpdateRepository:
+    """The shipment_updates outbox, read in (xid, id) positions.
+
+    Identity ids are drawn before commit, so concurrent writers can commit them out of order.
+    An update is final once every transaction with a lower xid has ended: nothing can commit
+    before it in (xid, id) order any more, so readers that only take final updates never skip
+    one that commits later.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def append(self, updates: Sequence[tuple[UUID, ShipmentUpdateType, object]]) -> None:
+        """Record (shipment id, type, payload) updates without committing.
+
+        Payloads are stored as their JSON. Listeners are notified when the transaction commits.
+        """
+        if not updates:
+            return
+        self.db.execute(
+            _APPEND_SHIPMENT_UPDATES,
+            {
+                "shipment_ids": [shipment_id for shipment_id, _, _ in updates],
+                "types": [ShipmentUpdateType(update_type).value for _, update_type, _ in updates],
+                "data": [
+                    orjson.dumps(payload, option=orjson.OPT_UTC_Z).decode()
+                    for _, _, payload in updates
+                ],
+                "channel": SHIPMENT_UPDATES_CHANNEL,
+            },
+        )
+
+    def get_position(self, merchant_id: UUID, update_id: int) -> tuple[int, int] | None:
+        row = self.db.execute(
+            select(ShipmentUpdateModel.xid, ShipmentUpdateModel.id).where(
+                ShipmentUpdateModel.id == update_id,
+                ShipmentUpdateModel.merchant_id == merchant_id,
+            )
+        ).first()
+        return (row.xid, row.id) if row else None
+
+    def get_final_position(self, merchant_id: UUID) -> tuple[int, int]:
+        """Position of the merchant's newest final update, or (0, 0) without one."""
+        row = self.db.execute(
+            select(ShipmentUpdateModel.xid, ShipmentUpdateModel.id)
+            .where(
+                ShipmentUpdateModel.merchant_id == merchant_id,
+                ShipmentUpdateModel.xid < _OLDEST_RUNNING_XID,
+            )
+            .order_by(ShipmentUpdateModel.xid.desc(), ShipmentUpdateModel.id.desc())
+            .limit(1)
+        ).first()
+        return (row.xid, row.id) if row else (0, 0)
+
+    def list_final_after(
+        self, merchant_id: UUID, after: tuple[int, int], limit: int
+    ) -> tuple[list[ShipmentUpdateModel], bool]:
+        """Up to limit final updates after the position, in order, and whether committed
+        updates that are not final yet follow them."""
+        rows = self.db.execute(
+            select(ShipmentUpdateModel, ShipmentUpdateModel.xid < _OLDEST_RUNNING_XID)
+            .where(
+                ShipmentUpdateModel.merchant_id == merchant_id,
+                tuple_(ShipmentUpdateModel.xid, ShipmentUpdateModel.id) > tuple_(*after),
+            )
+            .order_by(ShipmentUpdateModel.xid, ShipmentUpdateModel.id)
+            .limit(limit)
+        ).all()
+        final = [model for model, is_final in rows if is_final]
+        return final, len(final) < len(rows)
+
+    def delete_before(self, cutoff: datetime) -> int:
+        result = self.db.execute(
+            delete(ShipmentUpdateModel).where(ShipmentUpdateModel.created_at < cutoff)
+        )
+        self.db.commit()
+        return result.rowcount
@@ -1,25 +1,67 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.core.metrics import TimedAsyncAdaptedQueuePool, TimedQueuePool, instrument_engine
+from app.core.query_stats import instrument_query_stats
 
-engine = create_engine(
-    settings.database_url,
-    pool_pre_ping=True,
-)
 
+def _engine_options() -> dict:
+    connect_args = {
+        "prepare_threshold": (
+            settings.db_prepare_threshold if settings.db_prepared_statements else None
+        )
+    }
+    if settings.db_statement_timeout_ms:
+        connect_args["options"] = f"-c statement_timeout={settings.db_statement_timeout_ms}"
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "connect_args": connect_args,
+    }
+
+
+engine = create_engine(settings.database_url, poolclass=TimedQueuePool, **_engine_options())
+instrument_engine(engine, TimedQueuePool.metrics_name)
+instrument_query_stats(engine)
+
+# Writes fetch server defaults with RETURNING (eager_defaults on the mappers), so committed
+# objects stay loaded instead of being re-selected on next access.
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
+    expire_on_commit=False,
     bind=engine,
 )
 
 
+async_engine = create_async_engine(
+    settings.database_url, poolclass=TimedAsyncAdaptedQueuePool, **_engine_options()
+)
+instrument_engine(async_engine.sync_engine, TimedAsyncAdaptedQueuePool.metrics_name)
+instrument_query_stats(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    autoflush=False,
+    expire_on_commit=False,
+    bind=async_engine,
+)
+
+
 def get_db() -> Generator:
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator:
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -2,6 +2,8 @@ from uuid import UUID
 
 from pydantic import BaseModel
 
+from app.domain.shipment import ShipmentStatus
+
 
 class MerchantCreate(BaseModel):
     name: str
@@ -10,3 +12,9 @@ class MerchantCreate(BaseModel):
 class MerchantResponse(BaseModel):
     id: UUID
     name: str
+
+
+class MerchantStatsResponse(BaseModel):
+    merchant_id: UUID
+    total: int
+    counts: dict[ShipmentStatus, int]
@@ -5,7 +5,9 @@ from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict
 
+from app.domain.inbox import InboxEventStatus
 from app.domain.shipment_event import ShipmentEventSource, ShipmentEventType
+from app.schemas.errors import ErrorDetail
 from app.schemas.shipments import ShipmentResponse
 
 
@@ -27,6 +29,30 @@ class ShipmentEventResponse(BaseModel):
     occurred_at: datetime
 
 
+class ShipmentWithEventsResponse(ShipmentResponse):
+    events: list[ShipmentEventResponse]
+
+
 class ExternalEventIngestResponse(BaseModel):
     shipment: ShipmentResponse
     event: ShipmentEventResponse
+
+
+class ExternalEventAcceptedResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    status: InboxEventStatus
+
+
+class ExternalEventBatchItemResponse(BaseModel):
+    index: int
+    shipment: ShipmentResponse | None = None
+    event: ShipmentEventResponse | None = None
+    error: ErrorDetail | None = None
+
+
+class ExternalEventBatchResponse(BaseModel):
+    processed: int
+    failed: int
+    items: list[ExternalEventBatchItemResponse]
@@ -1,14 +1,18 @@
+from datetime import datetime
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict
 
 from app.domain.shipment import ShipmentStatus
+from app.domain.shipment_event import ShipmentEventType
+from app.schemas.errors import ErrorDetail
 
 
 class ShipmentCreate(BaseModel):
     merchant_id: UUID
     name: str
     external_reference: str
+    carrier: str | None = None
 
 
 class ShipmentResponse(BaseModel):
@@ -19,7 +23,25 @@ class ShipmentResponse(BaseModel):
     name: str
     status: str
     external_reference: str
+    carrier: str | None = None
+    last_event_type: ShipmentEventType | None = None
+    last_event_at: datetime | None = None
+    event_count: int = 0
 
 
 class ShipmentStatusUpdate(BaseModel):
     status: ShipmentStatus
+
+
+class ShipmentBulkItemResponse(BaseModel):
+    index: int
+    created: bool = False
+    shipment: ShipmentResponse | None = None
+    error: ErrorDetail | None = None
+
+
+class ShipmentBulkCreateResponse(BaseModel):
+    created: int
+    existing: int
+    failed: int
+    items: list[ShipmentBulkItemResponse]
@@ -0,0 +1,65 @@
+from typing import Sequence
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.adapters.base import AdapterResult
+from app.domain.shipment import Shipment
+from app.domain.shipment_event import ShipmentTrackingEvent
+from app.persistence.repositories import (
+    MerchantRepository,
+    ShipmentEventRepository,
+    ShipmentRepository,
+    ShipmentUpdateRepository,
+)
+from app.services.dedup import recent_external_events
+from app.services.results import ExternalEventResult
+from app.services.shipment_cache import shipment_cache
+from app.services.shipment_service import ShipmentService
+
+
+def _shipment_service(session: Session) -> ShipmentService:
+    return ShipmentService(
+        ShipmentRepository(session),
+        MerchantRepository(session),
+        ShipmentEventRepository(session),
+        recent_external_events,
+        shipment_cache,
+        ShipmentUpdateRepository(session),
+    )
+
+
+class AsyncShipmentService:
+    """Runs ShipmentService on an AsyncSession.
+
+    The sync service and repositories execute inside ``AsyncSession.run_sync``, so every
+    statement goes through the async driver and awaits on the event loop instead of blocking
+    it, while the business rules stay in one place.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def list_active_shipments(
+        self, carrier: str, after: UUID | None = None, limit: int = 200
+    ) -> list[Shipment]:
+        return await self.db.run_sync(
+            lambda session: _shipment_service(session).list_active_shipments(carrier, after, limit)
+        )
+
+    async def process_external_event(
+        self,
+        adapter_result: AdapterResult,
+    ) -> tuple[Shipment, ShipmentTrackingEvent]:
+        return await self.db.run_sync(
+            lambda session: _shipment_service(session).process_external_event(adapter_result)
+        )
+
+    async def process_external_events(
+        self,
+        adapter_results: Sequence[AdapterResult],
+    ) -> list[ExternalEventResult]:
+        return await self.db.run_sync(
+            lambda session: _shipment_service(session).process_external_events(adapter_results)
+        )
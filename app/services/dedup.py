@@ -0,0 +1,43 @@
+from collections import OrderedDict
+from threading import Lock
+
+from app.core.config import settings
+from app.domain.shipment import Shipment
+from app.domain.shipment_event import ShipmentTrackingEvent
+
+
+class RecentEventCache:
+    """Bounded LRU of recently processed carrier events by dedup key.
+
+    A webhook retry found here is answered with the original result without touching the
+    database. The cache is per process and best effort; the unique index on
+    shipment_events is what guarantees each event is stored once.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[Shipment, ShipmentTrackingEvent]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, dedup_key: str) -> tuple[Shipment, ShipmentTrackingEvent] | None:
+        with self._lock:
+            entry = self._entries.get(dedup_key)
+            if entry is not None:
+                self._entries.move_to_end(dedup_key)
+            return entry
+
+    def put(self, dedup_key: str, result: tuple[Shipment, ShipmentTrackingEvent]) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[dedup_key] = result
+            self._entries.move_to_end(dedup_key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+recent_external_events = RecentEventCache(settings.external_event_dedup_cache_size)
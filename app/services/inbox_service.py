@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.adapters.schemas import ExternalCarrierEvent
+from app.domain.inbox import InboxEntry, InboxEventStatus
+from app.persistence.models import CarrierEventInboxModel
+from app.persistence.repositories import CarrierEventInboxRepository
+
+
+def _to_inbox_entry(model: CarrierEventInboxModel) -> InboxEntry:
+    return InboxEntry(
+        id=model.id,
+        carrier=model.carrier,
+        payload=model.payload,
+        status=InboxEventStatus(model.status),
+        attempts=model.attempts,
+    )
+
+
+def _inbox_service(session: Session) -> "InboxService":
+    return InboxService(CarrierEventInboxRepository(session))
+
+
+class InboxService:
+    def __init__(self, repo: CarrierEventInboxRepository):
+        self.repo = repo
+
+    def enqueue(self, payload: ExternalCarrierEvent) -> InboxEntry:
+        saved = self.repo.append(
+            carrier=payload.carrier,
+            merchant_id=payload.merchant_id,
+            external_reference=payload.external_reference,
+            payload=payload.model_dump(mode="json"),
+        )
+        return _to_inbox_entry(saved)
+
+    def claim(self, limit: int, claim_timeout_seconds: float) -> list[InboxEntry]:
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=claim_timeout_seconds)
+        return [_to_inbox_entry(m) for m in self.repo.claim_batch(limit, stale_before)]
+
+    def complete(self, entry_id: UUID) -> None:
+        self.repo.set_outcome(entry_id, InboxEventStatus.PROCESSED)
+
+    def fail(self, entry_id: UUID, error_code: str, error_message: str) -> None:
+        self.repo.set_outcome(entry_id, InboxEventStatus.FAILED, error_code, error_message)
+
+    def release(self, entry_id: UUID, error_code: str, error_message: str) -> None:
+        self.repo.set_outcome(entry_id, InboxEventStatus.PENDING, error_code, error_message)
+
+
+class AsyncInboxService:
+    """Runs InboxService on an AsyncSession, like AsyncShipmentService."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def enqueue(self, payload: ExternalCarrierEvent) -> InboxEntry:
+        return await self.db.run_sync(lambda session: _inbox_service(session).enqueue(payload))
+
+    async def claim(self, limit: int, claim_timeout_seconds: float) -> list[InboxEntry]:
+        return await self.db.run_sync(
+            lambda session: _inbox_service(session).claim(limit, claim_timeout_seconds)
+        )
+
+    async def complete(self, entry_id: UUID) -> None:
+        await self.db.run_sync(lambda session: _inbox_service(session).complete(entry_id))
+
+    async def fail(self, entry_id: UUID, error_code: str, error_message: str) -> None:
+        await self.db.run_sync(
+            lambda session: _inbox_service(session).fail(entry_id, error_code, error_message)
+        )
+
+    async def release(self, entry_id: UUID, error_code: str, error_message: str) -> None:
+        await self.db.run_sync(
+            lambda session: _inbox_service(session).release(entry_id, error_code, error_message)
+        )
@@ -3,14 +3,20 @@ from uuid import UUID
 from sqlalchemy.exc import IntegrityError
 
 from app.domain.errors import DuplicatedError, NotFoundError
-from app.domain.merchant import Merchant
+from app.domain.merchant import Merchant, MerchantStats
+from app.domain.shipment import ShipmentStatus
 from app.persistence.models import MerchantModel
-from app.persistence.repositories import MerchantRepository
+from app.persistence.repositories import MerchantRepository, MerchantShipmentStatsRepository
 
 
 class MerchantService:
-    def __init__(self, repo: MerchantRepository):
+    def __init__(
+        self,
+        repo: MerchantRepository,
+        stats_repo: MerchantShipmentStatsRepository | None = None,
+    ):
         self.repo = repo
+        self.stats_repo = stats_repo
 
     def create_merchant(self, name: str) -> Merchant:
         if self.repo.get_by_name(name=name):
@@ -33,3 +39,15 @@ class MerchantService:
 
     def list_merchants(self) -> list[Merchant]:
         return [Merchant(id=m.id, name=m.name) for m in self.repo.list()]
+
+    def get_stats(self, merchant_id: UUID) -> MerchantStats:
+        if not self.stats_repo:
+            raise RuntimeError("Merchant stats repository is not configured")
+
+        counts = self.stats_repo.get_by_merchant_id(merchant_id)
+        if not counts and not self.repo.get_by_id(merchant_id):
+            raise NotFoundError(f"Merchant {merchant_id} not found")
+        return MerchantStats(
+            merchant_id=merchant_id,
+            counts={status: counts.get(status, 0) for status in ShipmentStatus},
+        )
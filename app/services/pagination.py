@@ -0,0 +1,28 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from uuid import UUID
+
+from app.domain.shipment import ShipmentSort
+
+
+def encode_cursor(
+    sort_value: datetime | None, shipment_id: UUID, sort: ShipmentSort = "created_at"
+) -> str:
+    value = sort_value.isoformat() if sort_value is not None else None
+    raw = json.dumps({sort: value, "id": str(shipment_id)})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: ShipmentSort = "created_at") -> tuple[datetime | None, UUID]:
+    """Decode a cursor issued for the same sort; only last_event_at values may be null."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        value = data[sort]
+        if value is None and sort == "last_event_at":
+            return None, UUID(data["id"])
+        return datetime.fromisoformat(value), UUID(data["id"])
+    except (binascii.Error, UnicodeDecodeError, TypeError, KeyError, ValueError) as exc:
+        raise ValueError(f"Invalid cursor: {cursor}") from exc
@@ -1,9 +1,38 @@
 from dataclasses import dataclass
 
 from app.domain.shipment import Shipment
+from app.domain.shipment_event import ShipmentTrackingEvent
 
 
 @dataclass
 class ShipmentCreateResponse:
     shipment: Shipment
     created: bool
+
+
+@dataclass
+class ShipmentBulkCreateResult:
+    shipment: Shipment | None = None
+    created: bool = False
+    error_code: str | None = None
+    error_message: str | None = None
+
+
+@dataclass
+class ShipmentDetail:
+    shipment: Shipment
+    events: list[ShipmentTrackingEvent]
+
+
+@dataclass
+class ShipmentPage:
+    items: list[Shipment]
+    next_cursor: str | None = None
+
+
+@dataclass
+class ExternalEventResult:
+    shipment: Shipment | None = None
+    event: ShipmentTrackingEvent | None = None
+    error_code: str | None = None
+    error_message: str | None = None
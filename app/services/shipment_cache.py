@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from contextlib import suppress
+from dataclasses import replace
+from threading import Lock
+from typing import Iterable
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.metrics import (
+    SHIPMENT_CACHE_ENTRIES,
+    SHIPMENT_CACHE_EVICTIONS,
+    SHIPMENT_CACHE_LOOKUPS,
+)
+from app.domain.shipment import Shipment
+from app.persistence.notifications import listen_for_shipment_changes
+
+logger = logging.getLogger(__name__)
+
+
+class ShipmentCache:
+    """Bounded LRU of Shipment snapshots with a TTL, by id and by merchant and reference.
+
+    Readers take a generation before loading from the database and pass it to put; a load
+    that raced with an invalidation is then not cached, since it may predate the change.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[UUID, tuple[Shipment, float]] = OrderedDict()
+        self._ids_by_reference: dict[tuple[UUID, str], UUID] = {}
+        self._generation = 0
+        self._lock = Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, shipment_id: UUID) -> Shipment | None:
+        if not self.enabled:
+            return None
+        with self._lock:
+            shipment = self._lookup(shipment_id)
+        SHIPMENT_CACHE_LOOKUPS.labels(result="hit" if shipment else "miss").inc()
+        return replace(shipment) if shipment else None
+
+    def get_by_reference(self, merchant_id: UUID, external_reference: str) -> Shipment | None:
+        if not self.enabled:
+            return None
+        with self._lock:
+            shipment_id = self._ids_by_reference.get((merchant_id, external_reference))
+            shipment = self._lookup(shipment_id) if shipment_id else None
+        SHIPMENT_CACHE_LOOKUPS.labels(result="hit" if shipment else "miss").inc()
+        return replace(shipment) if shipment else None
+
+    def put(self, shipment: Shipment, generation: int) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[shipment.id] = (replace(shipment), time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(shipment.id)
+            if shipment.external_reference is not None:
+                reference = (shipment.merchant_id, shipment.external_reference)
+                self._ids_by_reference[reference] = shipment.id
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)), "size")
+            SHIPMENT_CACHE_ENTRIES.set(len(self._entries))
+
+    def invalidate(self, shipment_ids: Iterable[UUID]) -> None:
+        with self._lock:
+            self._generation += 1
+            for shipment_id in shipment_ids:
+                if shipment_id in self._entries:
+                    self._remove(shipment_id, "invalidated")
+            SHIPMENT_CACHE_ENTRIES.set(len(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._ids_by_reference.clear()
+            SHIPMENT_CACHE_ENTRIES.set(0)
+
+    def _lookup(self, shipment_id: UUID) -> Shipment | None:
+        entry = self._entries.get(shipment_id)
+        if entry is None:
+            return None
+        shipment, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._remove(shipment_id, "expired")
+            SHIPMENT_CACHE_ENTRIES.set(len(self._entries))
+            return None
+        self._entries.move_to_end(shipment_id)
+        return shipment
+
+    def _remove(self, shipment_id: UUID, reason: str) -> None:
+        shipment, _ = self._entries.pop(shipment_id)
+        reference = (shipment.merchant_id, shipment.external_reference)
+        if self._ids_by_reference.get(reference) == shipment_id:
+            del self._ids_by_reference[reference]
+        SHIPMENT_CACHE_EVICTIONS.labels(reason=reason).inc()
+
+
+shipment_cache = ShipmentCache(settings.shipment_cache_size, settings.shipment_cache_ttl_seconds)
+
+
+async def run_invalidation_listener(
+    cache: ShipmentCache, database_url: str, stop: asyncio.Event, retry_seconds: float = 1.0
+) -> None:
+    """Apply other processes' shipment change notifications to the cache until stop is set.
+
+    The cache is cleared whenever the listening connection is (re)established, since
+    notifications sent while it was down are lost.
+    """
+    while not stop.is_set():
+        try:
+            async for shipment_ids in listen_for_shipment_changes(database_url, stop, cache.clear):
+                cache.invalidate(shipment_ids)
+        except Exception:
+            logger.exception("Shipment cache invalidation listener failed; reconnecting")
+        cache.clear()
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(stop.wait(), retry_seconds)
@@ -1,20 +1,119 @@
-from uuid import UUID
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Callable, Iterable, Iterator, Sequence, TypeVar
+from uuid import UUID, uuid4
 
+from psycopg.errors import ForeignKeyViolation
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
 
 from app.adapters.base import AdapterResult
-from app.domain.errors import NotFoundError
-from app.domain.shipment import Shipment, ShipmentStatus, can_transition
-from app.domain.shipment_event import ShipmentEventSource, ShipmentTrackingEvent
+from app.core.metrics import SHIPMENT_STATUS_CONFLICTS
+from app.domain.errors import ConflictError, NotFoundError
+from app.domain.shipment import (
+    Shipment,
+    ShipmentSort,
+    ShipmentStatus,
+    ShipmentVersion,
+    can_transition,
+)
+from app.domain.shipment_event import (
+    ShipmentEventSource,
+    ShipmentEventType,
+    ShipmentTrackingEvent,
+)
+from app.domain.shipment_update import ShipmentStatusChange, ShipmentUpdateType
 from app.persistence.models import ShipmentEventModel, ShipmentModel
 from app.persistence.repositories import (
     MerchantRepository,
     ShipmentEventRepository,
     ShipmentRepository,
+    ShipmentUpdateRepository,
 )
 from app.schemas.shipment_events import ShipmentEventCreate
 from app.schemas.shipments import ShipmentCreate
-from app.services.results import ShipmentCreateResponse
+from app.services.dedup import RecentEventCache
+from app.services.pagination import decode_cursor, encode_cursor
+from app.services.results import (
+    ExternalEventResult,
+    ShipmentBulkCreateResult,
+    ShipmentCreateResponse,
+    ShipmentDetail,
+    ShipmentPage,
+)
+from app.services.shipment_cache import ShipmentCache
+
+_T = TypeVar("_T")
+
+# Attempts at a write that keeps losing races with concurrent requests before it is reported
+# as a conflict.
+_CONFLICT_ATTEMPTS = 3
+
+
+class _ConcurrentDuplicate(Exception):
+    """A concurrent request stored the same carrier event first; raised after the rollback."""
+
+
+def _to_shipment(model: ShipmentModel) -> Shipment:
+    return Shipment(
+        id=model.id,
+        merchant_id=model.merchant_id,
+        name=model.name,
+        external_reference=model.external_reference,
+        status=ShipmentStatus(model.status),
+        carrier=model.carrier,
+        last_event_type=model.last_event_type,
+        last_event_at=model.last_event_at,
+        event_count=model.event_count,
+        updated_at=model.updated_at,
+    )
+
+
+def _to_tracking_event(model: ShipmentEventModel) -> ShipmentTrackingEvent:
+    return ShipmentTrackingEvent(
+        id=model.id,
+        shipment_id=model.shipment_id,
+        type=model.type,
+        source=model.source,
+        reason=model.reason,
+        occurred_at=model.occurred_at,
+    )
+
+
+def _with_pending_events(
+    model: ShipmentModel, summary: tuple[int, ShipmentEventType, datetime] | None
+) -> Shipment:
+    """The shipment as it will be once the summary of its new events is recorded."""
+    shipment = _to_shipment(model)
+    if summary is not None:
+        added, latest_type, latest_at = summary
+        shipment.event_count += added
+        if shipment.last_event_at is None or latest_at >= shipment.last_event_at:
+            shipment.last_event_type, shipment.last_event_at = latest_type, latest_at
+    return shipment
+
+
+# (shipment id, type, payload) rows for the shipment_updates outbox.
+_Update = tuple[UUID, ShipmentUpdateType, object]
+
+
+def _status_update(shipment_id: UUID, current: ShipmentStatus, target: ShipmentStatus) -> _Update:
+    return (
+        shipment_id,
+        ShipmentUpdateType.STATUS,
+        ShipmentStatusChange(shipment_id=shipment_id, status=target, previous_status=current),
+    )
+
+
+def _event_update(event: ShipmentEventModel) -> _Update:
+    return (event.shipment_id, ShipmentUpdateType.EVENT, _to_tracking_event(event))
+
+
+def _status_change(merchant_id: UUID, current: ShipmentStatus, target: ShipmentStatus) -> Counter:
+    changes: Counter = Counter()
+    changes[(merchant_id, current)] -= 1
+    changes[(merchant_id, target)] += 1
+    return changes
 
 
 class ShipmentService:
@@ -23,76 +122,118 @@ class ShipmentService:
         shipment_repo: ShipmentRepository,
         merchant_repo: MerchantRepository,
         event_repo: ShipmentEventRepository | None = None,
+        recent_events: RecentEventCache | None = None,
+        cache: ShipmentCache | None = None,
+        update_repo: ShipmentUpdateRepository | None = None,
     ):
         self.shipment_repo = shipment_repo
         self.merchant_repo = merchant_repo
         self.event_repo = event_repo
+        self.recent_events = recent_events
+        self.cache = cache
+        self.update_repo = update_repo
 
     def create_shipment(self, data: ShipmentCreate) -> ShipmentCreateResponse:
-        merchant = self.merchant_repo.get_by_id(data.merchant_id)
-        if not merchant:
-            raise NotFoundError(f"Merchant {data.merchant_id} not found")
-
-        existing = self.shipment_repo.get_by_merchant_id_and_external_reference(
-            data.merchant_id,
-            data.external_reference,
-        )
-        if existing:
-            shipment = Shipment(
-                id=existing.id,
-                merchant_id=existing.merchant_id,
-                name=existing.name,
-                external_reference=existing.external_reference,
-                status=ShipmentStatus(existing.status),
-            )
-            return ShipmentCreateResponse(shipment=shipment, created=False)
-
-        model = ShipmentModel(
-            merchant_id=data.merchant_id,
-            name=data.name,
-            external_reference=data.external_reference,
-            status=ShipmentStatus.CREATED,
-        )
         try:
-            saved = self.shipment_repo.create(model)
+            saved = self.shipment_repo.create_if_absent(
+                merchant_id=data.merchant_id,
+                external_reference=data.external_reference,
+                name=data.name,
+                status=ShipmentStatus.CREATED,
+                carrier=data.carrier,
+            )
         except IntegrityError as exc:
             self.shipment_repo.db.rollback()
-            existing = self.shipment_repo.get_by_merchant_id_and_external_reference(
-                data.merchant_id,
-                data.external_reference,
+            if isinstance(exc.orig, ForeignKeyViolation):
+                raise NotFoundError(f"Merchant {data.merchant_id} not found") from exc
+            raise
+
+        if saved:
+            return ShipmentCreateResponse(shipment=_to_shipment(saved), created=True)
+
+        existing = self._read_through(
+            lambda cache: cache.get_by_reference(data.merchant_id, data.external_reference),
+            lambda: self.shipment_repo.get_by_merchant_id_and_external_reference(
+                data.merchant_id, data.external_reference
+            ),
+        )
+        return ShipmentCreateResponse(shipment=existing, created=False)
+
+    def create_shipments(self, items: Sequence[ShipmentCreate]) -> list[ShipmentBulkCreateResult]:
+        """Create many shipments with the same idempotency rules as create_shipment.
+
+        New references are inserted with multi-row INSERT ... ON CONFLICT DO NOTHING; only the
+        references that were already taken are selected afterwards. Repeated references within
+        the request resolve to the shipment of their first occurrence.
+        """
+        known_merchants = self.merchant_repo.list_existing_ids(item.merchant_id for item in items)
+
+        rows = {}
+        for item in items:
+            key = (item.merchant_id, item.external_reference)
+            if item.merchant_id in known_merchants and key not in rows:
+                rows[key] = {
+                    "merchant_id": item.merchant_id,
+                    "external_reference": item.external_reference,
+                    "name": item.name,
+                    "status": ShipmentStatus.CREATED,
+                    "carrier": item.carrier,
+                }
+
+        created = {
+            (model.merchant_id, model.external_reference): model
+            for model in self.shipment_repo.create_many_if_absent(list(rows.values()))
+        }
+        existing = {
+            (model.merchant_id, model.external_reference): model
+            for model in self.shipment_repo.list_by_merchant_id_and_external_references(
+                key for key in rows if key not in created
             )
-            if existing:
-                shipment = Shipment(
-                    id=existing.id,
-                    merchant_id=existing.merchant_id,
-                    name=existing.name,
-                    external_reference=existing.external_reference,
-                    status=ShipmentStatus(existing.status),
+        }
+
+        shipments = {key: _to_shipment(model) for key, model in (existing | created).items()}
+        results = []
+        reported_created = set()
+        for item in items:
+            key = (item.merchant_id, item.external_reference)
+            if item.merchant_id not in known_merchants:
+                results.append(
+                    ShipmentBulkCreateResult(
+                        error_code="not_found",
+                        error_message=f"Merchant {item.merchant_id} not found",
+                    )
                 )
-                return ShipmentCreateResponse(shipment=shipment, created=False)
-            raise exc
-
-        shipment = Shipment(
-            id=saved.id,
-            merchant_id=saved.merchant_id,
-            name=saved.name,
-            external_reference=saved.external_reference,
-            status=ShipmentStatus(saved.status),
-        )
-        return ShipmentCreateResponse(shipment=shipment, created=True)
+                continue
+
+            is_new = key in created and key not in reported_created
+            if is_new:
+                reported_created.add(key)
+            results.append(ShipmentBulkCreateResult(shipment=shipments[key], created=is_new))
+        return results
 
     def get_shipment(self, shipment_id: UUID) -> Shipment:
+        shipment = self._read_through(
+            lambda cache: cache.get(shipment_id),
+            lambda: self.shipment_repo.get_by_id(shipment_id),
+        )
+        if not shipment:
+            raise NotFoundError(f"Shipment {shipment_id} not found")
+        return shipment
 
-        model = self.shipment_repo.get_by_id(shipment_id)
-        if not model:
+    def get_shipment_version(self, shipment_id: UUID) -> ShipmentVersion:
+        row = self.shipment_repo.get_version(shipment_id)
+        if not row:
             raise NotFoundError(f"Shipment {shipment_id} not found")
-        return Shipment(
-            id=model.id,
-            merchant_id=model.merchant_id,
-            name=model.name,
-            external_reference=model.external_reference,
-            status=ShipmentStatus(model.status),
-        )
+        return ShipmentVersion(updated_at=row.updated_at, event_count=row.event_count)
+
+    def get_shipment_with_events(self, shipment_id: UUID) -> ShipmentDetail:
+        """The shipment, read before its events so it never looks newer than they are."""
+        if not self.event_repo:
+            raise RuntimeError("Shipment event repository is not configured")
+
+        shipment = self.get_shipment(shipment_id)
+        events = self.event_repo.list_by_shipment_id(shipment_id)
+        return ShipmentDetail(shipment=shipment, events=[_to_tracking_event(e) for e in events])
 
     def list_shipments(
         self,
@@ -100,25 +241,51 @@ class ShipmentService:
         status: ShipmentStatus | None = None,
         limit: int = 50,
         offset: int = 0,
-    ) -> list[Shipment]:
+        cursor: str | None = None,
+        last_event_type: ShipmentEventType | None = None,
+        sort: ShipmentSort = "created_at",
+    ) -> ShipmentPage:
         models = self.shipment_repo.list_filtered(
             merchant_id=merchant_id,
             status=status,
             limit=limit,
             offset=offset,
+            after=decode_cursor(cursor, sort) if cursor else None,
+            last_event_type=last_event_type,
+            sort=sort,
         )
-        return [
-            Shipment(
-                id=m.id,
-                merchant_id=m.merchant_id,
-                name=m.name,
-                external_reference=m.external_reference,
-                status=ShipmentStatus(m.status),
-            )
-            for m in models
-        ]
+        next_cursor = None
+        if len(models) == limit:
+            next_cursor = encode_cursor(getattr(models[-1], sort), models[-1].id, sort)
+        return ShipmentPage(items=[_to_shipment(m) for m in models], next_cursor=next_cursor)
+
+    def list_active_shipments(
+        self, carrier: str, after: UUID | None = None, limit: int = 200
+    ) -> list[Shipment]:
+        models = self.shipment_repo.list_active_by_carrier(carrier, after=after, limit=limit)
+        return [_to_shipment(m) for m in models]
+
+    def export_shipments(
+        self,
+        merchant_id: UUID | None = None,
+        status: ShipmentStatus | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+    ) -> Iterator[Shipment]:
+        for row in self.shipment_repo.stream_filtered(
+            merchant_id=merchant_id,
+            status=status,
+            created_from=created_from,
+            created_to=created_to,
+        ):
+            yield _to_shipment(row)
 
     def update_status(self, shipment_id: UUID, new_status: ShipmentStatus) -> Shipment:
+        return self._retry_on_conflict(
+            "update_status", lambda: self._update_status(shipment_id, new_status)
+        )
+
+    def _update_status(self, shipment_id: UUID, new_status: ShipmentStatus) -> Shipment:
         model = self.shipment_repo.get_by_id(shipment_id)
         if not model:
             raise NotFoundError(f"Shipment {shipment_id} not found")
@@ -127,71 +294,80 @@ class ShipmentService:
         if not can_transition(current_status, new_status):
             raise ValueError(f"Invalid transition from {current_status} to {new_status}")
 
+        self.shipment_repo.adjust_status_counts(
+            _status_change(model.merchant_id, current_status, new_status)
+        )
         model.status = new_status
+        if new_status != current_status:
+            self._record_updates([_status_update(shipment_id, current_status, new_status)])
+        self._publish_changes([shipment_id])
         saved = self.shipment_repo.update_status(model)
-        return Shipment(
-            id=saved.id,
-            merchant_id=saved.merchant_id,
-            name=saved.name,
-            external_reference=saved.external_reference,
-            status=ShipmentStatus(saved.status),
-        )
+        self._invalidate([shipment_id])
+        return _to_shipment(saved)
 
     def add_event(self, shipment_id: UUID, payload: ShipmentEventCreate) -> ShipmentTrackingEvent:
         if not self.event_repo:
             raise RuntimeError("Shipment event repository is not configured")
 
-        model = self.shipment_repo.get_by_id(shipment_id)
-        if not model:
+        occurred_at = payload.occurred_at or datetime.now(timezone.utc)
+        # Updating the event summary doubles as the existence check.
+        if not self.shipment_repo.record_events({shipment_id: (1, payload.type, occurred_at)}):
             raise NotFoundError(f"Shipment {shipment_id} not found")
 
-        event_kwargs = {
-            "shipment_id": shipment_id,
-            "type": payload.type,
-            "source": payload.source,
-            "reason": payload.reason,
-        }
-        if payload.occurred_at is not None:
-            event_kwargs["occurred_at"] = payload.occurred_at
-
-        event = ShipmentEventModel(**event_kwargs)
-        saved = self.event_repo.create(event)
-        return ShipmentTrackingEvent(
-            id=saved.id,
-            shipment_id=saved.shipment_id,
-            type=saved.type,
-            source=saved.source,
-            reason=saved.reason,
-            occurred_at=saved.occurred_at,
+        event = ShipmentEventModel(
+            id=uuid4(),
+            shipment_id=shipment_id,
+            type=payload.type,
+            source=payload.source,
+            reason=payload.reason,
+            occurred_at=occurred_at,
         )
+        self._record_updates([_event_update(event)])
+        self._publish_changes([shipment_id])
+        saved = self.event_repo.create(event)
+        self._invalidate([shipment_id])
+        return _to_tracking_event(saved)
 
     def list_events(self, shipment_id: UUID) -> list[ShipmentTrackingEvent]:
+        return self.get_shipment_with_events(shipment_id).events
+
+    def export_events(
+        self,
+        merchant_id: UUID | None = None,
+        shipment_id: UUID | None = None,
+        occurred_from: datetime | None = None,
+        occurred_to: datetime | None = None,
+    ) -> Iterator[ShipmentTrackingEvent]:
         if not self.event_repo:
             raise RuntimeError("Shipment event repository is not configured")
 
-        model = self.shipment_repo.get_by_id(shipment_id)
-        if not model:
-            raise NotFoundError(f"Shipment {shipment_id} not found")
-
-        events = self.event_repo.list_by_shipment_id(shipment_id)
-        return [
-            ShipmentTrackingEvent(
-                id=e.id,
-                shipment_id=e.shipment_id,
-                type=e.type,
-                source=e.source,
-                reason=e.reason,
-                occurred_at=e.occurred_at,
-            )
-            for e in events
-        ]
+        for row in self.event_repo.stream_filtered(
+            merchant_id=merchant_id,
+            shipment_id=shipment_id,
+            occurred_from=occurred_from,
+            occurred_to=occurred_to,
+        ):
+            yield _to_tracking_event(row)
 
     def process_external_event(
         self,
         adapter_result: AdapterResult,
     ) -> tuple[Shipment, ShipmentTrackingEvent]:
+        """Apply a carrier event, or return the stored one if its dedup key was seen before."""
         if not self.event_repo:
             raise RuntimeError("Shipment event repository is not configured")
+        return self._retry_on_conflict(
+            "external_event", lambda: self._process_external_event(adapter_result)
+        )
+
+    def _process_external_event(
+        self, adapter_result: AdapterResult
+    ) -> tuple[Shipment, ShipmentTrackingEvent]:
+        dedup_key = adapter_result.dedup_key
+        if dedup_key and self.recent_events is not None:
+            cached = self.recent_events.get(dedup_key)
+            if cached is not None:
+                return cached
 
         shipment = self.shipment_repo.get_by_merchant_id_and_external_reference(
             adapter_result.merchant_id,
@@ -202,44 +378,265 @@ class ShipmentService:
                 f"Shipment {adapter_result.shipment_external_reference} not found for merchant {adapter_result.merchant_id}"
             )
 
+        if dedup_key:
+            stored = self.event_repo.get_by_dedup_key(dedup_key, adapter_result.occurred_at)
+            if stored:
+                return self._remember(
+                    dedup_key, (_to_shipment(shipment), _to_tracking_event(stored))
+                )
+
+        updates: list[_Update] = []
         if adapter_result.shipment_status is not None:
             current_status = ShipmentStatus(shipment.status)
             if not can_transition(current_status, adapter_result.shipment_status):
                 raise ValueError(
                     f"Invalid transition from {current_status} to {adapter_result.shipment_status}"
                 )
+            self.shipment_repo.adjust_status_counts(
+                _status_change(shipment.merchant_id, current_status, adapter_result.shipment_status)
+            )
             shipment.status = adapter_result.shipment_status
+            if adapter_result.shipment_status != current_status:
+                updates.append(
+                    _status_update(shipment.id, current_status, adapter_result.shipment_status)
+                )
 
+        self.shipment_repo.record_events(
+            {shipment.id: (1, adapter_result.event_type, adapter_result.occurred_at)}
+        )
         event = ShipmentEventModel(
+            id=uuid4(),
             shipment_id=shipment.id,
             type=adapter_result.event_type,
             source=ShipmentEventSource.CARRIER,
             reason=adapter_result.reason,
             occurred_at=adapter_result.occurred_at,
+            dedup_key=dedup_key,
         )
-        session = self.shipment_repo.db
-        tx_context = session.begin_nested() if session.in_transaction() else session.begin()
-        with tx_context:
-            if adapter_result.shipment_status is not None:
-                session.add(shipment)
-            session.add(event)
-            session.flush()
-            session.refresh(shipment)
-            session.refresh(event)
-
-        updated_shipment = Shipment(
-            id=shipment.id,
-            merchant_id=shipment.merchant_id,
-            name=shipment.name,
-            external_reference=shipment.external_reference,
-            status=ShipmentStatus(shipment.status),
-        )
-        tracking_event = ShipmentTrackingEvent(
-            id=event.id,
-            shipment_id=event.shipment_id,
-            type=event.type,
-            source=event.source,
-            reason=event.reason,
-            occurred_at=event.occurred_at,
+        updates.append(_event_update(event))
+        self._record_updates(updates)
+        self._publish_changes([shipment.id])
+        saved = self.event_repo.create_if_absent(event)
+        if saved is None:
+            # A concurrent delivery of the same event committed first; the retry returns it.
+            raise _ConcurrentDuplicate
+        self._invalidate([shipment.id])
+        return self._remember(dedup_key, (_to_shipment(shipment), _to_tracking_event(saved)))
+
+    def process_external_events(
+        self,
+        adapter_results: Sequence[AdapterResult],
+    ) -> list[ExternalEventResult]:
+        """Apply a batch of carrier events in one transaction.
+
+        Shipments are resolved with a single set-based lookup and transitions are validated in
+        memory, in request order, so later items see the status set by earlier ones. Failing
+        items are reported individually and do not abort the rest of the batch. Events whose
+        dedup key is already stored, or repeated within the batch, are reported with the stored
+        event instead of being applied again.
+        """
+        if not self.event_repo:
+            raise RuntimeError("Shipment event repository is not configured")
+        return self._retry_on_conflict(
+            "external_events", lambda: self._process_external_events(adapter_results)
         )
-        return updated_shipment, tracking_event
+
+    def _process_external_events(
+        self, adapter_results: Sequence[AdapterResult]
+    ) -> list[ExternalEventResult]:
+        cached = {}
+        if self.recent_events is not None:
+            for adapter_result in adapter_results:
+                if adapter_result.dedup_key:
+                    hit = self.recent_events.get(adapter_result.dedup_key)
+                    if hit is not None:
+                        cached[adapter_result.dedup_key] = hit
+        pending = [result for result in adapter_results if result.dedup_key not in cached]
+
+        shipments = {
+            (model.merchant_id, model.external_reference): model
+            for model in self.shipment_repo.list_by_merchant_id_and_external_references(
+                (result.merchant_id, result.shipment_external_reference) for result in pending
+            )
+        }
+        stored_events: dict[str, ShipmentEventModel] = {
+            model.dedup_key: model
+            for model in self.event_repo.list_by_dedup_keys(
+                (result.dedup_key, result.occurred_at) for result in pending if result.dedup_key
+            )
+        }
+
+        results: list[ExternalEventResult] = []
+        events: list[ShipmentEventModel] = []
+        updates: list[_Update] = []
+        status_counts: Counter = Counter()
+        summaries: dict[UUID, tuple[int, ShipmentEventType, datetime]] = {}
+        for adapter_result in adapter_results:
+            if adapter_result.dedup_key in cached:
+                shipment_snapshot, stored_event = cached[adapter_result.dedup_key]
+                results.append(ExternalEventResult(shipment=shipment_snapshot, event=stored_event))
+                continue
+
+            shipment = shipments.get(
+                (adapter_result.merchant_id, adapter_result.shipment_external_reference)
+            )
+            if not shipment:
+                results.append(
+                    ExternalEventResult(
+                        error_code="not_found",
+                        error_message=(
+                            f"Shipment {adapter_result.shipment_external_reference} not found "
+                            f"for merchant {adapter_result.merchant_id}"
+                        ),
+                    )
+                )
+                continue
+
+            stored = (
+                stored_events.get(adapter_result.dedup_key) if adapter_result.dedup_key else None
+            )
+            if stored is not None:
+                results.append(
+                    ExternalEventResult(
+                        shipment=_with_pending_events(shipment, summaries.get(shipment.id)),
+                        event=_to_tracking_event(stored),
+                    )
+                )
+                continue
+
+            if adapter_result.shipment_status is not None:
+                current_status = ShipmentStatus(shipment.status)
+                if not can_transition(current_status, adapter_result.shipment_status):
+                    results.append(
+                        ExternalEventResult(
+                            error_code="invalid_transition",
+                            error_message=(
+                                f"Invalid transition from {current_status} "
+                                f"to {adapter_result.shipment_status}"
+                            ),
+                        )
+                    )
+                    continue
+                status_counts.update(
+                    _status_change(
+                        shipment.merchant_id, current_status, adapter_result.shipment_status
+                    )
+                )
+                shipment.status = adapter_result.shipment_status
+                if adapter_result.shipment_status != current_status:
+                    updates.append(
+                        _status_update(shipment.id, current_status, adapter_result.shipment_status)
+                    )
+
+            event = ShipmentEventModel(
+                id=uuid4(),
+                shipment_id=shipment.id,
+                type=adapter_result.event_type,
+                source=ShipmentEventSource.CARRIER,
+                reason=adapter_result.reason,
+                occurred_at=adapter_result.occurred_at,
+                dedup_key=adapter_result.dedup_key,
+            )
+            events.append(event)
+            updates.append(_event_update(event))
+            if adapter_result.dedup_key:
+                stored_events[adapter_result.dedup_key] = event
+            added, latest_type, latest_at = summaries.get(
+                shipment.id, (0, event.type, event.occurred_at)
+            )
+            if event.occurred_at >= latest_at:
+                latest_type, latest_at = event.type, event.occurred_at
+            summaries[shipment.id] = (added + 1, latest_type, latest_at)
+
+            # The summary columns are written once after the loop; report each item's view.
+            results.append(
+                ExternalEventResult(
+                    shipment=_with_pending_events(shipment, summaries[shipment.id]),
+                    event=_to_tracking_event(event),
+                )
+            )
+
+        if events:
+            self.shipment_repo.adjust_status_counts(status_counts)
+            self.shipment_repo.record_events(summaries)
+            self._record_updates(updates)
+            self._publish_changes(summaries)
+            if not self.event_repo.create_many_if_absent(events):
+                # Another request stored some of these events first; the retry reports them as
+                # duplicates.
+                raise _ConcurrentDuplicate
+            self._invalidate(summaries)
+
+        for adapter_result, result in zip(adapter_results, results):
+            if result.event is not None:
+                self._remember(adapter_result.dedup_key, (result.shipment, result.event))
+        return results
+
+    def _retry_on_conflict(self, operation: str, apply: Callable[[], _T]) -> _T:
+        """Run apply, starting over from a fresh read when a write it made lost a race.
+
+        Status changes are written with UPDATE ... WHERE status_version = <version read>, so a
+        transition validated against a status that a concurrent request has since changed
+        updates no row and is retried against the new status, where it may no longer be
+        allowed. No row lock is held between the read and the write. Carrier events that a
+        concurrent request stored first are retried as well, and then reported as duplicates.
+        """
+        attempt = 1
+        while True:
+            try:
+                return apply()
+            except StaleDataError as exc:
+                self.shipment_repo.db.rollback()
+                if attempt == _CONFLICT_ATTEMPTS:
+                    SHIPMENT_STATUS_CONFLICTS.labels(operation=operation, outcome="rejected").inc()
+                    raise ConflictError(
+                        "Shipment status changed concurrently; retry the request"
+                    ) from exc
+                SHIPMENT_STATUS_CONFLICTS.labels(operation=operation, outcome="retried").inc()
+            except _ConcurrentDuplicate as exc:
+                if attempt == _CONFLICT_ATTEMPTS:
+                    raise ConflictError(
+                        "Carrier events were stored concurrently; retry the request"
+                    ) from exc
+            attempt += 1
+
+    def _read_through(
+        self,
+        lookup: Callable[[ShipmentCache], Shipment | None],
+        load: Callable[[], ShipmentModel | None],
+    ) -> Shipment | None:
+        if self.cache is None:
+            model = load()
+            return _to_shipment(model) if model else None
+
+        cached = lookup(self.cache)
+        if cached is not None:
+            return cached
+        generation = self.cache.generation
+        model = load()
+        if not model:
+            return None
+        shipment = _to_shipment(model)
+        self.cache.put(shipment, generation)
+        return shipment
+
+    def _record_updates(self, updates: list[_Update]) -> None:
+        """Append to the merchant update streams' outbox in the current transaction."""
+        if self.update_repo is not None:
+            self.update_repo.append(updates)
+
+    def _publish_changes(self, shipment_ids: Iterable[UUID]) -> None:
+        """Queue the cache invalidation of other processes; sent when the write commits."""
+        if self.cache is not None and self.cache.enabled:
+            self.shipment_repo.publish_changes(shipment_ids)
+
+    def _invalidate(self, shipment_ids: Iterable[UUID]) -> None:
+        if self.cache is not None:
+            self.cache.invalidate(shipment_ids)
+
+    def _remember(
+        self, dedup_key: str | None, result: tuple[Shipment, ShipmentTrackingEvent]
+    ) -> tuple[Shipment, ShipmentTrackingEvent]:
+        if dedup_key and self.recent_events is not None:
+            self.recent_events.put(dedup_key, result)
+        return result
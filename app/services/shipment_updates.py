@@ -0,0 +1,245 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator, Callable, TypeVar
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.metrics import SHIPMENT_UPDATE_STREAMS, SHIPMENT_UPDATES_DELIVERED
+from app.domain.shipment_update import ShipmentUpdate, ShipmentUpdateType
+from app.persistence.models import ShipmentUpdateModel
+from app.persistence.notifications import listen_for_shipment_updates
+from app.persistence.repositories import ShipmentUpdateRepository
+from app.persistence.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+_PAGE_SIZE = 500
+# How often merchants with committed updates that are not final yet are read again. Updates
+# wait on transactions that do not notify, such as writes without updates.
+_RECHECK_SECONDS = 0.1
+# Before every update.
+_START = (0, 0)
+# Queued in place of further updates once a subscriber has to resume from the outbox.
+_CLOSED = None
+
+
+def _to_update(model: ShipmentUpdateModel) -> ShipmentUpdate:
+    return ShipmentUpdate(
+        id=model.id,
+        xid=model.xid,
+        merchant_id=model.merchant_id,
+        shipment_id=model.shipment_id,
+        type=ShipmentUpdateType(model.type),
+        data=model.data,
+        created_at=model.created_at,
+    )
+
+
+class Subscription:
+    def __init__(self, merchant_id: UUID, queue_size: int):
+        self.merchant_id = merchant_id
+        self.closed = False
+        self._queue: asyncio.Queue[ShipmentUpdate | None] = asyncio.Queue(queue_size + 1)
+        self._queue_size = queue_size
+
+    def deliver(self, update: ShipmentUpdate) -> None:
+        if self.closed:
+            return
+        if self._queue.qsize() >= self._queue_size:
+            self.close()
+            return
+        self._queue.put_nowait(update)
+
+    def close(self) -> None:
+        """Drop pending updates and end the subscription; the client resumes from its last id."""
+        if self.closed:
+            return
+        self.closed = True
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(_CLOSED)
+
+    async def get(self, timeout: float) -> ShipmentUpdate | None:
+        """The next update, or None on timeout or once closed."""
+        with suppress(asyncio.TimeoutError):
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        return None
+
+
+class ShipmentUpdateBroker:
+    """Fans the shipment updates received on one listening connection per process out to the
+    process's stream clients.
+
+    Notifications only name a merchant with new outbox rows. For merchants with connected
+    clients, the broker reads the final updates after the last one it delivered (see
+    ShipmentUpdateRepository), so every client sees them in order and without gaps, and reads
+    again while committed updates wait on older transactions. Clients read their backlog from
+    the outbox directly, and are disconnected to do so again whenever live delivery could have
+    missed updates: when they fall behind, and when the listening connection is lost.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        queue_size: int = settings.shipment_update_stream_queue_size,
+        recheck_seconds: float = _RECHECK_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.queue_size = queue_size
+        self.recheck_seconds = recheck_seconds
+        self._subscriptions: dict[UUID, set[Subscription]] = {}
+        # (xid, id) of the last update delivered, per merchant with subscriptions.
+        self._positions: dict[UUID, tuple[int, int]] = {}
+        # Merchants that may have final updates after their position.
+        self._pending: set[UUID] = set()
+        self._wake: asyncio.Event | None = None
+        # Set while notifications are being received.
+        self.listening = asyncio.Event()
+
+    @asynccontextmanager
+    async def subscribe(self, merchant_id: UUID) -> AsyncIterator[Subscription]:
+        subscription = Subscription(merchant_id, self.queue_size)
+        if merchant_id not in self._positions:
+            position = await self._read(lambda repo: repo.get_final_position(merchant_id))
+            self._positions.setdefault(merchant_id, position)
+        self._subscriptions.setdefault(merchant_id, set()).add(subscription)
+        # Updates committed before the subscription may become final without a notification.
+        self._mark_pending(merchant_id)
+        SHIPMENT_UPDATE_STREAMS.inc()
+        try:
+            yield subscription
+        finally:
+            subscribers = self._subscriptions[merchant_id]
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscriptions[merchant_id]
+                del self._positions[merchant_id]
+                self._pending.discard(merchant_id)
+            SHIPMENT_UPDATE_STREAMS.dec()
+
+    def close_all(self) -> None:
+        for subscribers in self._subscriptions.values():
+            for subscription in subscribers:
+                subscription.close()
+
+    async def stream(
+        self, merchant_id: UUID, last_event_id: int | None, heartbeat_seconds: float
+    ) -> AsyncIterator[ShipmentUpdate | None]:
+        """Yield the merchant's updates after last_event_id, then live ones as they become
+        final.
+
+        None is yielded after heartbeat_seconds without updates. The stream ends when the
+        subscription is closed; reconnecting with the last id received resumes it. An unknown
+        or pruned last_event_id replays every retained update.
+        """
+        async with self.subscribe(merchant_id) as subscription:
+            # Subscribed first, so updates that become final during the replay are queued;
+            # those at or before the replay's last position are skipped.
+            position: tuple[int, int] | None = None
+            if last_event_id is not None:
+                position = (
+                    await self._read(lambda repo: repo.get_position(merchant_id, last_event_id))
+                    or _START
+                )
+                while True:
+                    after = position
+                    models, waiting = await self._read(
+                        lambda repo: repo.list_final_after(merchant_id, after, _PAGE_SIZE)
+                    )
+                    for model in models:
+                        position = (model.xid, model.id)
+                        SHIPMENT_UPDATES_DELIVERED.labels(source="replay").inc()
+                        yield _to_update(model)
+                    if waiting or len(models) < _PAGE_SIZE:
+                        break
+
+            while not subscription.closed:
+                update = await subscription.get(heartbeat_seconds)
+                if update is None:
+                    if not subscription.closed:
+                        yield None
+                elif position is None or (update.xid, update.id) > position:
+                    position = (update.xid, update.id)
+                    SHIPMENT_UPDATES_DELIVERED.labels(source="live").inc()
+                    yield update
+
+    async def run(self, database_url: str, stop: asyncio.Event, retry_seconds: float = 1.0) -> None:
+        """Deliver notified updates to subscribers until stop is set."""
+        self._wake = asyncio.Event()
+        delivery = asyncio.create_task(self._deliver_pending(stop, self._wake))
+        try:
+            while not stop.is_set():
+                try:
+                    async for merchant_id in listen_for_shipment_updates(
+                        database_url, stop, self._on_listening
+                    ):
+                        if merchant_id in self._subscriptions:
+                            self._mark_pending(merchant_id)
+                except Exception:
+                    logger.exception("Shipment update listener failed; reconnecting")
+                self.listening.clear()
+                self.close_all()
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(stop.wait(), retry_seconds)
+        finally:
+            delivery.cancel()
+            with suppress(asyncio.CancelledError):
+                await delivery
+            self._wake = None
+
+    def _on_listening(self) -> None:
+        # Updates committed while the connection was down were not notified.
+        self.close_all()
+        self.listening.set()
+
+    def _mark_pending(self, merchant_id: UUID) -> None:
+        self._pending.add(merchant_id)
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _deliver_pending(self, stop: asyncio.Event, wake: asyncio.Event) -> None:
+        # The only task that delivers, so each merchant's updates go out once and in order.
+        while not stop.is_set():
+            timeout = self.recheck_seconds if self._pending else None
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(wake.wait(), timeout)
+            wake.clear()
+            for merchant_id in list(self._pending):
+                try:
+                    await self._deliver(merchant_id)
+                except Exception:
+                    logger.exception("Failed to deliver shipment updates of %s", merchant_id)
+
+    async def _deliver(self, merchant_id: UUID) -> None:
+        # Cleared first: a notification during the read marks the merchant again.
+        self._pending.discard(merchant_id)
+        while merchant_id in self._positions:
+            after = self._positions[merchant_id]
+            models, waiting = await self._read(
+                lambda repo: repo.list_final_after(merchant_id, after, _PAGE_SIZE)
+            )
+            if merchant_id not in self._positions:
+                return
+            for model in models:
+                update = _to_update(model)
+                for subscription in list(self._subscriptions.get(merchant_id, ())):
+                    subscription.deliver(update)
+            if models:
+                last = (models[-1].xid, models[-1].id)
+                self._positions[merchant_id] = max(self._positions[merchant_id], last)
+            if waiting:
+                self._pending.add(merchant_id)
+            if waiting or len(models) < _PAGE_SIZE:
+                return
+
+    async def _read(self, query: Callable[[ShipmentUpdateRepository], _T]) -> _T:
+        async with self.session_factory() as db:
+            return await db.run_sync(lambda session: query(ShipmentUpdateRepository(session)))
+
+
+shipment_update_broker = ShipmentUpdateBroker()
@@ -0,0 +1,204 @@
+import argparse
+import asyncio
+import logging
+import signal
+import time
+from collections import OrderedDict
+from contextlib import suppress
+from uuid import UUID
+
+import httpx
+from prometheus_client import start_http_server
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.adapters.base import AdapterResult, external_event_key, ingest_many
+from app.adapters.registry import get_adapter
+from app.adapters.schemas import ExternalCarrierEvent
+from app.adapters.tracking_client import CarrierPollingError, CarrierTrackingClient
+from app.core.config import settings
+from app.core.metrics import record_ingest
+from app.domain.errors import ConflictError
+from app.domain.shipment import Shipment
+from app.persistence.session import AsyncSessionLocal
+from app.services.async_shipment_service import AsyncShipmentService
+
+logger = logging.getLogger(__name__)
+
+
+class CarrierPoller:
+    """Polls one carrier's tracking API for its active shipments and applies new events.
+
+    Active shipments are walked in id order, batch_size at a time. The tracking requests of a
+    batch run concurrently within the client's limits, and the resulting events go through the
+    adapter and the batch ingest pipeline in one transaction per batch.
+
+    Carriers return a shipment's full history on every poll. Events whose outcome is final
+    (applied, or rejected by the adapter or the ingest) are remembered, up to settled_events
+    of them, and skipped in later rounds, so each is counted in the ingest metrics once.
+    """
+
+    def __init__(
+        self,
+        carrier: str,
+        client: CarrierTrackingClient,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        batch_size: int = settings.carrier_poll_batch_size,
+        settled_events: int = settings.carrier_poll_settled_events,
+    ):
+        self.carrier = carrier
+        self.client = client
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.settled_events = settled_events
+        self._settled: OrderedDict[str, None] = OrderedDict()
+
+    async def run_once(self) -> int:
+        """Poll every active shipment of the carrier once; returns the number polled."""
+        polled = 0
+        after: UUID | None = None
+        while True:
+            async with self.session_factory() as db:
+                shipments = await AsyncShipmentService(db).list_active_shipments(
+                    self.carrier, after, self.batch_size
+                )
+            if not shipments:
+                break
+
+            fetched = await asyncio.gather(*(self._fetch(shipment) for shipment in shipments))
+            await self._apply([payload for payloads in fetched for payload in payloads])
+
+            polled += len(shipments)
+            after = shipments[-1].id
+            if len(shipments) < self.batch_size:
+                break
+        return polled
+
+    async def _fetch(self, shipment: Shipment) -> list[ExternalCarrierEvent]:
+        try:
+            return await self.client.fetch_events(shipment)
+        except CarrierPollingError as e:
+            logger.warning("Skipping shipment %s this round: %s", shipment.id, e)
+            return []
+
+    async def _apply(self, payloads: list[ExternalCarrierEvent]) -> None:
+        keyed = [(self._event_key(payload), payload) for payload in payloads]
+        keyed = [(key, payload) for key, payload in keyed if key not in self._settled]
+        if not keyed:
+            return
+        outcomes = await ingest_many(get_adapter(self.carrier), [payload for _, payload in keyed])
+        adapter_results: list[AdapterResult] = []
+        applied_keys: list[str] = []
+        for (key, _), outcome in zip(keyed, outcomes):
+            if isinstance(outcome, ValueError):
+                record_ingest(self.carrier, "invalid_external_event")
+                self._settle(key)
+            else:
+                adapter_results.append(outcome)
+                applied_keys.append(key)
+
+        try:
+            async with self.session_factory() as db:
+                results = await AsyncShipmentService(db).process_external_events(adapter_results)
+        except ConflictError as e:
+            # The batch was rolled back; its events are not settled and are polled again.
+            logger.warning(
+                "Skipping %d %s events this round: %s", len(applied_keys), self.carrier, e
+            )
+            for _ in applied_keys:
+                record_ingest(self.carrier, "conflict")
+            return
+        for key, result in zip(applied_keys, results):
+            record_ingest(self.carrier, result.error_code or "processed")
+            self._settle(key)
+
+    def _event_key(self, payload: ExternalCarrierEvent) -> str:
+        return external_event_key(
+            self.carrier,
+            payload.merchant_id,
+            payload.external_reference,
+            payload.event_code,
+            payload.event_time,
+        )
+
+    def _settle(self, key: str) -> None:
+        if self.settled_events <= 0:
+            return
+        self._settled[key] = None
+        self._settled.move_to_end(key)
+        while len(self._settled) > self.settled_events:
+            self._settled.popitem(last=False)
+
+
+async def run_pollers(
+    pollers: list[CarrierPoller],
+    stop: asyncio.Event,
+    interval_seconds: float = settings.carrier_poll_interval_seconds,
+) -> None:
+    async def _loop(poller: CarrierPoller) -> None:
+        while not stop.is_set():
+            started = time.monotonic()
+            try:
+                polled = await poller.run_once()
+                logger.info("Polled %d %s shipments", polled, poller.carrier)
+            except Exception:
+                logger.exception("Polling %s failed", poller.carrier)
+            remaining = interval_seconds - (time.monotonic() - started)
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(stop.wait(), max(remaining, 0))
+
+    await asyncio.gather(*(_loop(poller) for poller in pollers))
+
+
+async def _main(args: argparse.Namespace) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    carriers = args.carrier or list(settings.carrier_polling)
+    unknown = [carrier for carrier in carriers if carrier not in settings.carrier_polling]
+    if unknown:
+        raise SystemExit(f"No CARRIER_POLLING configuration for: {', '.join(unknown)}")
+    configs = {carrier: settings.carrier_polling[carrier] for carrier in carriers}
+
+    connections = sum(config.concurrency for config in configs.values())
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    async with httpx.AsyncClient(
+        timeout=settings.carrier_poll_timeout_seconds, limits=limits
+    ) as http:
+        pollers = [
+            CarrierPoller(
+                carrier,
+                CarrierTrackingClient(carrier, config, http, settings.carrier_poll_max_retries),
+                batch_size=args.batch_size,
+            )
+            for carrier, config in configs.items()
+        ]
+        logger.info("Polling %s", ", ".join(carriers))
+        await run_pollers(pollers, stop, args.interval)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Poll carrier tracking APIs for shipments of carriers without webhooks."
+    )
+    parser.add_argument(
+        "--carrier",
+        action="append",
+        help="Carrier to poll; repeatable (default: every carrier in CARRIER_POLLING).",
+    )
+    parser.add_argument("--interval", type=float, default=settings.carrier_poll_interval_seconds)
+    parser.add_argument("--batch-size", type=int, default=settings.carrier_poll_batch_size)
+    parser.add_argument(
+        "--metrics-port", type=int, default=None, help="Serve Prometheus metrics on this port."
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if args.metrics_port:
+        start_http_server(args.metrics_port)
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import argparse
+import asyncio
+import logging
+import signal
+from contextlib import suppress
+
+from prometheus_client import start_http_server
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.adapters.registry import get_adapter
+from app.adapters.schemas import ExternalCarrierEvent
+from app.core.config import settings
+from app.core.metrics import UNKNOWN_CARRIER, record_ingest
+from app.domain.errors import ConflictError, NotFoundError
+from app.domain.inbox import InboxEntry
+from app.persistence.session import AsyncSessionLocal
+from app.services.async_shipment_service import AsyncShipmentService
+from app.services.inbox_service import AsyncInboxService
+
+logger = logging.getLogger(__name__)
+
+
+class InboxWorker:
+    """Claims queued carrier events and runs them through the regular ingest pipeline."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        batch_size: int = settings.inbox_batch_size,
+        claim_timeout_seconds: float = settings.inbox_claim_timeout_seconds,
+        max_attempts: int = settings.inbox_max_attempts,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.claim_timeout_seconds = claim_timeout_seconds
+        self.max_attempts = max_attempts
+
+    async def run_once(self) -> int:
+        """Claim and process one batch; returns the number of entries claimed."""
+        async with self.session_factory() as db:
+            entries = await AsyncInboxService(db).claim(self.batch_size, self.claim_timeout_seconds)
+        for entry in entries:
+            await self._process(entry)
+        return len(entries)
+
+    async def _process(self, entry: InboxEntry) -> None:
+        async with self.session_factory() as db:
+            inbox = AsyncInboxService(db)
+            try:
+                adapter = get_adapter(entry.carrier)
+            except ValueError as e:
+                record_ingest(UNKNOWN_CARRIER, "invalid_external_event")
+                await inbox.fail(entry.id, "invalid_external_event", str(e))
+                return
+
+            try:
+                payload = ExternalCarrierEvent.model_validate(entry.payload)
+                adapter_result = await adapter.ingest_event(payload)
+            except ValueError as e:
+                record_ingest(entry.carrier, "invalid_external_event")
+                await inbox.fail(entry.id, "invalid_external_event", str(e))
+                return
+
+            try:
+                await AsyncShipmentService(db).process_external_event(adapter_result)
+            except NotFoundError as e:
+                record_ingest(entry.carrier, "not_found")
+                await db.rollback()
+                await inbox.fail(entry.id, "not_found", str(e))
+            except ConflictError as e:
+                # Lost every status race against concurrent writers; retrying later rereads it.
+                record_ingest(entry.carrier, "conflict")
+                await db.rollback()
+                if entry.attempts >= self.max_attempts:
+                    await inbox.fail(entry.id, "conflict", str(e))
+                else:
+                    await inbox.release(entry.id, "conflict", str(e))
+            except ValueError as e:
+                record_ingest(entry.carrier, "invalid_transition")
+                await db.rollback()
+                await inbox.fail(entry.id, "invalid_transition", str(e))
+            except Exception as e:
+                logger.exception("Failed to process inbox entry %s", entry.id)
+                record_ingest(entry.carrier, "processing_error")
+                await db.rollback()
+                if entry.attempts >= self.max_attempts:
+                    await inbox.fail(entry.id, "processing_error", str(e))
+                else:
+                    await inbox.release(entry.id, "processing_error", str(e))
+            else:
+                record_ingest(entry.carrier, "processed")
+                await inbox.complete(entry.id)
+
+
+async def run_worker_pool(
+    concurrency: int,
+    stop: asyncio.Event,
+    poll_interval_seconds: float = settings.inbox_poll_interval_seconds,
+    worker: InboxWorker | None = None,
+) -> None:
+    worker = worker or InboxWorker()
+
+    async def _loop() -> None:
+        while not stop.is_set():
+            if not await worker.run_once():
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(stop.wait(), poll_interval_seconds)
+
+    await asyncio.gather(*(_loop() for _ in range(concurrency)))
+
+
+async def _main(args: argparse.Namespace) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    worker = InboxWorker(batch_size=args.batch_size)
+    logger.info("Starting %d inbox workers", args.concurrency)
+    await run_worker_pool(args.concurrency, stop, args.poll_interval, worker)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Process carrier events queued in the inbox.")
+    parser.add_argument("--concurrency", type=int, default=settings.inbox_worker_concurrency)
+    parser.add_argument("--batch-size", type=int, default=settings.inbox_batch_size)
+    parser.add_argument("--poll-interval", type=float, default=settings.inbox_poll_interval_seconds)
+    parser.add_argument(
+        "--metrics-port", type=int, default=None, help="Serve Prometheus metrics on this port."
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if args.metrics_port:
+        start_http_server(args.metrics_port)
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
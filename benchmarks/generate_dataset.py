@@ -0,0 +1,245 @@
+"""Populate a database with a production-sized synthetic dataset.
+
+Merchants get a Zipf-skewed share of the shipments, and every shipment gets an event history
+that walks ALLOWED_TRANSITIONS from CREATED. Rows are loaded with COPY in chunks, and the same
+seed always produces the same rows (ids included), so benchmark and EXPLAIN results can be
+compared between runs.
+
+    python -m benchmarks.generate_dataset --merchants 5000 --shipments 20000000 --truncate
+"""
+
+import argparse
+import bisect
+import random
+import sys
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+from sqlalchemy import create_engine
+
+from app.domain.shipment import ALLOWED_TRANSITIONS, ShipmentStatus
+from app.domain.shipment_event import ShipmentEventSource, ShipmentEventType
+from app.persistence.models import Base, ShipmentEventModel, ShipmentModel
+from app.persistence.partitions import create_partitions
+
+# Events recorded when a shipment enters a status. Cancellation has no carrier event.
+_STATUS_EVENTS = {
+    ShipmentStatus.IN_TRANSIT: (ShipmentEventType.PICKED_UP,),
+    ShipmentStatus.DELIVERED: (ShipmentEventType.OUT_FOR_DELIVERY, ShipmentEventType.DELIVERED),
+    ShipmentStatus.FAILED: (
+        ShipmentEventType.OUT_FOR_DELIVERY,
+        ShipmentEventType.DELIVERY_FAILED,
+    ),
+    ShipmentStatus.CANCELLED: (),
+}
+
+# Chance that a shipment stays in a non-terminal status instead of moving on.
+_STAY_PROBABILITY = {ShipmentStatus.CREATED: 0.1, ShipmentStatus.IN_TRANSIT: 0.15}
+
+# Relative likelihood of each allowed target status; most shipments get delivered.
+_TRANSITION_WEIGHTS = {
+    ShipmentStatus.IN_TRANSIT: 95,
+    ShipmentStatus.DELIVERED: 90,
+    ShipmentStatus.FAILED: 7,
+    ShipmentStatus.CANCELLED: 3,
+}
+
+
+def _db_labels(column) -> dict:
+    """Map enum members to the labels Postgres stores for them (COPY bypasses the ORM)."""
+    return dict(zip(column.type.enum_class, column.type.enums))
+
+
+_SHIPMENT_STATUS_LABELS = _db_labels(ShipmentModel.__table__.c.status)
+_EVENT_TYPE_LABELS = _db_labels(ShipmentEventModel.__table__.c.type)
+_EVENT_SOURCE_LABELS = _db_labels(ShipmentEventModel.__table__.c.source)
+
+
+@dataclass
+class DatasetStats:
+    merchants: int = 0
+    shipments: int = 0
+    events: int = 0
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _zipf_cum_weights(count: int, exponent: float) -> list[float]:
+    return list(accumulate(1.0 / rank**exponent for rank in range(1, count + 1)))
+
+
+def _walk_history(
+    rng: random.Random, created_at: datetime
+) -> tuple[ShipmentStatus, list[tuple[ShipmentEventType, datetime]]]:
+    status = ShipmentStatus.CREATED
+    occurred_at = created_at
+    events = [(ShipmentEventType.LABEL_CREATED, occurred_at)]
+    while ALLOWED_TRANSITIONS[status] and rng.random() >= _STAY_PROBABILITY[status]:
+        targets = sorted(ALLOWED_TRANSITIONS[status], key=lambda target: target.value)
+        status = rng.choices(targets, [_TRANSITION_WEIGHTS[target] for target in targets])[0]
+        for event_type in _STATUS_EVENTS[status]:
+            occurred_at += timedelta(minutes=rng.randint(30, 48 * 60))
+            events.append((event_type, occurred_at))
+    return status, events
+
+
+def generate(
+    dbapi_connection,
+    merchants: int,
+    shipments: int,
+    seed: int = 1,
+    zipf_exponent: float = 1.1,
+    start: datetime = datetime(2025, 1, 1, tzinfo=timezone.utc),
+    days: int = 365,
+    chunk_size: int = 50_000,
+    truncate: bool = False,
+) -> DatasetStats:
+    """Load merchants, shipments and events through a psycopg connection with COPY."""
+    rng = random.Random(seed)
+    stats = DatasetStats()
+    window_seconds = days * 24 * 3600
+
+    with dbapi_connection.cursor() as cursor:
+        if truncate:
+            tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+            cursor.execute(f"TRUNCATE {tables} CASCADE")
+
+        merchant_ids = [_uuid(rng) for _ in range(merchants)]
+        with cursor.copy("COPY merchants (id, name, created_at) FROM STDIN") as copy:
+            for index, merchant_id in enumerate(merchant_ids):
+                copy.write_row((merchant_id, f"merchant-{seed}-{index:06d}", start))
+        dbapi_connection.commit()
+        stats.merchants = merchants
+
+        cum_weights = _zipf_cum_weights(merchants, zipf_exponent)
+        total_weight = cum_weights[-1]
+        source = _EVENT_SOURCE_LABELS[ShipmentEventSource.CARRIER]
+
+        for chunk_start in range(0, shipments, chunk_size):
+            shipment_rows = []
+            event_rows = []
+            for number in range(chunk_start, min(chunk_start + chunk_size, shipments)):
+                merchant_index = bisect.bisect(cum_weights, rng.random() * total_weight)
+                shipment_id = _uuid(rng)
+                created_at = start + timedelta(seconds=rng.randrange(window_seconds))
+                status, events = _walk_history(rng, created_at)
+                shipment_rows.append(
+                    (
+                        shipment_id,
+                        merchant_ids[min(merchant_index, merchants - 1)],
+                        f"ORD-{seed}-{number:010d}",
+                        f"Order {number}",
+                        _SHIPMENT_STATUS_LABELS[status],
+                        created_at,
+                        events[-1][1],
+                        _EVENT_TYPE_LABELS[events[-1][0]],
+                        events[-1][1],
+                        len(events),
+                    )
+                )
+                for event_type, occurred_at in events:
+                    event_rows.append(
+                        (
+                            _uuid(rng),
+                            shipment_id,
+                            _EVENT_TYPE_LABELS[event_type],
+                            source,
+                            occurred_at,
+                            occurred_at,
+                        )
+                    )
+
+            with cursor.copy(
+                "COPY shipments (id, merchant_id, external_reference, name, status, created_at,"
+                " updated_at, last_event_type, last_event_at, event_count) FROM STDIN"
+            ) as copy:
+                for row in shipment_rows:
+                    copy.write_row(row)
+            with cursor.copy(
+                "COPY shipment_events (id, shipment_id, type, source, occurred_at, created_at)"
+                " FROM STDIN"
+            ) as copy:
+                for row in event_rows:
+                    copy.write_row(row)
+            dbapi_connection.commit()
+            stats.shipments += len(shipment_rows)
+            stats.events += len(event_rows)
+            print(f"{stats.shipments}/{shipments} shipments", file=sys.stderr)
+
+        # COPY bypasses the services, so the per-merchant counters are rebuilt in one pass.
+        cursor.execute("DELETE FROM merchant_shipment_stats")
+        cursor.execute(
+            "INSERT INTO merchant_shipment_stats (merchant_id, status, count) "
+            "SELECT merchant_id, status, count(*) FROM shipments GROUP BY merchant_id, status"
+        )
+        cursor.execute("ANALYZE")
+    dbapi_connection.commit()
+    return stats
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic shipments dataset.")
+    parser.add_argument(
+        "--database-url", help="SQLAlchemy URL (default: DATABASE_URL from the settings)."
+    )
+    parser.add_argument("--merchants", type=int, default=1000)
+    parser.add_argument("--shipments", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--zipf-exponent",
+        type=float,
+        default=1.1,
+        help="Skew of shipments per merchant; larger values concentrate on fewer merchants.",
+    )
+    parser.add_argument("--days", type=int, default=365, help="Spread of created_at values.")
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument(
+        "--truncate", action="store_true", help="Empty all application tables first."
+    )
+    args = parser.parse_args(argv)
+
+    if args.database_url:
+        database_url = args.database_url
+    else:
+        from app.core.config import settings
+
+        database_url = settings.database_url
+
+    engine = create_engine(database_url)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    # Events run up to a few weeks past the created_at window; without monthly partitions
+    # they would all pile up in the default partition.
+    with engine.begin() as connection:
+        create_partitions(connection, start.date(), (start + timedelta(days=args.days + 60)).date())
+    dbapi_connection = engine.raw_connection()
+    started = time.perf_counter()
+    try:
+        stats = generate(
+            dbapi_connection.driver_connection,
+            merchants=args.merchants,
+            shipments=args.shipments,
+            seed=args.seed,
+            start=start,
+            zipf_exponent=args.zipf_exponent,
+            days=args.days,
+            chunk_size=args.chunk_size,
+            truncate=args.truncate,
+        )
+    finally:
+        dbapi_connection.close()
+        engine.dispose()
+    print(
+        f"Loaded {stats.merchants} merchants, {stats.shipments} shipments and {stats.events}"
+        f" events in {time.perf_counter() - started:.1f}s",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
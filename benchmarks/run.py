@@ -0,0 +1,325 @@
+"""Load benchmark for the API hot paths.
+
+Runs each scenario against a running service at a fixed concurrency and reports throughput and
+latency percentiles as JSON. With --baseline, the results are compared against a previous run
+and the exit code is non-zero when a scenario regressed beyond --threshold.
+
+    docker compose up -d db api
+    python -m benchmarks.run --base-url http://localhost:8000 --output bench.json
+    python -m benchmarks.run --baseline bench.json --threshold 0.15
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import sys
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+
+import httpx
+
+API_PREFIX = "/api/v1"
+PAGE_SIZE = 50
+EVENT_TYPES = ["label_created", "picked_up", "out_for_delivery"]
+
+
+@dataclass
+class BenchmarkContext:
+    merchant_id: str
+    shipment_ids: list[str]
+    external_references: list[str]
+    deep_cursor: str | None = None
+    run_id: str = field(default_factory=lambda: uuid.uuid4().hex[:8])
+    counter: int = 0
+    # Last ETag seen per URL, for the conditional GET scenario.
+    etags: dict[str, str] = field(default_factory=dict)
+
+    def next_reference(self) -> str:
+        self.counter += 1
+        return f"bench-{self.run_id}-new-{self.counter}"
+
+
+@dataclass
+class ScenarioResult:
+    requests: int
+    errors: int
+    duration_seconds: float
+    throughput_rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+Scenario = Callable[[httpx.AsyncClient, BenchmarkContext, random.Random], Awaitable[httpx.Response]]
+
+
+async def _create_shipment(client, ctx, rng):
+    payload = {
+        "merchant_id": ctx.merchant_id,
+        "name": "Benchmark order",
+        "external_reference": ctx.next_reference(),
+    }
+    return await client.post(f"{API_PREFIX}/shipments", json=payload)
+
+
+async def _get_shipment(client, ctx, rng):
+    return await client.get(f"{API_PREFIX}/shipments/{rng.choice(ctx.shipment_ids)}")
+
+
+async def _revalidate_shipment(client, ctx, rng):
+    url = f"{API_PREFIX}/shipments/{rng.choice(ctx.shipment_ids)}"
+    etag = ctx.etags.get(url)
+    response = await client.get(url, headers={"If-None-Match": etag} if etag else None)
+    if "ETag" in response.headers:
+        ctx.etags[url] = response.headers["ETag"]
+    return response
+
+
+async def _list_shallow(client, ctx, rng):
+    return await client.get(
+        f"{API_PREFIX}/shipments", params={"merchant_id": ctx.merchant_id, "limit": PAGE_SIZE}
+    )
+
+
+async def _list_deep_offset(client, ctx, rng):
+    offset = max(len(ctx.shipment_ids) - PAGE_SIZE, 0)
+    return await client.get(
+        f"{API_PREFIX}/shipments",
+        params={"merchant_id": ctx.merchant_id, "limit": PAGE_SIZE, "offset": offset},
+    )
+
+
+async def _list_deep_cursor(client, ctx, rng):
+    params = {"merchant_id": ctx.merchant_id, "limit": PAGE_SIZE}
+    if ctx.deep_cursor:
+        params["cursor"] = ctx.deep_cursor
+    return await client.get(f"{API_PREFIX}/shipments", params=params)
+
+
+async def _add_event(client, ctx, rng):
+    payload = {
+        "type": rng.choice(EVENT_TYPES),
+        "source": "carrier",
+        "reason": "benchmark",
+        "occurred_at": datetime.now(timezone.utc).isoformat(),
+    }
+    shipment_id = rng.choice(ctx.shipment_ids)
+    return await client.post(f"{API_PREFIX}/shipments/{shipment_id}/events", json=payload)
+
+
+async def _list_events(client, ctx, rng):
+    return await client.get(f"{API_PREFIX}/shipments/{rng.choice(ctx.shipment_ids)}/events")
+
+
+async def _ingest_external_event(client, ctx, rng):
+    payload = {
+        "carrier": "mock",
+        "merchant_id": ctx.merchant_id,
+        "external_reference": rng.choice(ctx.external_references),
+        "event_code": "IN_TRANSIT",
+        "event_time": datetime.now(timezone.utc).isoformat(),
+    }
+    return await client.post(f"{API_PREFIX}/shipments/events/external", json=payload)
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "create_shipment": _create_shipment,
+    "get_shipment": _get_shipment,
+    "revalidate_shipment": _revalidate_shipment,
+    "list_shipments_shallow": _list_shallow,
+    "list_shipments_deep_offset": _list_deep_offset,
+    "list_shipments_deep_cursor": _list_deep_cursor,
+    "add_event": _add_event,
+    "list_events": _list_events,
+    "ingest_external_event": _ingest_external_event,
+}
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(fraction * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+async def _setup(client: httpx.AsyncClient, shipments: int) -> BenchmarkContext:
+    response = await client.post(
+        f"{API_PREFIX}/merchant", json={"name": f"benchmark-{uuid.uuid4().hex}"}
+    )
+    response.raise_for_status()
+    merchant_id = response.json()["id"]
+
+    references = [f"bench-{uuid.uuid4().hex[:12]}-{i}" for i in range(shipments)]
+    shipment_ids = []
+    for start in range(0, shipments, 1000):
+        items = [
+            {"merchant_id": merchant_id, "name": "Benchmark order", "external_reference": ref}
+            for ref in references[start : start + 1000]
+        ]
+        response = await client.post(f"{API_PREFIX}/shipments/bulk", json=items)
+        response.raise_for_status()
+        shipment_ids.extend(item["shipment"]["id"] for item in response.json()["items"])
+
+    # Walk the cursors once so the deep cursor scenario requests the same last page as the
+    # deep offset scenario.
+    deep_cursor = None
+    params = {"merchant_id": merchant_id, "limit": PAGE_SIZE}
+    for _ in range((shipments - 1) // PAGE_SIZE):
+        response = await client.get(f"{API_PREFIX}/shipments", params=params)
+        response.raise_for_status()
+        deep_cursor = params["cursor"] = response.headers["X-Next-Cursor"]
+    return BenchmarkContext(merchant_id, shipment_ids, references, deep_cursor)
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    ctx: BenchmarkContext,
+    scenario: Scenario,
+    concurrency: int,
+    duration_seconds: float,
+    seed: int,
+) -> ScenarioResult:
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration_seconds
+
+    async def _worker(worker_id: int) -> None:
+        nonlocal errors
+        rng = random.Random(seed + worker_id)
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = await scenario(client, ctx, rng)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - start)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return ScenarioResult(
+        requests=len(latencies),
+        errors=errors,
+        duration_seconds=round(elapsed, 3),
+        throughput_rps=round(len(latencies) / elapsed, 2),
+        p50_ms=round(percentile(latencies, 0.50) * 1000, 3),
+        p95_ms=round(percentile(latencies, 0.95) * 1000, 3),
+        p99_ms=round(percentile(latencies, 0.99) * 1000, 3),
+    )
+
+
+def compare_results(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Return a description of every scenario that regressed beyond threshold.
+
+    A scenario regresses when its p95 latency grew, or its throughput shrank, by more than
+    threshold (a fraction of the baseline value).
+    """
+    regressions = []
+    for name, base in baseline["results"].items():
+        result = current["results"].get(name)
+        if result is None:
+            continue
+        if base["p95_ms"] and result["p95_ms"] > base["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {base['p95_ms']:.1f}ms -> {result['p95_ms']:.1f}ms")
+        if base["throughput_rps"] and result["throughput_rps"] < base["throughput_rps"] * (
+            1 - threshold
+        ):
+            regressions.append(
+                f"{name}: throughput {base['throughput_rps']:.1f} -> "
+                f"{result['throughput_rps']:.1f} req/s"
+            )
+    return regressions
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    limits = httpx.Limits(
+        max_connections=args.concurrency, max_keepalive_connections=args.concurrency
+    )
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+        ctx = await _setup(client, args.shipments)
+        results = {}
+        for name in args.scenarios:
+            result = await run_scenario(
+                client, ctx, SCENARIOS[name], args.concurrency, args.duration, args.seed
+            )
+            results[name] = asdict(result)
+            print(
+                f"{name:<28} {result.throughput_rps:>9.1f} req/s  p50 {result.p50_ms:>8.2f}ms"
+                f"  p95 {result.p95_ms:>8.2f}ms  p99 {result.p99_ms:>8.2f}ms"
+                f"  errors {result.errors}",
+                file=sys.stderr,
+            )
+    return {
+        "meta": {
+            "base_url": args.base_url,
+            "concurrency": args.concurrency,
+            "duration_seconds": args.duration,
+            "shipments": args.shipments,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+        },
+        "results": results,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Carrier Gateway API hot paths.")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per scenario.")
+    parser.add_argument(
+        "--shipments", type=int, default=5000, help="Shipments seeded for read scenarios."
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--scenarios",
+        type=lambda value: value.split(","),
+        default=list(SCENARIOS),
+        help=f"Comma-separated subset of: {', '.join(SCENARIOS)}",
+    )
+    parser.add_argument("--output", help="Write results as JSON to this file (default: stdout).")
+    parser.add_argument("--baseline", help="Compare against results from a previous run.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Allowed relative regression before failing (default: 0.1).",
+    )
+    args = parser.parse_args(argv)
+
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    report = asyncio.run(_run(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+        regressions = compare_results(report, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""CPU cost of encoding list responses, through response_model validation vs direct encoding.
+
+Serves the same in-memory page from two in-process routes: one returning the dataclasses for
+FastAPI to validate against the response model (how list endpoints used to respond), one
+encoding them with app.api.v1.encoding. No database or network is involved, so the difference
+is the CPU each list request saves.
+
+    python -m benchmarks.serialization --items 100 --requests 2000
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+from app.api.v1.encoding import json_list_response
+from app.domain.shipment import Shipment, ShipmentStatus
+from app.domain.shipment_event import (
+    ShipmentEventSource,
+    ShipmentEventType,
+    ShipmentTrackingEvent,
+)
+from app.schemas.shipment_events import ShipmentEventResponse
+from app.schemas.shipments import ShipmentResponse
+
+
+def _page(items: int) -> dict[str, tuple[list, type[BaseModel]]]:
+    now = datetime.now(timezone.utc)
+    shipments = [
+        Shipment(
+            id=uuid.uuid4(),
+            merchant_id=uuid.uuid4(),
+            name=f"Benchmark order {index}",
+            external_reference=f"bench-{index}",
+            status=ShipmentStatus.IN_TRANSIT,
+            carrier="mock",
+            last_event_type=ShipmentEventType.PICKED_UP,
+            last_event_at=now - timedelta(minutes=index),
+            event_count=2,
+            updated_at=now,
+        )
+        for index in range(items)
+    ]
+    events = [
+        ShipmentTrackingEvent(
+            id=uuid.uuid4(),
+            shipment_id=shipments[0].id,
+            type=ShipmentEventType.PICKED_UP,
+            source=ShipmentEventSource.CARRIER,
+            reason=None,
+            occurred_at=now - timedelta(minutes=index),
+        )
+        for index in range(items)
+    ]
+    return {
+        "shipments": (shipments, ShipmentResponse),
+        "events": (events, ShipmentEventResponse),
+    }
+
+
+def _routes(items: list, schema: type[BaseModel]):
+    def _validated():
+        return items
+
+    def _encoded():
+        return json_list_response(items, schema)
+
+    return _validated, _encoded
+
+
+def _app(page: dict[str, tuple[list, type[BaseModel]]]) -> FastAPI:
+    app = FastAPI()
+    for name, (items, schema) in page.items():
+        validated, encoded = _routes(items, schema)
+        app.get(f"/validated/{name}", response_model=list[schema])(validated)
+        app.get(f"/encoded/{name}", response_model=list[schema])(encoded)
+    return app
+
+
+async def _cpu_ms_per_request(client: httpx.AsyncClient, url: str, requests: int) -> float:
+    for _ in range(min(requests, 50)):
+        await client.get(url)
+    start = time.process_time()
+    for _ in range(requests):
+        await client.get(url)
+    return (time.process_time() - start) * 1000 / requests
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    page = _page(args.items)
+    transport = httpx.ASGITransport(app=_app(page))
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name in page:
+            validated = await client.get(f"/validated/{name}")
+            encoded = await client.get(f"/encoded/{name}")
+            if validated.json() != encoded.json():
+                raise SystemExit(f"{name}: encoded body differs from the validated one")
+
+            before = await _cpu_ms_per_request(client, f"/validated/{name}", args.requests)
+            after = await _cpu_ms_per_request(client, f"/encoded/{name}", args.requests)
+            results[name] = {
+                "validated_cpu_ms": round(before, 3),
+                "encoded_cpu_ms": round(after, 3),
+                "saved_cpu_ms": round(before - after, 3),
+                "speedup": round(before / after, 2),
+            }
+            print(
+                f"{name:<10} validated {before:>7.3f}ms  encoded {after:>7.3f}ms"
+                f"  saved {before - after:>7.3f}ms per request",
+                file=sys.stderr,
+            )
+    return {
+        "meta": {
+            "items": args.items,
+            "requests": args.requests,
+            "python": platform.python_version(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+        },
+        "results": results,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Measure the CPU saved per list request by direct JSON encoding."
+    )
+    parser.add_argument("--items", type=int, default=100, help="Items per page.")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per route.")
+    args = parser.parse_args(argv)
+
+    print(json.dumps(asyncio.run(_run(args)), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
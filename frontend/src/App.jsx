@@ -1,4 +1,4 @@
-import { useEffect, useMemo, useState } from "react";
+import { useEffect, useMemo, useRef, useState } from "react";
 import { api } from "./api.js";
 
 const STATUS_ORDER = [
@@ -74,6 +74,32 @@ export default function App() {
     if (res.ok) setShipments(res.body);
   };
 
+  const streamMerchantId = selectedShipment?.merchant_id || filters.merchant_id;
+  const selectedShipmentId = useRef(null);
+  selectedShipmentId.current = selectedShipment?.id ?? null;
+
+  useEffect(() => {
+    if (!streamMerchantId) return undefined;
+    return api.streamMerchantUpdates(streamMerchantId, {
+      onStatus: (change) => {
+        const applyStatus = (shipment) =>
+          shipment.id === change.shipment_id
+            ? { ...shipment, status: change.status }
+            : shipment;
+        setShipments((current) => current.map(applyStatus));
+        setSelectedShipment((current) => current && applyStatus(current));
+      },
+      onEvent: (event) => {
+        if (event.shipment_id !== selectedShipmentId.current) return;
+        setEvents((current) =>
+          current.some((existing) => existing.id === event.id)
+            ? current
+            : [...current, event],
+        );
+      },
+    });
+  }, [streamMerchantId]);
+
   const loadShipmentDetail = async (shipmentId) => {
     const res = await api.getShipment(shipmentId);
     if (res.ok) {
@@ -34,6 +34,15 @@ async function request(path, options = {}) {
   return { ok: response.ok, status: response.status, body, parseError, networkError: null };
 }
 
+// Subscribes to a merchant's shipment updates over server-sent events. EventSource reconnects on
+// its own and resumes from the last update it received. Returns a function closing the stream.
+function streamMerchantUpdates(merchantId, { onStatus, onEvent }) {
+  const source = new EventSource(`${API_BASE}/merchant/${merchantId}/events/stream`);
+  source.addEventListener("shipment.status", (message) => onStatus(JSON.parse(message.data)));
+  source.addEventListener("shipment.event", (message) => onEvent(JSON.parse(message.data)));
+  return () => source.close();
+}
+
 export const api = {
   getMerchants() {
     return request("/merchant");
@@ -67,6 +76,7 @@ export const api = {
   listEvents(id) {
     return request(`/shipments/${id}/events`);
   },
+  streamMerchantUpdates,
   addEvent(id, payload) {
     return request(`/shipments/${id}/events`, {
       method: "POST",
@@ -4,4 +4,9 @@ setup(
     name="carrier_gateway_service",
     version="0.1.0",
     packages=find_packages(exclude=("tests",)),
+    entry_points={
+        "carrier_gateway.adapters": [
+            "mock = app.adapters.carrier_stub:MockCarrierAdapter",
+        ],
+    },
 )
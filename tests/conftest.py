@@ -1,10 +1,15 @@
 import os
 import sys
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 from alembic import command
 from alembic.config import Config
@@ -19,11 +24,23 @@ if not TEST_DATABASE_URL:
 
 os.environ["DATABASE_URL"] = TEST_DATABASE_URL
 
+from app.core.metrics import instrument_engine  # noqa: E402
+from app.core.query_stats import QueryStats, instrument_query_stats  # noqa: E402
 from app.main import app  # noqa: E402
-from app.persistence.session import get_db  # noqa: E402
+from app.persistence.models import Base  # noqa: E402
+from app.persistence.session import get_async_db, get_db  # noqa: E402
 
 engine = create_engine(TEST_DATABASE_URL, pool_pre_ping=True)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+# Async routes run on the TestClient's own event loop, so their connections must not be pooled
+# across tests.
+async_engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+instrument_engine(engine, "test")
+instrument_engine(async_engine.sync_engine, "test_async")
+instrument_query_stats(engine)
+instrument_query_stats(async_engine.sync_engine)
+TestingSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -37,26 +54,125 @@ def apply_migrations():
 
 @pytest.fixture()
 def db_session():
-    connection = engine.connect()
-    transaction = connection.begin()
-    db = TestingSessionLocal(bind=connection)
+    # Sync and async routes use separate connections, so tests commit for real and the tables
+    # are emptied afterwards instead of rolling back a shared outer transaction.
+    db = TestingSessionLocal()
     try:
         yield db
     finally:
         db.close()
-        transaction.rollback()
-        connection.close()
+        tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+        with engine.begin() as connection:
+            connection.execute(text(f"TRUNCATE {tables} CASCADE"))
 
 
 @pytest.fixture()
 def client(db_session):
     def _get_db():
-        try:
-            yield db_session
-        finally:
-            pass
+        with TestingSessionLocal() as db:
+            yield db
+
+    async def _get_async_db():
+        async with AsyncSession(async_engine, autoflush=False, expire_on_commit=False) as db:
+            yield db
 
     app.dependency_overrides[get_db] = _get_db
+    app.dependency_overrides[get_async_db] = _get_async_db
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
+
+
+@pytest.fixture()
+def count_queries():
+    """Context manager collecting the SQL statements executed by the test engines."""
+
+    @contextmanager
+    def _count():
+        statements: list[str] = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        targets = (engine, async_engine.sync_engine)
+        for target in targets:
+            event.listen(target, "before_cursor_execute", _record)
+        try:
+            yield statements
+        finally:
+            for target in targets:
+                event.remove(target, "before_cursor_execute", _record)
+
+    return _count
+
+
+@pytest.fixture()
+def max_queries(count_queries):
+    """Context manager failing the test on more than limit statements or a repeated SELECT."""
+
+    @contextmanager
+    def _max_queries(limit: int):
+        with count_queries() as statements:
+            stats = QueryStats(statements)
+            yield stats
+        assert stats.count <= limit, f"{stats.count} statements, expected at most {limit}:\n" + (
+            "\n".join(stats.statements)
+        )
+        assert not stats.repeated(), f"Repeated statements (N+1): {stats.repeated()}"
+
+    return _max_queries
+
+
+# API helpers shared by the test modules.
+
+
+def create_merchant(client):
+    merchant_name = f"merchant-{uuid.uuid4()}"
+    response = client.post("/api/v1/merchant", json={"name": merchant_name})
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+def create_shipment(client, merchant_id, external_reference):
+    payload = {
+        "merchant_id": merchant_id,
+        "name": "Order 123",
+        "external_reference": external_reference,
+    }
+    response = client.post("/api/v1/shipments", json=payload)
+    assert response.status_code == 201
+    return response.json()
+
+
+def update_status(client, shipment_id, status):
+    response = client.post(
+        f"/api/v1/shipments/{shipment_id}/status",
+        json={"status": status},
+    )
+    return response
+
+
+def add_event(client, shipment_id, event_type, occurred_at):
+    payload = {
+        "type": event_type,
+        "source": "carrier",
+        "reason": "test",
+        "occurred_at": occurred_at,
+    }
+    return client.post(f"/api/v1/shipments/{shipment_id}/events", json=payload)
+
+
+def external_event(merchant_id, external_reference, event_code):
+    return {
+        "carrier": "mock",
+        "merchant_id": merchant_id,
+        "external_reference": external_reference,
+        "event_code": event_code,
+        "event_time": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def merchant_stats(client, merchant_id):
+    response = client.get(f"/api/v1/merchant/{merchant_id}/stats")
+    assert response.status_code == 200
+    return response.json()
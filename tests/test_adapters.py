@@ -0,0 +1,70 @@
+import asyncio
+import subprocess
+import sys
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app.adapters import (
+    AdapterResult,
+    ExternalCarrierEvent,
+    available_carriers,
+    get_adapter,
+    ingest_many,
+)
+
+
+def _payload(event_code):
+    return ExternalCarrierEvent(
+        carrier="mock",
+        merchant_id=uuid.uuid4(),
+        external_reference="order-1",
+        event_code=event_code,
+        event_time=datetime.now(timezone.utc),
+    )
+
+
+def test_registry_instantiates_each_adapter_once():
+    assert "mock" in available_carriers()
+    assert get_adapter("mock") is get_adapter("mock")
+    with pytest.raises(ValueError, match="Unsupported carrier"):
+        get_adapter("unknown")
+
+
+def test_adapters_are_imported_on_first_use():
+    code = (
+        "import sys; import app.adapters; from app.adapters.registry import get_adapter; "
+        "assert 'app.adapters.carrier_stub' not in sys.modules; get_adapter('mock'); "
+        "assert 'app.adapters.carrier_stub' in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_ingest_events_returns_errors_in_place():
+    payloads = [_payload("IN_TRANSIT"), _payload("UNKNOWN_CODE"), _payload("DELIVERED")]
+    results = asyncio.run(ingest_many(get_adapter("mock"), payloads))
+
+    assert isinstance(results[0], AdapterResult)
+    assert isinstance(results[1], ValueError)
+    assert isinstance(results[2], AdapterResult)
+    assert results[2].shipment_status == "delivered"
+
+
+def test_ingest_many_uses_batch_translation_when_available():
+    class _StructuralAdapter:
+        # Satisfies CarrierAdapter without inheriting from it, like an entry point adapter.
+        async def ingest_event(self, payload):
+            return await get_adapter("mock").ingest_event(payload)
+
+    class _BatchAdapter(_StructuralAdapter):
+        async def ingest_events(self, payloads):
+            return [ValueError("batch")] * len(payloads)
+
+    payloads = [_payload("IN_TRANSIT"), _payload("UNKNOWN_CODE")]
+    results = asyncio.run(ingest_many(_StructuralAdapter(), payloads))
+    assert isinstance(results[0], AdapterResult)
+    assert isinstance(results[1], ValueError)
+
+    results = asyncio.run(ingest_many(_BatchAdapter(), payloads))
+    assert [str(result) for result in results] == ["batch", "batch"]
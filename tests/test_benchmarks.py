@@ -0,0 +1,71 @@
+from collections import Counter, defaultdict
+
+from sqlalchemy import select, text
+
+from app.domain.shipment import ShipmentStatus
+from app.domain.shipment_event import ShipmentEventType
+from app.persistence.models import ShipmentEventModel, ShipmentModel
+from benchmarks.generate_dataset import generate
+from benchmarks.run import compare_results, percentile
+from tests.conftest import engine
+
+
+def _report(p95_ms, throughput_rps):
+    return {"results": {"get_shipment": {"p95_ms": p95_ms, "throughput_rps": throughput_rps}}}
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 0.50) == 50.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([], 0.95) == 0.0
+
+
+def test_compare_results_flags_only_regressions_beyond_threshold():
+    baseline = _report(p95_ms=10.0, throughput_rps=100.0)
+
+    assert compare_results(_report(10.5, 95.0), baseline, threshold=0.1) == []
+
+    regressions = compare_results(_report(12.0, 80.0), baseline, threshold=0.1)
+    assert len(regressions) == 2
+    assert all(regression.startswith("get_shipment") for regression in regressions)
+
+
+def _load_dataset(seed):
+    connection = engine.raw_connection()
+    try:
+        generate(connection.driver_connection, merchants=20, shipments=500, seed=seed)
+    finally:
+        connection.close()
+
+
+def test_generate_dataset_follows_allowed_transitions(db_session):
+    _load_dataset(seed=7)
+
+    shipments = db_session.query(ShipmentModel).all()
+    assert len(shipments) == 500
+    per_merchant = Counter(shipment.merchant_id for shipment in shipments)
+    assert per_merchant.most_common(1)[0][1] > 500 / 20 * 3
+
+    events = defaultdict(list)
+    for event in db_session.query(ShipmentEventModel).order_by(ShipmentEventModel.occurred_at):
+        events[event.shipment_id].append(event.type)
+    for shipment in shipments:
+        history = events[shipment.id]
+        assert history[0] == ShipmentEventType.LABEL_CREATED
+        if shipment.status == ShipmentStatus.DELIVERED:
+            assert history[-1] == ShipmentEventType.DELIVERED
+        if shipment.status == ShipmentStatus.FAILED:
+            assert history[-1] == ShipmentEventType.DELIVERY_FAILED
+
+
+def test_generate_dataset_is_deterministic(db_session):
+    _load_dataset(seed=3)
+    first = db_session.scalars(select(ShipmentModel.id).order_by(ShipmentModel.id)).all()
+    db_session.rollback()
+
+    with engine.begin() as connection:
+        connection.execute(text("TRUNCATE merchants, shipments, shipment_events CASCADE"))
+    _load_dataset(seed=3)
+
+    assert db_session.scalars(select(ShipmentModel.id).order_by(ShipmentModel.id)).all() == first
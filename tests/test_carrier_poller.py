@@ -0,0 +1,154 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.adapters.stub_tracking_server import StubCarrier, create_app
+from app.adapters.tracking_client import CarrierTrackingClient
+from app.core.config import CarrierPollingConfig
+from app.domain.errors import ConflictError
+from app.services.async_shipment_service import AsyncShipmentService
+from app.workers.carrier_poller import CarrierPoller
+from tests.conftest import async_engine, create_merchant, update_status
+
+
+def _poll(stub: StubCarrier, max_retries: int = 0, rounds: int = 1) -> int:
+    """Poll rounds times with one poller; returns the number polled in the last round."""
+
+    async def _run():
+        transport = httpx.ASGITransport(app=create_app(stub))
+        async with httpx.AsyncClient(transport=transport) as http:
+            config = CarrierPollingConfig(
+                base_url="http://stub-carrier", concurrency=4, rate_per_second=1000
+            )
+            client = CarrierTrackingClient(
+                "mock", config, http, max_retries=max_retries, backoff_seconds=0
+            )
+            session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+            poller = CarrierPoller("mock", client, session_factory, batch_size=2)
+            for _ in range(rounds):
+                polled = await poller.run_once()
+            return polled
+
+    return asyncio.run(_run())
+
+
+def _create_shipment(client, merchant_id, external_reference, carrier="mock"):
+    payload = {
+        "merchant_id": merchant_id,
+        "name": "Order 123",
+        "external_reference": external_reference,
+        "carrier": carrier,
+    }
+    response = client.post("/api/v1/shipments", json=payload)
+    assert response.status_code == 201
+    assert response.json()["carrier"] == carrier
+    return response.json()
+
+
+def test_poller_applies_new_events_of_active_shipments(client):
+    merchant_id = create_merchant(client)
+    delivered = _create_shipment(client, merchant_id, "order-3000")
+    in_transit = _create_shipment(client, merchant_id, "order-3001")
+    _create_shipment(client, merchant_id, "order-3002")
+    cancelled = _create_shipment(client, merchant_id, "order-3003")
+    update_status(client, cancelled["id"], "cancelled")
+    _create_shipment(client, merchant_id, "order-3004", carrier=None)
+
+    picked_up_at = datetime.now(timezone.utc) - timedelta(hours=2)
+    stub = StubCarrier()
+    stub.add_event(UUID(merchant_id), "order-3000", "DELIVERED", picked_up_at + timedelta(hours=1))
+    stub.add_event(UUID(merchant_id), "order-3000", "IN_TRANSIT", picked_up_at)
+    stub.add_event(UUID(merchant_id), "order-3001", "IN_TRANSIT", picked_up_at)
+
+    assert _poll(stub) == 3
+    assert stub.requests == 3
+    detail = client.get(f"/api/v1/shipments/{delivered['id']}").json()
+    assert detail["status"] == "delivered"
+    assert detail["event_count"] == 2
+    assert client.get(f"/api/v1/shipments/{in_transit['id']}").json()["status"] == "in_transit"
+
+    # Delivered shipments are no longer polled, and history seen before is not applied again.
+    assert _poll(stub) == 2
+    assert client.get(f"/api/v1/shipments/{in_transit['id']}").json()["event_count"] == 1
+
+
+def test_poller_retries_unavailable_carrier(client):
+    merchant_id = create_merchant(client)
+    shipment = _create_shipment(client, merchant_id, "order-3010")
+    stub = StubCarrier(failures=2)
+    stub.add_event(UUID(merchant_id), "order-3010", "IN_TRANSIT", datetime.now(timezone.utc))
+
+    assert _poll(stub, max_retries=1) == 1
+    assert client.get(f"/api/v1/shipments/{shipment['id']}").json()["status"] == "created"
+
+    assert _poll(stub, max_retries=1) == 1
+    assert stub.requests == 3
+    assert client.get(f"/api/v1/shipments/{shipment['id']}").json()["status"] == "in_transit"
+
+
+def test_poller_counts_rejected_history_once(client):
+    merchant_id = create_merchant(client)
+    shipment = _create_shipment(client, merchant_id, "order-3020")
+    started_at = datetime.now(timezone.utc) - timedelta(hours=2)
+    stub = StubCarrier()
+    stub.add_event(UUID(merchant_id), "order-3020", "PICKED_UP", started_at)
+    stub.add_event(UUID(merchant_id), "order-3020", "IN_TRANSIT", started_at + timedelta(hours=1))
+
+    def _ingested(outcome):
+        labels = {"carrier": "mock", "outcome": outcome}
+        return REGISTRY.get_sample_value("carrier_events_ingested_total", labels) or 0.0
+
+    rejected, processed = _ingested("invalid_external_event"), _ingested("processed")
+    assert _poll(stub, rounds=3) == 1
+    assert stub.requests == 3
+    assert _ingested("invalid_external_event") == rejected + 1
+    assert _ingested("processed") == processed + 1
+    assert client.get(f"/api/v1/shipments/{shipment['id']}").json()["status"] == "in_transit"
+
+
+def test_poller_continues_after_a_batch_loses_status_races(client, monkeypatch):
+    merchant_id = create_merchant(client)
+    stub = StubCarrier()
+    shipments = []
+    for external_reference in ["order-3030", "order-3031", "order-3032"]:
+        shipments.append(_create_shipment(client, merchant_id, external_reference))
+        stub.add_event(
+            UUID(merchant_id), external_reference, "IN_TRANSIT", datetime.now(timezone.utc)
+        )
+    process_external_events = AsyncShipmentService.process_external_events
+    calls = []
+
+    async def _conflict_once(self, adapter_results):
+        calls.append(len(adapter_results))
+        if len(calls) == 1:
+            raise ConflictError("Shipment status changed concurrently")
+        return await process_external_events(self, adapter_results)
+
+    monkeypatch.setattr(AsyncShipmentService, "process_external_events", _conflict_once)
+    labels = {"carrier": "mock", "outcome": "conflict"}
+    conflicts = REGISTRY.get_sample_value("carrier_events_ingested_total", labels) or 0.0
+
+    # The first batch of two is rolled back; the next batch is still applied, and the first is
+    # applied in the following round.
+    assert _poll(stub) == 3
+    statuses = [
+        client.get(f"/api/v1/shipments/{shipment['id']}").json()["status"] for shipment in shipments
+    ]
+    assert sorted(statuses) == ["created", "created", "in_transit"]
+    assert REGISTRY.get_sample_value("carrier_events_ingested_total", labels) == conflicts + 2
+
+    assert _poll(stub) == 3
+    for shipment in shipments:
+        assert client.get(f"/api/v1/shipments/{shipment['id']}").json()["status"] == "in_transit"
+
+
+@pytest.mark.parametrize("limit", [{"concurrency": 0}, {"rate_per_second": 0}])
+def test_polling_config_rejects_non_positive_limits(limit):
+    with pytest.raises(ValidationError):
+        CarrierPollingConfig(base_url="http://stub-carrier", **limit)
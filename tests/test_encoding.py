@@ -0,0 +1,77 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import orjson
+import pytest
+from pydantic import BaseModel
+
+from app.api.v1.encoding import encode_json, encode_json_lines
+from app.domain.shipment import Shipment, ShipmentStatus
+from app.domain.shipment_event import (
+    ShipmentEventSource,
+    ShipmentEventType,
+    ShipmentTrackingEvent,
+)
+from app.schemas.shipment_events import ShipmentEventResponse
+from app.schemas.shipments import ShipmentResponse
+
+_TIMESTAMPS = [
+    datetime(2024, 3, 1, 12, 30, tzinfo=timezone.utc),
+    datetime(2024, 3, 1, 12, 30, 0, 123456, tzinfo=ZoneInfo("Etc/UTC")),
+    datetime(2024, 3, 1, 14, 30, 5, tzinfo=timezone(timedelta(hours=2))),
+]
+
+
+def _shipments() -> list[Shipment]:
+    shipments = [
+        Shipment(
+            id=uuid.uuid4(),
+            merchant_id=uuid.uuid4(),
+            name='Order "ü" \\ 1',
+            external_reference=f"order-{index}",
+            status=ShipmentStatus.IN_TRANSIT,
+            carrier="mock",
+            last_event_type=ShipmentEventType.PICKED_UP,
+            last_event_at=timestamp,
+            event_count=3,
+            updated_at=timestamp,
+        )
+        for index, timestamp in enumerate(_TIMESTAMPS)
+    ]
+    shipments.append(
+        Shipment(
+            id=uuid.uuid4(),
+            merchant_id=uuid.uuid4(),
+            name="Fresh order",
+            external_reference="order-new",
+            status=ShipmentStatus.CREATED,
+        )
+    )
+    return shipments
+
+
+def _events() -> list[ShipmentTrackingEvent]:
+    return [
+        ShipmentTrackingEvent(
+            id=uuid.uuid4(),
+            shipment_id=uuid.uuid4(),
+            type=ShipmentEventType.DELIVERY_FAILED,
+            source=ShipmentEventSource.CARRIER,
+            reason="Recipient absent" if index else None,
+            occurred_at=timestamp,
+        )
+        for index, timestamp in enumerate(_TIMESTAMPS)
+    ]
+
+
+@pytest.mark.parametrize(
+    ("items", "schema"),
+    [(_shipments(), ShipmentResponse), (_events(), ShipmentEventResponse)],
+)
+def test_encoding_matches_response_model_json(items: list, schema: type[BaseModel]):
+    expected = [schema.model_validate(item).model_dump_json().encode() for item in items]
+
+    assert encode_json(items, schema) == b"[" + b",".join(expected) + b"]"
+    assert encode_json_lines(items, schema) == b"".join(line + b"\n" for line in expected)
+    assert orjson.loads(encode_json([], schema)) == []
@@ -1,5 +1,6 @@
 from fastapi.testclient import TestClient
 
+from app.core.config import settings
 from app.main import app
 
 client = TestClient(app)
@@ -8,3 +9,12 @@ client = TestClient(app)
 def test_health():
     response = client.get("/health")
     assert response.status_code == 200
+
+
+def test_health_db_reports_pool_stats(client):
+    response = client.get("/health/db")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["database"] == "ok"
+    assert body["pools"]["sync"]["size"] == settings.db_pool_size
+    assert set(body["pools"]["async"]) == {"size", "checked_out", "checked_in", "overflow"}
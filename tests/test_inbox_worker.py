@@ -0,0 +1,152 @@
+import asyncio
+from datetime import datetime, timezone
+
+from prometheus_client import REGISTRY
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.adapters.schemas import ExternalCarrierEvent
+from app.core.config import settings
+from app.domain.errors import ConflictError
+from app.domain.inbox import InboxEventStatus
+from app.persistence.models import CarrierEventInboxModel
+from app.persistence.repositories import CarrierEventInboxRepository
+from app.services.async_shipment_service import AsyncShipmentService
+from app.services.inbox_service import InboxService
+from app.workers.inbox_worker import InboxWorker
+from tests.conftest import TestingSessionLocal, async_engine, create_merchant, create_shipment
+
+
+def _run_worker_once():
+    worker = InboxWorker(async_sessionmaker(async_engine, expire_on_commit=False))
+    return asyncio.run(worker.run_once())
+
+
+def _payload(merchant_id, external_reference, event_code):
+    return {
+        "carrier": "mock",
+        "merchant_id": merchant_id,
+        "external_reference": external_reference,
+        "event_code": event_code,
+        "event_time": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def test_inbox_mode_accepts_and_worker_applies_event(client, monkeypatch):
+    monkeypatch.setattr(settings, "external_event_ingest_mode", "inbox")
+    merchant_id = create_merchant(client)
+    shipment = create_shipment(client, merchant_id, "order-2000")
+
+    response = client.post(
+        "/api/v1/shipments/events/external",
+        json=_payload(merchant_id, "order-2000", "IN_TRANSIT"),
+    )
+    assert response.status_code == 202
+    assert response.json()["status"] == "pending"
+    assert client.get(f"/api/v1/shipments/{shipment['id']}").json()["status"] == "created"
+
+    assert _run_worker_once() == 1
+    assert _run_worker_once() == 0
+
+    assert client.get(f"/api/v1/shipments/{shipment['id']}").json()["status"] == "in_transit"
+
+
+def test_inbox_worker_records_failures(client, monkeypatch):
+    monkeypatch.setattr(settings, "external_event_ingest_mode", "inbox")
+    merchant_id = create_merchant(client)
+
+    response = client.post(
+        "/api/v1/shipments/events/external",
+        json=_payload(merchant_id, "order-missing", "IN_TRANSIT"),
+    )
+    assert response.status_code == 202
+    entry_id = response.json()["id"]
+
+    assert _run_worker_once() == 1
+
+    with TestingSessionLocal() as db:
+        entry = db.get(CarrierEventInboxModel, entry_id)
+        assert entry.status == InboxEventStatus.FAILED
+        assert entry.error_code == "not_found"
+        assert entry.attempts == 1
+        assert entry.processed_at is not None
+
+
+def test_inbox_worker_attributes_rejected_event_codes_to_the_carrier(client, monkeypatch):
+    monkeypatch.setattr(settings, "external_event_ingest_mode", "inbox")
+    merchant_id = create_merchant(client)
+    create_shipment(client, merchant_id, "order-2002")
+    labels = {"carrier": "mock", "outcome": "invalid_external_event"}
+    before = REGISTRY.get_sample_value("carrier_events_ingested_total", labels) or 0.0
+
+    response = client.post(
+        "/api/v1/shipments/events/external",
+        json=_payload(merchant_id, "order-2002", "PICKED_UP"),
+    )
+    assert response.status_code == 202
+    assert _run_worker_once() == 1
+
+    assert REGISTRY.get_sample_value("carrier_events_ingested_total", labels) == before + 1
+
+
+def test_inbox_claims_each_shipments_events_in_received_order(client):
+    merchant_id = create_merchant(client)
+    shipment = create_shipment(client, merchant_id, "order-2003")
+    other = create_shipment(client, merchant_id, "order-2004")
+
+    with TestingSessionLocal() as db:
+        inbox = InboxService(CarrierEventInboxRepository(db))
+        in_transit, delivered, other_in_transit = (
+            inbox.enqueue(ExternalCarrierEvent.model_validate(_payload(merchant_id, *event)))
+            for event in [
+                ("order-2003", "IN_TRANSIT"),
+                ("order-2003", "DELIVERED"),
+                ("order-2004", "IN_TRANSIT"),
+            ]
+        )
+
+        # DELIVERED waits while IN_TRANSIT is claimed, so a second worker cannot apply it
+        # first; other shipments are not held up.
+        claimed = inbox.claim(10, settings.inbox_claim_timeout_seconds)
+        assert {entry.id for entry in claimed} == {in_transit.id, other_in_transit.id}
+        assert inbox.claim(10, settings.inbox_claim_timeout_seconds) == []
+        for entry in claimed:
+            inbox.release(entry.id, "processing_error", "retry")
+
+    assert _run_worker_once() == 2
+    assert _run_worker_once() == 1
+    assert _run_worker_once() == 0
+    assert client.get(f"/api/v1/shipments/{shipment['id']}").json()["status"] == "delivered"
+    assert client.get(f"/api/v1/shipments/{other['id']}").json()["status"] == "in_transit"
+
+
+def test_inbox_mode_rejects_unknown_carrier(client, monkeypatch):
+    monkeypatch.setattr(settings, "external_event_ingest_mode", "inbox")
+    payload = _payload(str(create_merchant(client)), "order-2001", "IN_TRANSIT")
+    payload["carrier"] = "unknown"
+
+    response = client.post("/api/v1/shipments/events/external", json=payload)
+    assert response.status_code == 400
+
+
+def test_inbox_worker_releases_entries_that_lose_status_races(client, monkeypatch):
+    monkeypatch.setattr(settings, "external_event_ingest_mode", "inbox")
+    merchant_id = create_merchant(client)
+    create_shipment(client, merchant_id, "order-2003")
+    labels = {"carrier": "mock", "outcome": "conflict"}
+    before = REGISTRY.get_sample_value("carrier_events_ingested_total", labels) or 0.0
+
+    async def _conflict(self, adapter_result):
+        raise ConflictError("Shipment status changed concurrently")
+
+    monkeypatch.setattr(AsyncShipmentService, "process_external_event", _conflict)
+    response = client.post(
+        "/api/v1/shipments/events/external",
+        json=_payload(merchant_id, "order-2003", "IN_TRANSIT"),
+    )
+    assert _run_worker_once() == 1
+
+    with TestingSessionLocal() as db:
+        entry = db.get(CarrierEventInboxModel, response.json()["id"])
+        assert entry.status == InboxEventStatus.PENDING
+        assert entry.error_code == "conflict"
+    assert REGISTRY.get_sample_value("carrier_events_ingested_total", labels) == before + 1
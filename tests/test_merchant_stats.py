@@ -0,0 +1,90 @@
+import uuid
+
+from sqlalchemy import update
+
+from app.cli.reconcile_stats import reconcile
+from app.persistence.models import MerchantShipmentStatsModel
+from tests.conftest import (
+    TestingSessionLocal,
+    create_merchant,
+    create_shipment,
+    external_event,
+    merchant_stats,
+    update_status,
+)
+
+
+def test_stats_follow_creates_and_status_changes(client):
+    merchant_id = create_merchant(client)
+    assert merchant_stats(client, merchant_id)["total"] == 0
+
+    first = create_shipment(client, merchant_id, "order-5000")
+    duplicate = client.post(
+        "/api/v1/shipments",
+        json={"merchant_id": merchant_id, "name": "Order", "external_reference": "order-5000"},
+    )
+    assert duplicate.status_code == 200
+    create_shipment(client, merchant_id, "order-5001")
+    client.post(
+        "/api/v1/shipments/bulk",
+        json=[
+            {"merchant_id": merchant_id, "name": "Order", "external_reference": "order-5002"},
+            {"merchant_id": merchant_id, "name": "Order", "external_reference": "order-5003"},
+            {"merchant_id": merchant_id, "name": "Order", "external_reference": "order-5001"},
+        ],
+    )
+
+    assert update_status(client, first["id"], "in_transit").status_code == 200
+    assert update_status(client, first["id"], "in_transit").status_code == 200
+    assert update_status(client, first["id"], "created").status_code == 400
+    client.post(
+        "/api/v1/shipments/events/external",
+        json=external_event(merchant_id, "order-5001", "DELIVERED"),
+    )
+    client.post(
+        "/api/v1/shipments/events/external",
+        json=external_event(merchant_id, "order-5002", "IN_TRANSIT"),
+    )
+    client.post(
+        "/api/v1/shipments/events/external/batch",
+        json=[
+            external_event(merchant_id, "order-5003", "IN_TRANSIT"),
+            external_event(merchant_id, "order-5003", "FAILED"),
+            external_event(merchant_id, "order-5000", "DELIVERED"),
+        ],
+    )
+
+    stats = merchant_stats(client, merchant_id)
+    assert stats["total"] == 4
+    assert stats["counts"] == {
+        "created": 1,
+        "in_transit": 1,
+        "delivered": 1,
+        "failed": 1,
+        "cancelled": 0,
+    }
+
+
+def test_stats_for_unknown_merchant_returns_404(client):
+    response = client.get(f"/api/v1/merchant/{uuid.uuid4()}/stats")
+    assert response.status_code == 404
+    assert response.json()["error"]["code"] == "not_found"
+
+
+def test_reconcile_rebuilds_counters_from_shipments(client):
+    merchant_id = create_merchant(client)
+    shipment = create_shipment(client, merchant_id, "order-5100")
+    create_shipment(client, merchant_id, "order-5101")
+    update_status(client, shipment["id"], "cancelled")
+
+    with TestingSessionLocal() as db:
+        db.execute(update(MerchantShipmentStatsModel).values(count=42))
+        db.commit()
+    assert merchant_stats(client, merchant_id)["total"] == 84
+
+    reconcile()
+
+    stats = merchant_stats(client, merchant_id)
+    assert stats["total"] == 2
+    assert stats["counts"]["created"] == 1
+    assert stats["counts"]["cancelled"] == 1
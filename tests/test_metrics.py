@@ -0,0 +1,78 @@
+import uuid
+from datetime import datetime, timezone
+
+from tests.conftest import create_merchant, create_shipment
+
+
+def _sample(body, name, **labels):
+    expected = ",".join(f'{key}="{value}"' for key, value in sorted(labels.items()))
+    for line in body.splitlines():
+        if line.startswith(f"{name}{{") and all(
+            f'{key}="{value}"' in line for key, value in labels.items()
+        ):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{name}{{{expected}}} not found")
+
+
+def test_metrics_exposes_route_latency_and_queries(client):
+    merchant_id = create_merchant(client)
+    shipment = create_shipment(client, merchant_id, "order-3000")
+    client.get(f"/api/v1/shipments/{shipment['id']}")
+    client.get(f"/api/v1/shipments/{uuid.uuid4()}")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    body = response.text
+
+    route = "/api/v1/shipments/{shipment_id}"
+    assert _sample(
+        body, "http_request_duration_seconds_count", method="GET", route=route, status="200"
+    )
+    assert _sample(
+        body, "http_request_duration_seconds_count", method="GET", route=route, status="404"
+    )
+    assert _sample(body, "db_queries_total", route=route) >= 2
+    assert "http_requests_in_progress" in body
+    assert "db_pool_checked_out_connections" in body
+
+
+def test_metrics_counts_ingest_outcomes(client):
+    merchant_id = create_merchant(client)
+    create_shipment(client, merchant_id, "order-3001")
+
+    def _ingest(reference, code):
+        return client.post(
+            "/api/v1/shipments/events/external",
+            json={
+                "carrier": "mock",
+                "merchant_id": merchant_id,
+                "external_reference": reference,
+                "event_code": code,
+                "event_time": datetime.now(timezone.utc).isoformat(),
+            },
+        )
+
+    before = client.get("/metrics").text
+    labels = {"carrier": "mock"}
+    counts_before = {
+        outcome: _sample_or_zero(before, outcome, labels)
+        for outcome in ("processed", "not_found", "invalid_transition")
+    }
+
+    _ingest("order-3001", "DELIVERED")
+    _ingest("order-3001", "IN_TRANSIT")
+    _ingest("order-missing", "IN_TRANSIT")
+
+    after = client.get("/metrics").text
+    assert _sample_or_zero(after, "processed", labels) == counts_before["processed"] + 1
+    assert _sample_or_zero(after, "invalid_transition", labels) == (
+        counts_before["invalid_transition"] + 1
+    )
+    assert _sample_or_zero(after, "not_found", labels) == counts_before["not_found"] + 1
+
+
+def _sample_or_zero(body, outcome, labels):
+    try:
+        return _sample(body, "carrier_events_ingested_total", outcome=outcome, **labels)
+    except AssertionError:
+        return 0.0
@@ -0,0 +1,79 @@
+import time
+from datetime import date, datetime, timezone
+
+from sqlalchemy import text
+
+from app.persistence.partitions import (
+    create_partitions,
+    drop_partitions_before,
+    list_partitions,
+    partition_name,
+)
+from app.services.shipment_cache import shipment_cache
+from tests.conftest import add_event, create_merchant, create_shipment, engine
+
+
+def _partition_of(event_id):
+    with engine.connect() as connection:
+        return connection.scalar(
+            text("SELECT tableoid::regclass::text FROM shipment_events WHERE id = :id"),
+            {"id": event_id},
+        )
+
+
+def test_new_partition_adopts_rows_from_default_partition(client):
+    merchant_id = create_merchant(client)
+    shipment = create_shipment(client, merchant_id, "order-1500")
+    occurred_at = datetime(2001, 2, 10, tzinfo=timezone.utc).isoformat()
+    event = add_event(client, shipment["id"], "picked_up", occurred_at).json()
+    assert _partition_of(event["id"]) == "shipment_events_default"
+
+    with engine.begin() as connection:
+        created = create_partitions(connection, date(2001, 1, 1), date(2001, 3, 1))
+    try:
+        assert created == [partition_name(date(2001, m, 1)) for m in (1, 2, 3)]
+        assert _partition_of(event["id"]) == "shipment_events_p2001_02"
+        events = client.get(f"/api/v1/shipments/{shipment['id']}/events").json()
+        assert [item["id"] for item in events] == [event["id"]]
+    finally:
+        with engine.begin() as connection:
+            drop_partitions_before(connection, date(2001, 4, 1))
+
+
+def test_retention_drops_whole_partitions_and_default_stragglers(client):
+    merchant_id = create_merchant(client)
+    shipment = create_shipment(client, merchant_id, "order-1501")
+    with engine.begin() as connection:
+        create_partitions(connection, date(2002, 1, 1), date(2002, 2, 1))
+
+    def _event_at(year, month):
+        occurred_at = datetime(year, month, 5, tzinfo=timezone.utc).isoformat()
+        return add_event(client, shipment["id"], "picked_up", occurred_at).json()["id"]
+
+    _event_at(2002, 1)
+    _event_at(2000, 6)
+    kept = _event_at(2002, 2)
+
+    with engine.begin() as connection:
+        removed = drop_partitions_before(connection, date(2002, 2, 1))
+        remaining = list_partitions(connection)
+    assert removed == ["shipment_events_p2002_01"]
+    assert date(2002, 2, 1) in remaining
+
+    events = client.get(f"/api/v1/shipments/{shipment['id']}/events").json()
+    assert [item["id"] for item in events] == [kept]
+    summary = client.get(f"/api/v1/shipments/{shipment['id']}").json()
+    assert summary["event_count"] == 1
+    assert summary["last_event_at"] == "2002-02-05T00:00:00Z"
+
+    generation = shipment_cache.generation
+    with engine.begin() as connection:
+        drop_partitions_before(connection, date(2002, 3, 1))
+    # The shipment was cached by the read above; the retention's notification drops it.
+    deadline = time.monotonic() + 5
+    while shipment_cache.generation == generation and time.monotonic() < deadline:
+        time.sleep(0.01)
+    summary = client.get(f"/api/v1/shipments/{shipment['id']}").json()
+    assert summary["event_count"] == 0
+    assert summary["last_event_type"] is None
+    assert summary["last_event_at"] is None
@@ -0,0 +1,49 @@
+from datetime import datetime, timezone
+
+from app.core.query_stats import QueryStats, statement_shape
+from tests.conftest import add_event, create_merchant, create_shipment
+
+
+def test_repeated_selects_are_reported_by_shape():
+    stats = QueryStats(
+        [
+            "SELECT * FROM shipment_events WHERE shipment_id = %(id_1)s",
+            "SELECT * FROM shipment_events WHERE shipment_id = %(id_1)s",
+            "SELECT * FROM shipment_events WHERE shipment_id = %(id_1)s",
+            "INSERT INTO shipments (name) VALUES (%(name)s)",
+            "INSERT INTO shipments (name) VALUES (%(name)s)",
+            "INSERT INTO shipments (name) VALUES (%(name)s)",
+        ]
+    )
+    assert stats.count == 6
+    assert stats.repeated() == {"SELECT * FROM shipment_events WHERE shipment_id = ?": 3}
+    assert statement_shape("SELECT 1 WHERE id IN (%(id_1_1)s, %(id_1_2)s)") == (
+        "SELECT 1 WHERE id IN (?)"
+    )
+
+
+def test_responses_carry_query_count_header(client):
+    merchant_id = create_merchant(client)
+    shipment = create_shipment(client, merchant_id, "order-4000")
+
+    response = client.get(f"/api/v1/shipments/{shipment['id']}")
+    assert response.headers["X-Query-Count"] == "1"
+
+
+def test_read_endpoints_stay_within_query_budget(client, max_queries):
+    merchant_id = create_merchant(client)
+    shipment = create_shipment(client, merchant_id, "order-4001")
+    for event_type in ("label_created", "picked_up", "out_for_delivery"):
+        add_event(client, shipment["id"], event_type, datetime.now(timezone.utc).isoformat())
+
+    with max_queries(1):
+        assert client.get(f"/api/v1/shipments/{shipment['id']}").status_code == 200
+    with max_queries(2):
+        response = client.get(f"/api/v1/shipments/{shipment['id']}", params={"include": "events"})
+        assert len(response.json()["events"]) == 3
+    with max_queries(1):
+        assert (
+            client.get("/api/v1/shipments", params={"merchant_id": merchant_id}).status_code == 200
+        )
+    with max_queries(2):
+        assert client.get(f"/api/v1/shipments/{shipment['id']}/events").status_code == 200
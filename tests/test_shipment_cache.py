@@ -0,0 +1,103 @@
+import asyncio
+import uuid
+
+from app.core.config import settings
+from app.domain.shipment import Shipment, ShipmentStatus
+from app.persistence.repositories import ShipmentRepository
+from app.services.shipment_cache import ShipmentCache, run_invalidation_listener
+from tests.conftest import (
+    TestingSessionLocal,
+    add_event,
+    create_merchant,
+    create_shipment,
+    update_status,
+)
+
+
+def _shipment(**overrides):
+    fields = {
+        "id": uuid.uuid4(),
+        "merchant_id": uuid.uuid4(),
+        "name": "Order",
+        "external_reference": f"order-{uuid.uuid4()}",
+        "status": ShipmentStatus.CREATED,
+    }
+    return Shipment(**(fields | overrides))
+
+
+def test_cache_evicts_least_recently_used_and_expired_entries():
+    cache = ShipmentCache(max_size=2, ttl_seconds=60)
+    first, second, third = _shipment(), _shipment(), _shipment()
+    for shipment in (first, second):
+        cache.put(shipment, cache.generation)
+    assert cache.get(first.id) == first
+    cache.put(third, cache.generation)
+
+    assert cache.get(second.id) is None
+    assert cache.get_by_reference(first.merchant_id, first.external_reference) == first
+    assert cache.get_by_reference(second.merchant_id, second.external_reference) is None
+
+    expired = ShipmentCache(max_size=2, ttl_seconds=0)
+    expired.put(first, expired.generation)
+    assert expired.get(first.id) is None
+
+
+def test_cache_skips_loads_that_raced_with_an_invalidation():
+    cache = ShipmentCache(max_size=10, ttl_seconds=60)
+    shipment = _shipment()
+    generation = cache.generation
+    cache.invalidate([shipment.id])
+    cache.put(shipment, generation)
+    assert cache.get(shipment.id) is None
+
+
+def test_reads_are_served_from_cache_until_a_write(client, count_queries):
+    merchant_id = create_merchant(client)
+    shipment = create_shipment(client, merchant_id, "order-5000")
+    url = f"/api/v1/shipments/{shipment['id']}"
+
+    client.get(url)
+    with count_queries() as statements:
+        assert client.get(url).json()["status"] == "created"
+    assert statements == []
+
+    update_status(client, shipment["id"], "in_transit")
+    assert client.get(url).json()["status"] == "in_transit"
+    add_event(client, shipment["id"], "picked_up", None)
+    assert client.get(url).json()["event_count"] == 1
+
+
+def test_notifications_invalidate_other_processes_caches(client):
+    merchant_id = create_merchant(client)
+    shipment = create_shipment(client, merchant_id, "order-5001")
+    cached = _shipment(id=uuid.UUID(shipment["id"]))
+    cache = ShipmentCache(max_size=10, ttl_seconds=60)
+
+    async def _wait_for(condition):
+        for _ in range(100):
+            if condition():
+                return
+            await asyncio.sleep(0.05)
+        raise AssertionError("timed out")
+
+    async def _run():
+        stop = asyncio.Event()
+        listener = asyncio.create_task(
+            run_invalidation_listener(cache, settings.database_url, stop)
+        )
+        try:
+            # The listener clears the cache once LISTEN is in effect.
+            await _wait_for(lambda: cache.generation > 0)
+            cache.put(cached, cache.generation)
+            assert cache.get(cached.id) is not None
+
+            # A write in another process notifies when its transaction commits.
+            with TestingSessionLocal() as db:
+                ShipmentRepository(db).publish_changes([cached.id])
+                db.commit()
+            await _wait_for(lambda: cache.get(cached.id) is None)
+        finally:
+            stop.set()
+            await listener
+
+    asyncio.run(_run())
@@ -0,0 +1,166 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.domain.shipment import ShipmentStatus
+from app.domain.shipment_update import ShipmentStatusChange, ShipmentUpdate, ShipmentUpdateType
+from app.persistence.repositories import ShipmentUpdateRepository
+from app.services.shipment_updates import ShipmentUpdateBroker, Subscription
+from tests.conftest import (
+    TestingSessionLocal,
+    add_event,
+    async_engine,
+    create_merchant,
+    create_shipment,
+    update_status,
+)
+
+
+def _broker(**kwargs) -> ShipmentUpdateBroker:
+    return ShipmentUpdateBroker(async_sessionmaker(async_engine, expire_on_commit=False), **kwargs)
+
+
+async def _next_update(stream) -> ShipmentUpdate:
+    while True:
+        update = await asyncio.wait_for(anext(stream), 5)
+        if update is not None:
+            return update
+
+
+def test_stream_replays_after_last_event_id_then_delivers_live_updates(client):
+    merchant_id = create_merchant(client)
+    shipment_id = create_shipment(client, merchant_id, "order-6001")["id"]
+    other_shipment_id = create_shipment(client, create_merchant(client), "order-6002")["id"]
+    assert update_status(client, shipment_id, "in_transit").status_code == 200
+    assert update_status(client, other_shipment_id, "in_transit").status_code == 200
+    occurred_at = datetime(2024, 5, 1, 9, 30, tzinfo=timezone.utc).isoformat()
+    assert add_event(client, shipment_id, "picked_up", occurred_at).status_code == 200
+
+    broker = _broker()
+
+    async def _run():
+        stop = asyncio.Event()
+        listener = asyncio.create_task(broker.run(settings.database_url, stop))
+        try:
+            await asyncio.wait_for(broker.listening.wait(), 5)
+
+            stream = broker.stream(uuid.UUID(merchant_id), 0, heartbeat_seconds=0.05)
+            status, event = await _next_update(stream), await _next_update(stream)
+            assert status.type == ShipmentUpdateType.STATUS
+            assert json.loads(status.data) == {
+                "shipment_id": shipment_id,
+                "status": "in_transit",
+                "previous_status": "created",
+            }
+            assert event.type == ShipmentUpdateType.EVENT
+            assert event.id > status.id
+            assert json.loads(event.data)["type"] == "picked_up"
+            assert json.loads(event.data)["occurred_at"] == "2024-05-01T09:30:00Z"
+            # Nothing else to replay: the stream idles with heartbeats.
+            assert await asyncio.wait_for(anext(stream), 5) is None
+
+            assert update_status(client, other_shipment_id, "delivered").status_code == 200
+            assert update_status(client, shipment_id, "delivered").status_code == 200
+            live = await _next_update(stream)
+            assert live.id > event.id
+            assert json.loads(live.data)["status"] == "delivered"
+            await stream.aclose()
+
+            # Resuming from the last id received replays only what came after it.
+            resumed = broker.stream(uuid.UUID(merchant_id), event.id, heartbeat_seconds=0.05)
+            assert (await _next_update(resumed)).id == live.id
+            await resumed.aclose()
+        finally:
+            stop.set()
+            await listener
+
+    asyncio.run(_run())
+
+
+def test_stream_waits_for_updates_committed_out_of_id_order(client):
+    merchant_id = create_merchant(client)
+    shipment_id = uuid.UUID(create_shipment(client, merchant_id, "order-6003")["id"])
+    change = ShipmentStatusChange(shipment_id, ShipmentStatus.IN_TRANSIT, ShipmentStatus.CREATED)
+    broker = _broker(recheck_seconds=0.01)
+
+    async def _run():
+        stop = asyncio.Event()
+        listener = asyncio.create_task(broker.run(settings.database_url, stop))
+        try:
+            await asyncio.wait_for(broker.listening.wait(), 5)
+            stream = broker.stream(uuid.UUID(merchant_id), 0, heartbeat_seconds=0.05)
+
+            # The first writer draws the lower id but commits after the second one.
+            with TestingSessionLocal() as first, TestingSessionLocal() as second:
+                ShipmentUpdateRepository(first).append(
+                    [(shipment_id, ShipmentUpdateType.STATUS, change)]
+                )
+                ShipmentUpdateRepository(second).append(
+                    [(shipment_id, ShipmentUpdateType.EVENT, change)]
+                )
+                second.commit()
+                # Delivering the second update now would let a client resume past the first.
+                assert await asyncio.wait_for(anext(stream), 5) is None
+                assert await asyncio.wait_for(anext(stream), 5) is None
+                first.commit()
+
+            lower, higher = await _next_update(stream), await _next_update(stream)
+            assert lower.type == ShipmentUpdateType.STATUS
+            assert higher.type == ShipmentUpdateType.EVENT
+            assert lower.id < higher.id
+            await stream.aclose()
+
+            resumed = broker.stream(uuid.UUID(merchant_id), lower.id, heartbeat_seconds=0.05)
+            assert (await _next_update(resumed)).id == higher.id
+            assert await asyncio.wait_for(anext(resumed), 5) is None
+            await resumed.aclose()
+        finally:
+            stop.set()
+            await listener
+
+    asyncio.run(_run())
+
+
+def test_subscribers_that_fall_behind_are_closed():
+    def _update(update_id: int) -> ShipmentUpdate:
+        return ShipmentUpdate(
+            id=update_id,
+            xid=update_id,
+            merchant_id=uuid.uuid4(),
+            shipment_id=uuid.uuid4(),
+            type=ShipmentUpdateType.STATUS,
+            data="{}",
+            created_at=datetime.now(timezone.utc),
+        )
+
+    async def _run():
+        subscription = Subscription(uuid.uuid4(), queue_size=2)
+        subscription.deliver(_update(1))
+        subscription.deliver(_update(2))
+        assert not subscription.closed
+        assert (await subscription.get(1)).id == 1
+
+        subscription.deliver(_update(3))
+        subscription.deliver(_update(4))
+        assert subscription.closed
+        # Pending updates are dropped; the client resumes from the last id it received.
+        assert await subscription.get(1) is None
+
+    asyncio.run(_run())
+
+
+def test_stream_endpoint_validates_merchant_and_last_event_id(client):
+    response = client.get(f"/api/v1/merchant/{uuid.uuid4()}/events/stream")
+    assert response.status_code == 404
+    assert response.json()["error"]["code"] == "not_found"
+
+    merchant_id = create_merchant(client)
+    response = client.get(
+        f"/api/v1/merchant/{merchant_id}/events/stream", headers={"Last-Event-ID": "latest"}
+    )
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == "invalid_last_event_id"
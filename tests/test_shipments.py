@@ -1,45 +1,19 @@
+import json
 import uuid
 from datetime import datetime, timedelta, timezone
 
-
-def _create_merchant(client):
-    merchant_name = f"merchant-{uuid.uuid4()}"
-    response = client.post("/api/v1/merchant", json={"name": merchant_name})
-    assert response.status_code == 200
-    return response.json()["id"]
-
-
-def _create_shipment(client, merchant_id, external_reference):
-    payload = {
-        "merchant_id": merchant_id,
-        "name": "Order 123",
-        "external_reference": external_reference,
-    }
-    response = client.post("/api/v1/shipments", json=payload)
-    assert response.status_code == 201
-    return response.json()
-
-
-def _update_status(client, shipment_id, status):
-    response = client.post(
-        f"/api/v1/shipments/{shipment_id}/status",
-        json={"status": status},
-    )
-    return response
-
-
-def _add_event(client, shipment_id, event_type, occurred_at):
-    payload = {
-        "type": event_type,
-        "source": "carrier",
-        "reason": "test",
-        "occurred_at": occurred_at,
-    }
-    return client.post(f"/api/v1/shipments/{shipment_id}/events", json=payload)
+from app.services.dedup import recent_external_events
+from tests.conftest import (
+    add_event,
+    create_merchant,
+    create_shipment,
+    external_event,
+    update_status,
+)
 
 
 def test_create_shipment_idempotent_returns_existing(client):
-    merchant_id = _create_merchant(client)
+    merchant_id = create_merchant(client)
 
     payload = {
         "merchant_id": merchant_id,
@@ -66,8 +40,21 @@ def test_create_shipment_missing_merchant_returns_404(client):
     assert body["error"]["code"] == "not_found"
 
 
+def test_create_shipment_after_missing_merchant_still_succeeds(client):
+    missing = {
+        "merchant_id": str(uuid.uuid4()),
+        "name": "Missing Merchant",
+        "external_reference": "order-405",
+    }
+    assert client.post("/api/v1/shipments", json=missing).status_code == 404
+
+    merchant_id = create_merchant(client)
+    shipment = create_shipment(client, merchant_id, "order-405")
+    assert shipment["status"] == "created"
+
+
 def test_create_shipment_missing_external_reference_returns_422(client):
-    merchant_id = _create_merchant(client)
+    merchant_id = create_merchant(client)
     payload = {
         "merchant_id": merchant_id,
         "name": "Order Missing Ref",
@@ -77,8 +64,8 @@ def test_create_shipment_missing_external_reference_returns_422(client):
 
 
 def test_list_shipments_returns_created(client):
-    merchant_id = _create_merchant(client)
-    shipment = _create_shipment(client, merchant_id, "order-555")
+    merchant_id = create_merchant(client)
+    shipment = create_shipment(client, merchant_id, "order-555")
 
     response = client.get("/api/v1/shipments")
     assert response.status_code == 200
@@ -87,8 +74,8 @@ def test_list_shipments_returns_created(client):
 
 
 def test_get_shipment_by_id(client):
-    merchant_id = _create_merchant(client)
-    shipment = _create_shipment(client, merchant_id, "order-556")
+    merchant_id = create_merchant(client)
+    shipment = create_shipment(client, merchant_id, "order-556")
 
     response = client.get(f"/api/v1/shipments/{shipment['id']}")
     assert response.status_code == 200
@@ -97,50 +84,66 @@ def test_get_shipment_by_id(client):
     assert data["merchant_id"] == shipment["merchant_id"]
 
 
+def test_get_shipment_includes_events_only_when_requested(client):
+    merchant_id = create_merchant(client)
+    shipment = create_shipment(client, merchant_id, "order-557")
+    add_event(client, shipment["id"], "label_created", datetime.now(timezone.utc).isoformat())
+
+    plain = client.get(f"/api/v1/shipments/{shipment['id']}")
+    assert plain.status_code == 200
+    assert "events" not in plain.json()
+
+    detailed = client.get(f"/api/v1/shipments/{shipment['id']}?include=events")
+    assert detailed.status_code == 200
+    body = detailed.json()
+    assert body["id"] == shipment["id"]
+    assert [event["type"] for event in body["events"]] == ["label_created"]
+
+
 def test_get_shipment_missing_returns_404(client):
     response = client.get(f"/api/v1/shipments/{uuid.uuid4()}")
     assert response.status_code == 404
 
 
 def test_update_shipment_status_allowed_transition(client):
-    merchant_id = _create_merchant(client)
-    shipment = _create_shipment(client, merchant_id, "order-700")
+    merchant_id = create_merchant(client)
+    shipment = create_shipment(client, merchant_id, "order-700")
 
-    response = _update_status(client, shipment["id"], "in_transit")
+    response = update_status(client, shipment["id"], "in_transit")
     assert response.status_code == 200
     assert response.json()["status"] == "in_transit"
 
 
 def test_update_shipment_status_forbidden_transition(client):
-    merchant_id = _create_merchant(client)
-    shipment = _create_shipment(client, merchant_id, "order-701")
+    merchant_id = create_merchant(client)
+    shipment = create_shipment(client, merchant_id, "order-701")
 
-    response = _update_status(client, shipment["id"], "delivered")
+    response = update_status(client, shipment["id"], "delivered")
     assert response.status_code == 400
     body = response.json()
     assert body["error"]["code"] == "invalid_transition"
 
 
 def test_update_shipment_status_idempotent(client):
-    merchant_id = _create_merchant(client)
-    shipment = _create_shipment(client, merchant_id, "order-702")
+    merchant_id = create_merchant(client)
+    shipment = create_shipment(client, merchant_id, "order-702")
 
-    first = _update_status(client, shipment["id"], "in_transit")
+    first = update_status(client, shipment["id"], "in_transit")
     assert first.status_code == 200
-    second = _update_status(client, shipment["id"], "in_transit")
+    second = update_status(client, shipment["id"], "in_transit")
     assert second.status_code == 200
 
 
 def test_add_shipment_event_and_list_ordered(client):
-    merchant_id = _create_merchant(client)
-    shipment = _create_shipment(client, merchant_id, "order-800")
+    merchant_id = create_merchant(client)
+    shipment = create_shipment(client, merchant_id, "order-800")
 
     earlier = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
     later = datetime.now(timezone.utc).isoformat()
 
-    first = _add_event(client, shipment["id"], "label_created", earlier)
+    first = add_event(client, shipment["id"], "label_created", earlier)
     assert first.status_code == 200
-    second = _add_event(client, shipment["id"], "picked_up", later)
+    second = add_event(client, shipment["id"], "picked_up", later)
     assert second.status_code == 200
 
     response = client.get(f"/api/v1/shipments/{shipment['id']}/events")
@@ -163,12 +166,12 @@ def test_add_shipment_event_missing_shipment_returns_404(client):
 
 
 def test_list_shipments_filters_and_paginates(client):
-    merchant_a = _create_merchant(client)
-    merchant_b = _create_merchant(client)
+    merchant_a = create_merchant(client)
+    merchant_b = create_merchant(client)
 
-    shipment_a1 = _create_shipment(client, merchant_a, "order-900")
-    shipment_a2 = _create_shipment(client, merchant_a, "order-901")
-    shipment_b = _create_shipment(client, merchant_b, "order-902")
+    shipment_a1 = create_shipment(client, merchant_a, "order-900")
+    shipment_a2 = create_shipment(client, merchant_a, "order-901")
+    shipment_b = create_shipment(client, merchant_b, "order-902")
 
     response = client.get(f"/api/v1/shipments?merchant_id={merchant_a}")
     assert response.status_code == 200
@@ -184,9 +187,33 @@ def test_list_shipments_filters_and_paginates(client):
     assert len(data) == 1
 
 
+def test_list_shipments_cursor_pagination(client):
+    merchant_id = create_merchant(client)
+    created = [create_shipment(client, merchant_id, f"order-95{i}") for i in range(3)]
+
+    first = client.get(f"/api/v1/shipments?merchant_id={merchant_id}&limit=2")
+    assert first.status_code == 200
+    cursor = first.headers["X-Next-Cursor"]
+    assert len(first.json()) == 2
+
+    second = client.get(f"/api/v1/shipments?merchant_id={merchant_id}&limit=2&cursor={cursor}")
+    assert second.status_code == 200
+    assert len(second.json()) == 1
+    assert "X-Next-Cursor" not in second.headers
+
+    seen = [item["id"] for item in first.json() + second.json()]
+    assert sorted(seen) == sorted(item["id"] for item in created)
+
+
+def test_list_shipments_rejects_invalid_cursor(client):
+    response = client.get("/api/v1/shipments?cursor=not-a-cursor")
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == "invalid_cursor"
+
+
 def test_ingest_external_event_updates_status_and_creates_event(client):
-    merchant_id = _create_merchant(client)
-    shipment = _create_shipment(client, merchant_id, "order-999")
+    merchant_id = create_merchant(client)
+    shipment = create_shipment(client, merchant_id, "order-999")
 
     payload = {
         "carrier": "mock",
@@ -202,10 +229,15 @@ def test_ingest_external_event_updates_status_and_creates_event(client):
     assert body["shipment"]["status"] == "in_transit"
     assert body["event"]["type"] == "out_for_delivery"
 
+    shipment_resp = client.get(f"/api/v1/shipments/{shipment['id']}")
+    assert shipment_resp.json()["status"] == "in_transit"
+    events_resp = client.get(f"/api/v1/shipments/{shipment['id']}/events")
+    assert [event["id"] for event in events_resp.json()] == [body["event"]["id"]]
+
 
 def test_ingest_external_event_rejects_invalid_code(client):
-    merchant_id = _create_merchant(client)
-    _ = _create_shipment(client, merchant_id, "order-998")
+    merchant_id = create_merchant(client)
+    _ = create_shipment(client, merchant_id, "order-998")
 
     payload = {
         "carrier": "mock",
@@ -219,10 +251,10 @@ def test_ingest_external_event_rejects_invalid_code(client):
 
 
 def test_ingest_external_event_scopes_to_merchant(client):
-    merchant_a = _create_merchant(client)
-    merchant_b = _create_merchant(client)
-    shipment_a = _create_shipment(client, merchant_a, "order-997")
-    shipment_b = _create_shipment(client, merchant_b, "order-997")
+    merchant_a = create_merchant(client)
+    merchant_b = create_merchant(client)
+    shipment_a = create_shipment(client, merchant_a, "order-997")
+    shipment_b = create_shipment(client, merchant_b, "order-997")
 
     payload = {
         "carrier": "mock",
@@ -243,3 +275,299 @@ def test_ingest_external_event_scopes_to_merchant(client):
 def test_list_shipments_rejects_negative_limit(client):
     response = client.get("/api/v1/shipments?limit=-1")
     assert response.status_code == 422
+
+
+def test_ingest_external_events_batch_reports_per_item_results(client):
+    merchant_id = create_merchant(client)
+    shipment = create_shipment(client, merchant_id, "order-1000")
+
+    payload = [
+        external_event(merchant_id, "order-1000", "IN_TRANSIT"),
+        external_event(merchant_id, "order-1000", "DELIVERED"),
+        external_event(merchant_id, "order-1000", "IN_TRANSIT"),
+        external_event(merchant_id, "order-missing", "IN_TRANSIT"),
+        external_event(merchant_id, "order-1000", "UNKNOWN_CODE"),
+    ]
+    response = client.post("/api/v1/shipments/events/external/batch", json=payload)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["processed"] == 2
+    assert body["failed"] == 3
+
+    items = body["items"]
+    assert [item["index"] for item in items] == [0, 1, 2, 3, 4]
+    assert items[0]["shipment"]["status"] == "in_transit"
+    assert items[1]["shipment"]["status"] == "delivered"
+    assert items[1]["event"]["type"] == "delivered"
+    assert items[2]["error"]["code"] == "invalid_transition"
+    assert items[3]["error"]["code"] == "not_found"
+    assert items[4]["error"]["code"] == "invalid_external_event"
+
+    shipment_resp = client.get(f"/api/v1/shipments/{shipment['id']}")
+    assert shipment_resp.json()["status"] == "delivered"
+    events_resp = client.get(f"/api/v1/shipments/{shipment['id']}/events")
+    assert len(events_resp.json()) == 2
+
+
+def test_ingest_external_event_retry_returns_stored_event(client, count_queries):
+    merchant_id = create_merchant(client)
+    shipment = create_shipment(client, merchant_id, "order-1001")
+    payload = external_event(merchant_id, "order-1001", "IN_TRANSIT")
+
+    first = client.post("/api/v1/shipments/events/external", json=payload).json()
+    # Without the in-process cache the retry is resolved by the dedup index.
+    recent_external_events.clear()
+    retry = client.post("/api/v1/shipments/events/external", json=payload)
+    assert retry.status_code == 200
+    assert retry.json()["event"] == first["event"]
+
+    with count_queries() as statements:
+        cached = client.post("/api/v1/shipments/events/external", json=payload)
+    assert cached.json()["event"] == first["event"]
+    assert statements == []
+
+    detail = client.get(f"/api/v1/shipments/{shipment['id']}").json()
+    assert detail["event_count"] == 1
+    events = client.get(f"/api/v1/shipments/{shipment['id']}/events").json()
+    assert [event["id"] for event in events] == [first["event"]["id"]]
+
+
+def test_ingest_external_events_batch_skips_duplicates(client):
+    merchant_id = create_merchant(client)
+    shipment = create_shipment(client, merchant_id, "order-1002")
+    in_transit = external_event(merchant_id, "order-1002", "IN_TRANSIT")
+    delivered = external_event(merchant_id, "order-1002", "DELIVERED")
+
+    stored = client.post("/api/v1/shipments/events/external", json=in_transit).json()
+    recent_external_events.clear()
+
+    response = client.post(
+        "/api/v1/shipments/events/external/batch", json=[in_transit, delivered, delivered]
+    )
+    body = response.json()
+    assert body["processed"] == 3
+    items = body["items"]
+    assert items[0]["event"]["id"] == stored["event"]["id"]
+    assert items[2]["event"]["id"] == items[1]["event"]["id"]
+    assert items[2]["shipment"]["status"] == "delivered"
+
+    events = client.get(f"/api/v1/shipments/{shipment['id']}/events").json()
+    assert len(events) == 2
+    detail = client.get(f"/api/v1/shipments/{shipment['id']}").json()
+    assert detail["status"] == "delivered"
+    assert detail["event_count"] == 2
+
+
+def test_ingest_external_events_batch_rejects_empty_payload(client):
+    response = client.post("/api/v1/shipments/events/external/batch", json=[])
+    assert response.status_code == 422
+
+
+def test_writes_do_not_reselect_after_commit(client, count_queries):
+    merchant_id = create_merchant(client)
+
+    payload = {
+        "merchant_id": merchant_id,
+        "name": "Order 123",
+        "external_reference": "order-1100",
+    }
+    # Creates and status changes also upsert the merchant's status counters, and changes to
+    # existing shipments notify the other processes' shipment caches and append to the
+    # merchant's update stream.
+    with count_queries() as statements:
+        response = client.post("/api/v1/shipments", json=payload)
+    assert response.status_code == 201
+    assert len(statements) == 2
+    shipment_id = response.json()["id"]
+
+    with count_queries() as statements:
+        response = update_status(client, shipment_id, "in_transit")
+    assert response.status_code == 200
+    assert len(statements) == 5
+
+    with count_queries() as statements:
+        response = add_event(
+            client, shipment_id, "picked_up", datetime.now(timezone.utc).isoformat()
+        )
+    assert response.status_code == 200
+    assert len(statements) == 4
+
+    with count_queries() as statements:
+        response = client.post("/api/v1/merchant", json={"name": f"merchant-{uuid.uuid4()}"})
+    assert response.status_code == 200
+    assert len(statements) == 2
+
+
+def test_create_shipments_bulk_matches_single_create_semantics(client, count_queries):
+    merchant_id = create_merchant(client)
+    existing = create_shipment(client, merchant_id, "order-1200")
+
+    def _item(merchant, reference):
+        return {"merchant_id": merchant, "name": "Bulk order", "external_reference": reference}
+
+    payload = [
+        _item(merchant_id, "order-1201"),
+        _item(merchant_id, "order-1200"),
+        _item(str(uuid.uuid4()), "order-1202"),
+        _item(merchant_id, "order-1203"),
+        _item(merchant_id, "order-1201"),
+    ]
+    with count_queries() as statements:
+        response = client.post("/api/v1/shipments/bulk", json=payload)
+    assert response.status_code == 200
+    assert len(statements) == 4
+
+    body = response.json()
+    assert (body["created"], body["existing"], body["failed"]) == (2, 2, 1)
+    items = body["items"]
+    assert items[0]["created"] is True
+    assert items[1]["created"] is False
+    assert items[1]["shipment"]["id"] == existing["id"]
+    assert items[2]["error"]["code"] == "not_found"
+    assert items[3]["created"] is True
+    assert items[4]["created"] is False
+    assert items[4]["shipment"]["id"] == items[0]["shipment"]["id"]
+
+    listed = client.get(f"/api/v1/shipments?merchant_id={merchant_id}")
+    assert len(listed.json()) == 3
+
+
+def test_export_shipments_streams_ndjson(client):
+    merchant_a = create_merchant(client)
+    merchant_b = create_merchant(client)
+    first = create_shipment(client, merchant_a, "order-1300")
+    second = create_shipment(client, merchant_a, "order-1301")
+    create_shipment(client, merchant_b, "order-1302")
+    update_status(client, second["id"], "in_transit")
+
+    response = client.get(f"/api/v1/shipments/export?merchant_id={merchant_a}")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == [first["id"], second["id"]]
+
+    response = client.get(f"/api/v1/shipments/export?merchant_id={merchant_a}&status=in_transit")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == [second["id"]]
+
+
+def test_export_shipment_events_filters_by_time_range(client):
+    merchant_id = create_merchant(client)
+    shipment = create_shipment(client, merchant_id, "order-1303")
+    now = datetime.now(timezone.utc)
+    add_event(client, shipment["id"], "label_created", (now - timedelta(days=2)).isoformat())
+    add_event(client, shipment["id"], "picked_up", now.isoformat())
+
+    response = client.get(
+        "/api/v1/shipments/events/export",
+        params={
+            "merchant_id": merchant_id,
+            "occurred_from": (now - timedelta(days=1)).isoformat(),
+        },
+    )
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["type"] for row in rows] == ["picked_up"]
+
+
+def test_shipment_tracks_latest_event_regardless_of_arrival_order(client):
+    merchant_id = create_merchant(client)
+    shipment = create_shipment(client, merchant_id, "order-1400")
+    assert shipment["event_count"] == 0
+    assert shipment["last_event_type"] is None
+
+    now = datetime.now(timezone.utc)
+    add_event(client, shipment["id"], "picked_up", now.isoformat())
+    add_event(client, shipment["id"], "label_created", (now - timedelta(hours=1)).isoformat())
+
+    body = client.get(f"/api/v1/shipments/{shipment['id']}").json()
+    assert body["event_count"] == 2
+    assert body["last_event_type"] == "picked_up"
+    assert datetime.fromisoformat(body["last_event_at"]) == now
+
+    later = (now + timedelta(hours=1)).isoformat()
+    response = client.post(
+        "/api/v1/shipments/events/external/batch",
+        json=[
+            {**external_event(merchant_id, "order-1400", "IN_TRANSIT"), "event_time": later},
+            external_event(merchant_id, "order-1400", "IN_TRANSIT"),
+        ],
+    )
+    items = response.json()["items"]
+    assert [item["shipment"]["event_count"] for item in items] == [3, 4]
+    assert items[1]["shipment"]["last_event_at"] == items[0]["shipment"]["last_event_at"]
+
+    body = client.get(f"/api/v1/shipments/{shipment['id']}").json()
+    assert body["event_count"] == 4
+    assert body["last_event_type"] == "out_for_delivery"
+    assert datetime.fromisoformat(body["last_event_at"]) == datetime.fromisoformat(later)
+
+
+def test_list_shipments_sorts_and_filters_by_last_event(client):
+    merchant_id = create_merchant(client)
+    shipments = [create_shipment(client, merchant_id, f"order-141{i}") for i in range(4)]
+    now = datetime.now(timezone.utc)
+    add_event(client, shipments[0]["id"], "picked_up", (now - timedelta(hours=2)).isoformat())
+    add_event(client, shipments[2]["id"], "label_created", now.isoformat())
+
+    seen = []
+    params = {"merchant_id": merchant_id, "sort": "last_event_at", "limit": 1}
+    while True:
+        response = client.get("/api/v1/shipments", params=params)
+        assert response.status_code == 200
+        seen.extend(item["id"] for item in response.json())
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["cursor"] = response.headers["X-Next-Cursor"]
+
+    without_events = sorted((shipments[1]["id"], shipments[3]["id"]), reverse=True)
+    assert seen == [shipments[2]["id"], shipments[0]["id"], *without_events]
+
+    response = client.get(
+        "/api/v1/shipments", params={"merchant_id": merchant_id, "last_event_type": "picked_up"}
+    )
+    assert [item["id"] for item in response.json()] == [shipments[0]["id"]]
+
+    created_cursor = client.get(
+        "/api/v1/shipments", params={"merchant_id": merchant_id, "limit": 1}
+    ).headers["X-Next-Cursor"]
+    response = client.get(
+        "/api/v1/shipments", params={"sort": "last_event_at", "cursor": created_cursor}
+    )
+    assert response.status_code == 400
+
+
+def test_shipment_reads_revalidate_with_etags(client, count_queries):
+    merchant_id = create_merchant(client)
+    shipment = create_shipment(client, merchant_id, "order-1200")
+    url = f"/api/v1/shipments/{shipment['id']}"
+
+    first = client.get(url)
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    with count_queries() as statements:
+        cached = client.get(url, headers={"If-None-Match": f'W/"other", {etag}'})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+    assert cached.content == b""
+    assert len(statements) == 1
+
+    events_etag = client.get(f"{url}/events").headers["ETag"]
+    assert events_etag != etag
+    assert client.get(f"{url}/events", headers={"If-None-Match": events_etag}).status_code == 304
+
+    add_event(client, shipment["id"], "picked_up", datetime.now(timezone.utc).isoformat())
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    events = client.get(f"{url}/events", headers={"If-None-Match": events_etag})
+    assert events.status_code == 200
+    assert len(events.json()) == 1
+
+    etag = changed.headers["ETag"]
+    update_status(client, shipment["id"], "in_transit")
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+    missing = client.get(f"/api/v1/shipments/{uuid.uuid4()}", headers={"If-None-Match": etag})
+    assert missing.status_code == 404
@@ -0,0 +1,187 @@
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.adapters import ExternalCarrierEvent, get_adapter
+from app.adapters.base import AdapterResult
+from app.domain.errors import ConflictError
+from app.domain.shipment import ShipmentStatus
+from app.domain.shipment_event import ShipmentEventType
+from app.persistence.repositories import (
+    MerchantRepository,
+    ShipmentEventRepository,
+    ShipmentRepository,
+)
+from app.services.async_shipment_service import AsyncShipmentService
+from app.services.shipment_service import ShipmentService
+from tests.conftest import (
+    TestingSessionLocal,
+    create_merchant,
+    create_shipment,
+    external_event,
+    merchant_stats,
+    update_status,
+)
+
+
+class _RacingShipmentRepository(ShipmentRepository):
+    """Runs concurrent_write after each shipment read, before the caller writes."""
+
+    def __init__(self, db, concurrent_write, races: int = 1):
+        super().__init__(db)
+        self.concurrent_write = concurrent_write
+        self.races = races
+        self.reads = 0
+
+    def _raced(self, model):
+        self.reads += 1
+        if self.reads <= self.races:
+            self.concurrent_write()
+        return model
+
+    def get_by_id(self, shipment_id):
+        return self._raced(super().get_by_id(shipment_id))
+
+    def get_by_merchant_id_and_external_reference(self, merchant_id, external_reference):
+        return self._raced(
+            super().get_by_merchant_id_and_external_reference(merchant_id, external_reference)
+        )
+
+
+def _conflicts(operation: str, outcome: str) -> float:
+    value = REGISTRY.get_sample_value(
+        "shipment_status_conflicts_total", {"operation": operation, "outcome": outcome}
+    )
+    return value or 0.0
+
+
+def test_concurrent_status_change_invalidates_transition_instead_of_overwriting(client):
+    merchant_id = create_merchant(client)
+    shipment_id = create_shipment(client, merchant_id, "order-7001")["id"]
+    assert update_status(client, shipment_id, "in_transit").status_code == 200
+    retried = _conflicts("update_status", "retried")
+
+    with TestingSessionLocal() as db:
+        repo = _RacingShipmentRepository(
+            db, lambda: update_status(client, shipment_id, "delivered")
+        )
+        service = ShipmentService(repo, MerchantRepository(db))
+        # Validated against in_transit, written after the shipment was delivered: the retry
+        # rereads the status and rejects the transition.
+        with pytest.raises(ValueError, match="Invalid transition"):
+            service.update_status(uuid.UUID(shipment_id), ShipmentStatus.CANCELLED)
+
+    assert repo.reads == 2
+    assert _conflicts("update_status", "retried") == retried + 1
+    assert client.get(f"/api/v1/shipments/{shipment_id}").json()["status"] == "delivered"
+    # The losing attempt's counter changes were rolled back with it.
+    counts = merchant_stats(client, merchant_id)["counts"]
+    assert counts["delivered"] == 1
+    assert counts["cancelled"] == 0
+
+
+def test_external_event_is_retried_after_a_concurrent_status_change(client):
+    merchant_id = create_merchant(client)
+    shipment_id = create_shipment(client, merchant_id, "order-7002")["id"]
+
+    with TestingSessionLocal() as db:
+        repo = _RacingShipmentRepository(
+            db, lambda: update_status(client, shipment_id, "in_transit")
+        )
+        service = ShipmentService(repo, MerchantRepository(db), ShipmentEventRepository(db))
+        shipment, event = service.process_external_event(
+            AdapterResult(
+                merchant_id=uuid.UUID(merchant_id),
+                shipment_external_reference="order-7002",
+                event_type=ShipmentEventType.OUT_FOR_DELIVERY,
+                occurred_at=datetime.now(timezone.utc),
+                shipment_status=ShipmentStatus.IN_TRANSIT,
+            )
+        )
+
+    assert repo.reads == 2
+    assert shipment.status == ShipmentStatus.IN_TRANSIT
+    events = client.get(f"/api/v1/shipments/{shipment_id}/events").json()
+    assert [stored["id"] for stored in events] == [str(event.id)]
+
+
+def test_external_event_stored_concurrently_is_returned_by_the_retry(client):
+    merchant_id = create_merchant(client)
+    shipment_id = create_shipment(client, merchant_id, "order-7004")["id"]
+    payload = external_event(merchant_id, "order-7004", "IN_TRANSIT")
+    adapter_result = asyncio.run(
+        get_adapter("mock").ingest_event(ExternalCarrierEvent.model_validate(payload))
+    )
+    stored = []
+
+    class _RacingEventRepository(ShipmentEventRepository):
+        # The same event is delivered again after the dedup lookup, before this insert.
+        def get_by_dedup_key(self, dedup_key, occurred_at):
+            found = super().get_by_dedup_key(dedup_key, occurred_at)
+            if not stored:
+                response = client.post("/api/v1/shipments/events/external", json=payload)
+                stored.append(response.json()["event"]["id"])
+            return found
+
+    with TestingSessionLocal() as db:
+        event_repo = _RacingEventRepository(db)
+        service = ShipmentService(ShipmentRepository(db), MerchantRepository(db), event_repo)
+        _, event = service.process_external_event(adapter_result)
+
+    assert str(event.id) == stored[0]
+    events = client.get(f"/api/v1/shipments/{shipment_id}/events").json()
+    assert [item["id"] for item in events] == stored
+
+
+def test_status_change_gives_up_after_bounded_retries(client):
+    shipment_id = create_shipment(client, create_merchant(client), "order-7003")["id"]
+    statuses = iter(["in_transit", "created", "in_transit"])
+    rejected = _conflicts("update_status", "rejected")
+
+    with TestingSessionLocal() as db:
+        # Flip the status back and forth directly, as no transition leads back to created.
+        def _flip():
+            with TestingSessionLocal() as other:
+                model = ShipmentRepository(other).get_by_id(uuid.UUID(shipment_id))
+                model.status = next(statuses)
+                other.commit()
+
+        repo = _RacingShipmentRepository(db, _flip, races=3)
+        service = ShipmentService(repo, MerchantRepository(db))
+        with pytest.raises(ConflictError):
+            service.update_status(uuid.UUID(shipment_id), ShipmentStatus.CANCELLED)
+
+    assert repo.reads == 3
+    assert _conflicts("update_status", "rejected") == rejected + 1
+    assert client.get(f"/api/v1/shipments/{shipment_id}").json()["status"] == "in_transit"
+
+
+def test_batch_that_loses_status_races_is_rejected_and_counted(client, monkeypatch):
+    merchant_id = create_merchant(client)
+    create_shipment(client, merchant_id, "order-7005")
+
+    async def _conflict(self, adapter_results):
+        raise ConflictError("Shipment status changed concurrently")
+
+    def _ingested(outcome):
+        labels = {"carrier": "mock", "outcome": outcome}
+        return REGISTRY.get_sample_value("carrier_events_ingested_total", labels) or 0.0
+
+    monkeypatch.setattr(AsyncShipmentService, "process_external_events", _conflict)
+    conflicts, rejected = _ingested("conflict"), _ingested("invalid_external_event")
+    response = client.post(
+        "/api/v1/shipments/events/external/batch",
+        json=[
+            external_event(merchant_id, "order-7005", "IN_TRANSIT"),
+            external_event(merchant_id, "order-7005", "UNKNOWN_CODE"),
+            external_event(merchant_id, "order-7005", "DELIVERED"),
+        ],
+    )
+
+    assert response.status_code == 409
+    assert response.json()["error"]["code"] == "conflict"
+    assert _ingested("conflict") == conflicts + 2
+    assert _ingested("invalid_external_event") == rejected + 1